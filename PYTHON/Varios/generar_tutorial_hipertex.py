@@ -9,24 +9,49 @@ Flujo:
 3. Construye un prompt usando las reglas de "Reglas para los tutoriales paso a paso.txt" (si existe).
 4. Llama a Gemini (gemini-1.5-flash) con sistema de reintentos (manejo de 503 / overloaded).
 5. Guarda la salida como .hptx.
-6. Llama a parser_hipertex.py para convertir .hptx → .json HIPERTEX.
+6. Usa parser_hipertex.py (con su caché) para convertir .hptx → .json HIPERTEX.
+
+Modo lote (--batch CARPETA): genera un tutorial por cada transcripción .txt de la
+carpeta que aún no tenga su .hptx, varias a la vez con el cliente asíncrono
+(client.aio), con un límite de peticiones simultáneas (--concurrency) y de
+peticiones por minuto (--rpm, para no agotar la cuota). El progreso se guarda en
+CARPETA/.generar_hipertex_state.json después de cada tutorial: si el lote se corta,
+al relanzarlo solo se generan los que faltan y se reintentan los que fallaron, hasta
+MAX_FAILED_ATTEMPTS intentos (después se omiten, salvo con --retry-failed).
+
+  py generar_tutorial_hipertex.py                                   # interactivo, un tutorial
+  py generar_tutorial_hipertex.py --batch transcripciones --concurrency 4 --rpm 15
+  py generar_tutorial_hipertex.py --batch transcripciones --retry-failed
 
 Requisitos:
 - Paquete `google-genai` instalado.
 - Variable de entorno con la API key de Gemini (por ejemplo: GOOGLE_API_KEY).
-- `parser_hipertex.py` en el mismo directorio.
+- `parser_hipertex.py` y `hipertex_core.py`: se usan los de la raíz del repositorio
+  (o los de la carpeta del script, si se copia junto a ellos).
 """
 
 import os
 import sys
 import time
+import json
+import asyncio
 import unicodedata
 import re
-import subprocess
 from pathlib import Path
 
-from google import genai
-from google.genai import errors
+try:
+    from google import genai
+    from google.genai import errors
+except ImportError:
+    genai = errors = None
+
+# parser_hipertex.py (y hipertex_core.py) viven en la raíz del repositorio: esa carpeta va
+# primero en sys.path para no cargar la copia antigua de parser_hipertex.py de PYTHON/Varios
+for _dir in Path(__file__).resolve().parents:
+    if (_dir / "hipertex_core.py").exists():
+        if sys.path[0] != str(_dir):
+            sys.path.insert(0, str(_dir))
+        break
 
 # ==============================
 # CONFIGURACIÓN
@@ -35,8 +60,27 @@ from google.genai import errors
 MODEL_NAME = "gemini-1.5-flash"  # cambiado aquí
 MAX_RETRIES = 5
 BASE_BACKOFF_SECONDS = 5  # multiplicador simple para backoff
+REGLAS_FILE = "Reglas para los tutoriales paso a paso.txt"
+STATE_NAME = ".generar_hipertex_state.json"
+STATE_VERSION = 1
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RPM = 15
+MAX_FAILED_ATTEMPTS = 3  # en --batch, una transcripción que falló tantas veces ya no se reintenta sola
+
+_client = None
 
-client = genai.Client()  # Usará la API key de entorno (GOOGLE_API_KEY / GENAI_API_KEY)
+
+def obtener_cliente():
+    """
+    Cliente de Gemini; usa la API key de entorno (GOOGLE_API_KEY / GENAI_API_KEY).
+    Se crea en la primera llamada: importar el módulo no exige ni el paquete ni la key.
+    """
+    global _client
+    if _client is None:
+        if genai is None:
+            raise RuntimeError("Falta el paquete google-genai: py -m pip install google-genai")
+        _client = genai.Client()
+    return _client
 
 
 # ==============================
@@ -60,6 +104,14 @@ def normalizar_titulo(titulo: str) -> str:
     return slug or "tutorial-hipertex"
 
 
+def leer_texto(ruta: Path) -> str:
+    try:
+        return ruta.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        # fallback best-effort
+        return ruta.read_text(encoding="latin-1")
+
+
 def cargar_transcripcion(titulo: str) -> tuple[str, Path]:
     """
     A partir del título, determina el nombre del .txt y devuelve (texto, ruta).
@@ -74,13 +126,7 @@ def cargar_transcripcion(titulo: str) -> tuple[str, Path]:
         print(f"❌ No se encontró la transcripción: {ruta_txt}")
         sys.exit(1)
 
-    try:
-        texto = ruta_txt.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        # fallback best-effort
-        texto = ruta_txt.read_text(encoding="latin-1")
-
-    return texto, ruta_txt
+    return leer_texto(ruta_txt), ruta_txt
 
 
 def cargar_reglas() -> str:
@@ -88,12 +134,9 @@ def cargar_reglas() -> str:
     Intenta cargar el archivo de reglas de tutoriales paso a paso.
     Si no existe, devuelve un texto base mínimo.
     """
-    ruta_reglas = Path("Reglas para los tutoriales paso a paso.txt")
+    ruta_reglas = Path(REGLAS_FILE)
     if ruta_reglas.exists():
-        try:
-            return ruta_reglas.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            return ruta_reglas.read_text(encoding="latin-1")
+        return leer_texto(ruta_reglas)
 
     # Fallback mínimo si no está el archivo
     return (
@@ -112,12 +155,13 @@ def cargar_reglas() -> str:
     )
 
 
-def construir_prompt(titulo: str, transcripcion: str) -> str:
+def construir_prompt(titulo: str, transcripcion: str, reglas: str = None) -> str:
     """
     Construye el prompt completo que se enviará a Gemini.
-    Incluye las reglas y la transcripción.
+    Incluye las reglas (si no se pasan, se cargan) y la transcripción.
     """
-    reglas = cargar_reglas()
+    if reglas is None:
+        reglas = cargar_reglas()
     prompt = f"""
 {reglas}
 
@@ -159,9 +203,10 @@ def llamar_gemini_con_retry(prompt: str) -> str:
     """
     Llama a Gemini con sistema de reintentos ante errores 503 / overloaded.
     """
+    cliente = obtener_cliente()
     for intento in range(1, MAX_RETRIES + 1):
         try:
-            response = client.models.generate_content(
+            response = cliente.models.generate_content(
                 model=MODEL_NAME,
                 contents=prompt,
             )
@@ -192,39 +237,247 @@ def llamar_gemini_con_retry(prompt: str) -> str:
     raise RuntimeError("No se pudo obtener respuesta de Gemini tras varios reintentos.")
 
 
+def _reintentable(e: Exception) -> bool:
+    """503 / sobrecarga, o 429 (cuota por minuto agotada)."""
+    if errors is None:
+        return False
+    msg = str(e).lower()
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    if isinstance(e, errors.ServerError):
+        return code == 503 or "overloaded" in msg or "unavailable" in msg
+    if isinstance(e, errors.ClientError):
+        return code == 429 or "resource_exhausted" in msg
+    return False
+
+
+class LimitePorMinuto:
+    """Reparte las peticiones para no pasar de rpm por minuto (una cada 60/rpm s)."""
+
+    def __init__(self, rpm: float):
+        self.intervalo = 60.0 / rpm if rpm and rpm > 0 else 0.0
+        self._siguiente = 0.0
+        self._lock = asyncio.Lock()
+
+    async def esperar(self) -> None:
+        if not self.intervalo:
+            return
+        async with self._lock:
+            ahora = time.monotonic()
+            espera = self._siguiente - ahora
+            self._siguiente = max(ahora, self._siguiente) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+async def llamar_gemini_async(prompt: str, limite: LimitePorMinuto, nombre: str = "") -> str:
+    """
+    Igual que llamar_gemini_con_retry pero con el cliente asíncrono (client.aio).
+    Cada intento (también los reintentos) consume un hueco del límite por minuto.
+    """
+    cliente = obtener_cliente()
+    for intento in range(1, MAX_RETRIES + 1):
+        await limite.esperar()
+        try:
+            response = await cliente.aio.models.generate_content(
+                model=MODEL_NAME,
+                contents=prompt,
+            )
+            return response.text
+        except Exception as e:
+            if not _reintentable(e) or intento == MAX_RETRIES:
+                raise
+            wait = BASE_BACKOFF_SECONDS * intento
+            print(f"⚠️ {nombre}: Gemini sobrecargado o sin cuota, intento {intento}/{MAX_RETRIES}. Esperando {wait}s...")
+            await asyncio.sleep(wait)
+
+    raise RuntimeError("No se pudo obtener respuesta de Gemini tras varios reintentos.")
+
+
 # ==============================
 # CONVERSIÓN HPTX → JSON HIPERTEX
 # ==============================
 
 def convertir_hptx_a_json(ruta_hptx: Path) -> Path:
     """
-    Llama a parser_hipertex.py para convertir un .hptx en .json HIPERTEX.
-    Usa el mismo intérprete de Python que está ejecutando este script.
+    Convierte un .hptx en .json HIPERTEX usando parser_hipertex en el mismo proceso.
+    El resultado pasa por hipertex_cache, así que un .hptx ya parseado por el
+    parser o por build_catalog no se vuelve a procesar.
     """
     ruta_json = ruta_hptx.with_suffix(".json")
-    cmd = [sys.executable, "parser_hipertex.py", str(ruta_hptx)]
 
     print("🔄 Convirtiendo HPTX → JSON HIPERTEX...")
     try:
-        with ruta_json.open("w", encoding="utf-8") as f_out:
-            subprocess.run(cmd, check=True, stdout=f_out)
-    except FileNotFoundError:
-        print("❌ No se encontró parser_hipertex.py en el directorio actual.")
+        import parser_hipertex
+    except ImportError:
+        print("❌ No se encontró parser_hipertex.py (ni junto a este script ni en la raíz del repositorio).")
         raise
-    except subprocess.CalledProcessError as e:
-        print("❌ Error ejecutando parser_hipertex.py:")
-        raise e
 
+    data = parser_hipertex.parse_file(str(ruta_hptx))
+    parser_hipertex.write_parsed(data, str(ruta_json))
     return ruta_json
 
 
+# ==============================
+# MODO LOTE
+# ==============================
+
+def _escribir_atomico(ruta: Path, texto: str) -> None:
+    # Un .hptx a medias tras un corte contaría como "ya generado": se escribe aparte y se renombra
+    tmp = ruta.with_name(ruta.name + ".tmp")
+    tmp.write_text(texto, encoding="utf-8")
+    os.replace(tmp, ruta)
+
+
+def ruta_hptx_para(ruta_txt: Path) -> Path:
+    """El .hptx que genera una transcripción (mismo slug que en el modo interactivo)."""
+    return ruta_txt.with_name(f"{normalizar_titulo(ruta_txt.stem)}.hptx")
+
+
+def transcripciones_pendientes(carpeta: Path, estado: "EstadoLote" = None, reintentar_fallidos: bool = False):
+    """
+    (pendientes, omitidas): transcripciones .txt de la carpeta sin .hptx (ni con su slug,
+    ni con su mismo nombre, ni el que anotó el estado). Con estado, las que ya fallaron
+    MAX_FAILED_ATTEMPTS veces van a omitidas, salvo con reintentar_fallidos.
+    """
+    archivos = estado.files if estado is not None else {}
+    pendientes, omitidas = [], []
+    with os.scandir(carpeta) as it:
+        for e in it:
+            if not e.is_file() or e.name.startswith(".") or e.name == REGLAS_FILE:
+                continue
+            if not e.name.lower().endswith(".txt"):
+                continue
+            ruta_txt = Path(e.path)
+            if ruta_hptx_para(ruta_txt).exists() or ruta_txt.with_suffix(".hptx").exists():
+                continue
+            entrada = archivos.get(e.name, {})
+            if entrada.get("status") == "done" and entrada.get("hptx") and (carpeta / entrada["hptx"]).exists():
+                continue
+            if (entrada.get("status") == "error" and entrada.get("attempts", 0) >= MAX_FAILED_ATTEMPTS
+                    and not reintentar_fallidos):
+                omitidas.append(ruta_txt)
+                continue
+            pendientes.append(ruta_txt)
+    return sorted(pendientes), sorted(omitidas)
+
+
+class EstadoLote:
+    """
+    Progreso del lote en un JSON: {"version", "files": {nombre.txt: {"status": "done" | "error",
+    "hptx", "error", "attempts", "updated"}}}. Se reescribe entero tras cada tutorial.
+    """
+
+    def __init__(self, ruta: Path):
+        self.ruta = ruta
+        self.files = {}
+        try:
+            data = json.loads(ruta.read_text(encoding="utf-8"))
+            if data.get("version") == STATE_VERSION:
+                self.files = data.get("files") or {}
+        except (OSError, ValueError):
+            pass
+
+    def anotar(self, nombre: str, **campos) -> None:
+        entrada = self.files.setdefault(nombre, {"attempts": 0})
+        entrada.update(campos, updated=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        entrada["attempts"] = entrada.get("attempts", 0) + 1
+        if entrada.get("status") == "done":
+            entrada.pop("error", None)
+        self.guardar()
+
+    def guardar(self) -> None:
+        data = {"version": STATE_VERSION, "files": dict(sorted(self.files.items()))}
+        _escribir_atomico(self.ruta, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+async def _generar_uno(ruta_txt: Path, reglas: str, sem: asyncio.Semaphore, limite: LimitePorMinuto,
+                       estado: EstadoLote) -> bool:
+    async with sem:
+        titulo = ruta_txt.stem
+        try:
+            prompt = construir_prompt(titulo, leer_texto(ruta_txt), reglas)
+            hptx_contenido = await llamar_gemini_async(prompt, limite, ruta_txt.name)
+            ruta_hptx = ruta_hptx_para(ruta_txt)
+            _escribir_atomico(ruta_hptx, hptx_contenido)
+        except Exception as e:
+            print(f"❌ {ruta_txt.name}: {e}")
+            estado.anotar(ruta_txt.name, status="error", error=str(e))
+            return False
+        estado.anotar(ruta_txt.name, status="done", hptx=ruta_hptx.name)
+        print(f"✅ {ruta_txt.name} -> {ruta_hptx.name}")
+
+    # Fuera del semáforo y en un hilo: la conversión no ocupa un hueco de petición ni
+    # bloquea el bucle de eventos (el resto de peticiones sigue en marcha)
+    try:
+        await asyncio.to_thread(convertir_hptx_a_json, ruta_hptx)
+    except Exception as e:
+        print(f"⚠️ {ruta_hptx.name}: no se pudo convertir a JSON HIPERTEX ({e})")
+    return True
+
+
+async def generar_lote(carpeta: Path, concurrency: int = DEFAULT_CONCURRENCY, rpm: float = DEFAULT_RPM,
+                       ruta_estado: Path = None, reintentar_fallidos: bool = False) -> dict:
+    """
+    Genera el .hptx (y su .json) de cada transcripción pendiente de la carpeta, con como
+    mucho `concurrency` peticiones a la vez y `rpm` peticiones por minuto. El estado de
+    ejecuciones anteriores decide qué se omite (ver transcripciones_pendientes).
+    """
+    estado = EstadoLote(ruta_estado or carpeta / STATE_NAME)
+    pendientes, omitidas = transcripciones_pendientes(carpeta, estado, reintentar_fallidos)
+    stats = {"pending": len(pendientes), "done": 0, "errors": 0, "skipped": len(omitidas)}
+    if not pendientes:
+        return stats
+
+    reintentos = sum(1 for p in pendientes if estado.files.get(p.name, {}).get("status") == "error")
+    print(f"🧠 {len(pendientes)} transcripciones pendientes ({reintentos} fallaron antes) · "
+          f"modelo {MODEL_NAME}, {concurrency} a la vez, {rpm:g} por minuto")
+    reglas = cargar_reglas()
+    sem = asyncio.Semaphore(max(1, concurrency))
+    limite = LimitePorMinuto(rpm)
+    resultados = await asyncio.gather(*(_generar_uno(p, reglas, sem, limite, estado) for p in pendientes))
+    stats["done"] = sum(resultados)
+    stats["errors"] = len(resultados) - stats["done"]
+    return stats
+
+
 # ==============================
 # MAIN
 # ==============================
 
 def main() -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description="Genera tutoriales HIPERTEX (.hptx + .json) con Gemini.")
+    ap.add_argument("--batch", metavar="CARPETA", help="Generar todas las transcripciones .txt de la carpeta sin .hptx")
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                    help=f"Peticiones simultáneas en --batch (por defecto: {DEFAULT_CONCURRENCY})")
+    ap.add_argument("--rpm", type=float, default=DEFAULT_RPM,
+                    help=f"Máximo de peticiones por minuto en --batch, 0 = sin límite (por defecto: {DEFAULT_RPM})")
+    ap.add_argument("--state", help=f"Archivo de progreso de --batch (por defecto: CARPETA/{STATE_NAME})")
+    ap.add_argument("--retry-failed", action="store_true",
+                    help=f"En --batch, reintentar también las que ya fallaron {MAX_FAILED_ATTEMPTS} veces")
+    args = ap.parse_args()
+
     print("=== Generador HPTX + JSON con Gemini (google-genai) ===")
 
+    if args.batch:
+        carpeta = Path(args.batch)
+        if not carpeta.is_dir():
+            print(f"❌ No existe la carpeta: {carpeta}")
+            sys.exit(1)
+        stats = asyncio.run(generar_lote(carpeta, args.concurrency, args.rpm,
+                                         Path(args.state) if args.state else None, args.retry_failed))
+        if not stats["pending"]:
+            print("✅ No hay transcripciones pendientes.")
+        else:
+            print(f"\nFinalizado: {stats['done']} de {stats['pending']} tutoriales generados.")
+        if stats["skipped"]:
+            print(f"⚠️ {stats['skipped']} omitidas tras {MAX_FAILED_ATTEMPTS} intentos fallidos: "
+                  f"usa --retry-failed para reintentarlas.")
+        if stats["errors"]:
+            print(f"⚠️ {stats['errors']} con error: vuelve a lanzar el mismo comando para reintentarlos.")
+            sys.exit(1)
+        return
+
     titulo = input("Título del vídeo / contenido: ").strip()
     if not titulo:
         print("❌ No se ingresó título. Saliendo.")
@@ -1,14 +1,58 @@
 # normalizar_hipertex.py
-import sys, json
+# Lee los items del JSON de entrada de uno en uno (hipertex_core.iter_json_items) y
+# los va escribiendo en la salida, así que la memoria no crece con el documento.
+# La salida se escribe en un temporal que solo sustituye a dst al terminar bien:
+# dst puede ser el mismo archivo que src y un error no deja una salida a medias.
+import sys, json, os
 from pathlib import Path
 
-src = Path(sys.argv[1])
-dst = Path(sys.argv[2]) if len(sys.argv) > 2 else src.with_suffix(".normalized.json")
+# hipertex_core.py está en la raíz del repositorio (o junto a este script si se copia allí)
+for _dir in Path(__file__).resolve().parents:
+    if (_dir / "hipertex_core.py").exists():
+        if sys.path[0] != str(_dir):
+            sys.path.insert(0, str(_dir))
+        break
 
-data = json.loads(src.read_text(encoding="utf-8"))
-items = data["items"] if isinstance(data, dict) and isinstance(data.get("items"), list) else data
-if not isinstance(items, list):
-    raise SystemExit("El JSON no contiene lista de items ni clave 'items' válida.")
+try:
+    import hipertex_core
+except ImportError:
+    hipertex_core = None
 
-dst.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
-print(f"✅ Guardado: {dst}")
+def iter_items(src: Path):
+    if hipertex_core is not None:
+        with src.open("r", encoding="utf-8") as f:
+            yield from hipertex_core.iter_json_items(f)
+        return
+    # Sin hipertex_core.py: carga el documento completo
+    data = json.loads(src.read_text(encoding="utf-8"))
+    items = data["items"] if isinstance(data, dict) and isinstance(data.get("items"), list) else data
+    if not isinstance(items, list):
+        raise ValueError("El JSON no contiene lista de items ni clave 'items' válida.")
+    yield from items
+
+def normalize(src: Path, dst: Path) -> int:
+    """Escribe en dst la lista de items de src (mismo formato que json.dumps(items, indent=2))."""
+    tmp = dst.with_name(dst.name + ".tmp")
+    n = 0
+    try:
+        with tmp.open("w", encoding="utf-8") as out:
+            for it in iter_items(src):
+                out.write(",\n  " if n else "[\n  ")
+                out.write(json.dumps(it, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+                n += 1
+            out.write("\n]" if n else "[]")
+        os.replace(tmp, dst)
+    except BaseException:
+        tmp.unlink(missing_ok=True)  # no dejar una salida a medias
+        raise
+    return n
+
+if __name__ == "__main__":
+    src = Path(sys.argv[1])
+    dst = Path(sys.argv[2]) if len(sys.argv) > 2 else src.with_suffix(".normalized.json")
+
+    try:
+        normalize(src, dst)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"✅ Guardado: {dst}")
@@ -1,8 +1,37 @@
 # verificador_hipertex.py
-import sys, json, re
+#
+# Uso:
+#   py verificador_hipertex.py archivo.json          # JSON HIPERTEX (lista o {"items": [...]})
+#   py verificador_hipertex.py archivo.hptx          # lee el .hptx directamente, sin pasar a JSON
+#   py verificador_hipertex.py --dir CARPETA         # todos los .hptx (recursivo, en paralelo)
+#   py verificador_hipertex.py --dir CARPETA --out informe.jsonl --jobs 8
+#
+# Con --dir se escribe una línea JSON por archivo:
+#   {"file": ..., "ok": true|false, "items": N, "issues": [{"check", "itemID", "msg"}, ...]}
+# y el script termina con código 1 si algún archivo tiene avisos (sirve de filtro
+# antes de build_catalog.py). Para .hptx necesita hipertex_core.py (se busca junto a este
+# script y, si no, en las carpetas superiores: la raíz del repositorio); con él, los .json
+# también se leen item a item en vez de cargarse enteros.
+import sys, json, re, os
 from pathlib import Path
 
+for _dir in Path(__file__).resolve().parents:
+    if (_dir / "hipertex_core.py").exists():
+        if sys.path[0] != str(_dir):
+            sys.path.insert(0, str(_dir))
+        break
+
+try:
+    import hipertex_core
+except ImportError:
+    hipertex_core = None
+
+ID_RE = re.compile(r"\d{3}")
+
 def load_items(p: Path):
+    """Items del JSON (lista o {"items": [...]}). Con hipertex_core se leen de uno en uno."""
+    if hipertex_core is not None:
+        return _iter_json(p)
     data = json.loads(p.read_text(encoding="utf-8"))
     # Acepta lista o {"items": [...]}
     if isinstance(data, list):
@@ -11,52 +40,133 @@ def load_items(p: Path):
         return data["items"]
     raise ValueError("El JSON debe ser una lista o un objeto con clave 'items' que sea lista.")
 
-def validate(items):
-    ok = True
-    menu_items = []
+def _iter_json(p: Path):
+    with p.open("r", encoding="utf-8") as f:
+        yield from hipertex_core.iter_json_items(f)
 
+def check_items(items):
+    """
+    Recorre los items una sola vez y produce un aviso por problema:
+    {"check": "secuencia" | "contenido" | "formato", "itemID": ..., "msg": ...}.
+    items puede ser una lista o un generador (p. ej. hipertex_core.iter_items).
+    """
+    n_menu = 0
     for it in items:
+        item_id = it.get("itemID")
+
+        # 1) Numeración de menús secuenciales
         menu_val = it.get("menu-item") or it.get("menu_item") or ""
         if isinstance(menu_val, str) and menu_val.strip():
-            menu_items.append(it)
+            n_menu += 1
+            expected = f"{n_menu:03d}"
+            actual = str(item_id or it.get("id") or "").strip()
+            if actual != expected:
+                yield {"check": "secuencia", "itemID": actual,
+                       "msg": f"itemID esperado {expected} pero encontrado '{actual}' en: {menu_val!r}"}
 
-    # 1) Numeración de menús secuenciales
-    for idx, it in enumerate(menu_items, start=1):
-        expected = f"{idx:03d}"
-        actual = str(it.get("itemID") or it.get("id") or "").strip()
-        if actual != expected:
-            print(f"⚠️ itemID esperado {expected} pero encontrado '{actual}' en: {menu_val!r}")
-            ok = False
-
-    # 2) Contenido obligatorio
-    for it in items:
+        # 2) Contenido obligatorio
         cont = it.get("contenido") or it.get("Contenido") or ""
         if not isinstance(cont, str) or not cont.strip():
-            print(f"⚠️ Falta contenido en itemID: {it.get('itemID')}")
-            ok = False
+            yield {"check": "contenido", "itemID": item_id, "msg": f"Falta contenido en itemID: {item_id}"}
 
-    # 3) Formato del itemID
-    for it in items:
-        if "itemID" in it and it["itemID"]:
-            if not re.fullmatch(r"\d{3}", str(it["itemID"])):
-                print(f"⚠️ itemID inválido '{it['itemID']}' (usa formato 000, 001, 002...)")
-                ok = False
+        # 3) Formato del itemID
+        if item_id and not ID_RE.fullmatch(str(item_id)):
+            yield {"check": "formato", "itemID": item_id,
+                   "msg": f"itemID inválido '{item_id}' (usa formato 000, 001, 002...)"}
 
+def validate(items):
+    ok = True
+    for issue in check_items(items):
+        print(f"⚠️ {issue['msg']}")
+        ok = False
     return ok
 
+def _tally(items, report: dict):
+    for it in items:
+        report["items"] += 1
+        yield it
+
+# ---------- Modo .hptx (streaming) ----------
+def validate_hptx(path: str) -> dict:
+    """Valida un .hptx leyéndolo en streaming (sin JSON intermedio). Devuelve el informe del archivo."""
+    report = {"file": path, "ok": True, "items": 0, "issues": []}
+    try:
+        with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+            report["issues"] = list(check_items(_tally(hipertex_core.iter_items(f, {}), report)))
+    except OSError as e:
+        report["error"] = str(e)
+    report["ok"] = not report["issues"] and "error" not in report
+    return report
+
+def validate_tree(root: str, out, jobs: int = None) -> dict:
+    """Valida todos los .hptx bajo root en paralelo y escribe el informe JSONL en out."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    files = hipertex_core.find_hptx(root)
+    stats = {"files": len(files), "invalid": 0, "issues": 0}
+    if not files:
+        return stats
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files)))
+    chunk = max(1, len(files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for report in pool.map(validate_hptx, files, chunksize=chunk):
+            out.write(json.dumps(report, ensure_ascii=False) + "\n")
+            stats["issues"] += len(report["issues"])
+            if not report["ok"]:
+                stats["invalid"] += 1
+    return stats
+
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: py verificador_hipertex.py <archivo.json>")
+    import argparse
+    ap = argparse.ArgumentParser(description="Verificador HIPERTEX (.json, .hptx o carpetas de .hptx)")
+    ap.add_argument("path", nargs="?", help="Archivo a verificar (.json | .hptx)")
+    ap.add_argument("--dir", help="Verifica todos los .hptx de esta carpeta (recursivo) en paralelo")
+    ap.add_argument("--jobs", type=int, default=None, help="Procesos para --dir (por defecto: núcleos de la CPU)")
+    ap.add_argument("--out", help="Informe JSONL para --dir (por defecto: salida estándar)")
+    args = ap.parse_args()
+
+    if not args.path and not args.dir:
+        print("Uso: py verificador_hipertex.py <archivo.json|archivo.hptx>  |  --dir CARPETA [--out informe.jsonl]")
         sys.exit(2)
-    p = Path(sys.argv[1])
-    try:
-        items = load_items(p)
-    except Exception as e:
-        print(f"❌ {e}")
+
+    is_hptx = args.dir or args.path.lower().endswith(".hptx")
+    if is_hptx and hipertex_core is None:
+        print("❌ No se encontró hipertex_core.py (ni junto a este script ni en la raíz del repositorio); es necesario para .hptx.")
         sys.exit(1)
 
-    if validate(items):
-        print(f"✅ Archivo HIPERTEX válido: {len(items)} items revisados correctamente.")
+    if args.dir:
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as out:
+                stats = validate_tree(args.dir, out, args.jobs)
+        else:
+            stats = validate_tree(args.dir, sys.stdout, args.jobs)
+        # Con el informe en stdout, el resumen va a stderr para no mezclarlo con el JSONL
+        log = sys.stdout if args.out else sys.stderr
+        if stats["invalid"]:
+            log.write(f"⚠️ {stats['invalid']} de {stats['files']} archivos con avisos ({stats['issues']} en total).\n")
+            sys.exit(1)
+        log.write(f"✅ {stats['files']} archivos HIPERTEX válidos.\n")
+        return
+
+    if is_hptx:
+        report = validate_hptx(args.path)
+        if "error" in report:
+            print(f"❌ {report['error']}")
+            sys.exit(1)
+        for issue in report["issues"]:
+            print(f"⚠️ {issue['msg']}")
+        ok, n = report["ok"], report["items"]
+    else:
+        report = {"items": 0}
+        try:
+            ok = validate(_tally(load_items(Path(args.path)), report))
+        except Exception as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        n = report["items"]
+
+    if ok:
+        print(f"✅ Archivo HIPERTEX válido: {n} items revisados correctamente.")
     else:
         print("⚠️ Se detectaron advertencias. Revisa los avisos arriba.")
 
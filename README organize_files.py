@@ -24,4 +24,29 @@ python organize_files.py --root "C:\otra\carpeta"
 
 Si el archivo está en otra ubicación, usa la ruta completa:
 
-python C:\Users\rubenurbano\organize_files.py
\ No newline at end of file
+python C:\Users\rubenurbano\organize_files.py
+
+Deshacer la última ejecución (usa el diario .organize_journal.jsonl de la carpeta raíz):
+
+python organize_files.py --undo
+
+
+Completar una ejecución que se interrumpió a medias:
+
+python organize_files.py --resume
+
+
+Por defecto, un archivo cuyo nombre ya existe en el destino se mueve como nombre_1, nombre_2, ...
+aunque su contenido sea idéntico. Con --dedup, los archivos idénticos (byte a byte) a uno ya
+organizado no se duplican: skip los deja donde están y link los coloca como enlace duro al existente:
+
+python organize_files.py --dedup skip
+python organize_files.py --dedup link
+
+
+Organizar también las subcarpetas (por ejemplo una bandeja de entrada enorme). El árbol se recorre
+en streaming y se mueve por lotes, sin listarlo entero antes; no se entra en .git, venv, __pycache__
+ni node_modules, y lo que ya está en alguna TEMA/TIPO no se toca:
+
+python organize_files.py --recursive
+python organize_files.py --recursive --batch 5000
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+bench_hipertex.py — Benchmarks de la cadena HIPERTEX (parser, catálogo, organizador)
+----------------------------------------------------------------------------------
+Mide throughput (MB/s o nombres/s) y memoria pico (tracemalloc) de:
+  parser.parse_meta, parser.parse_blocks, parser.parse_file (streaming),
+  catalog.parse_meta, catalog.count_items, catalog.count_menu,
+  core.scan (meta + conteos + resumen en una pasada), catalog.summarize,
+  organize.detect_theme
+sobre el corpus real de .hptx del repositorio y sobre archivos sintéticos
+(de 1 KB a 64 MB, o 500 MB con --large; muchos items, IDs duplicados, variantes
+CRLF y BOM).
+
+Uso (Windows / PowerShell):
+  py bench_hipertex.py                              # corpus + sintéticos 1K,1M,64M
+  py bench_hipertex.py --quick                      # solo tamaños pequeños
+  py bench_hipertex.py --large                      # añade 500M (varios GB de RAM)
+  py bench_hipertex.py --sizes 1K,10M --repeat 5
+  py bench_hipertex.py --out bench_antes.json
+  py bench_hipertex.py --compare bench_antes.json   # muestra la variación respecto a otra corrida
+
+Los resultados se guardan en JSON (por defecto: bench_hipertex.json).
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import build_catalog
+import hipertex_core
+import organize_files
+import parser_hipertex
+
+DEFAULT_SIZES = "1K,1M,64M"
+QUICK_SIZES = "1K,64K,1M"
+LARGE_SIZES = "1K,1M,64M,500M"  # 500M: texto, copia preparada y resultado a la vez en memoria
+VARIANTS = ("lf", "crlf", "bom", "dup")
+
+# ---------- Datos ----------
+def parse_size(txt: str) -> int:
+    txt = txt.strip().upper()
+    mult = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}.get(txt[-1:], 1)
+    return int(float(txt.rstrip("KMG")) * mult)
+
+def size_label(n: int) -> str:
+    for unit, mult in (("G", 1024 ** 3), ("M", 1024 ** 2), ("K", 1024)):
+        if n >= mult and n % mult == 0:
+            return f"{n // mult}{unit}"
+    return str(n)
+
+def write_synthetic(path: str, size: int, variant: str, dup_run: int = 4, seed: int = 1) -> int:
+    """
+    Genera un .hptx de ~size bytes con items pequeños (muchos items).
+    variant: lf | crlf | bom | dup (cada itemID se repite dup_run veces).
+    Devuelve el número de bloques ##itemID escritos.
+    """
+    rnd = random.Random(seed)
+    words = ["Google", "Sheets", "Apps", "Script", "doPost", "API", "tutorial", "paso", "ñandú",
+             "configuración", "webhook", "Make", "JSON", "datos", "función", "botón"]
+    nl = "\r\n" if variant == "crlf" else "\n"
+    written, n = 0, 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if variant == "bom":
+            f.write("\ufeff")
+        head = nl.join(["##HIPERTEX-META BEGIN", "title: Sintético " + variant,
+                        "tags: [bench, sintetico]", "##HIPERTEX-META END", ""])
+        f.write(head)
+        written += len(head.encode("utf-8"))
+        while written < size:
+            item_id = (n // dup_run) if variant == "dup" else n
+            body = " ".join(rnd.choice(words) for _ in range(rnd.randint(8, 40)))
+            block = nl.join([
+                f"##itemID:{item_id:03}",
+                "##menu-item BEGIN", f"Paso {n}: {body[:40]}", "##menu-item END",
+                "##Contenido BEGIN", body, body[::-1], "##Contenido END", "", ""])
+            f.write(block)
+            written += len(block.encode("utf-8"))
+            n += 1
+    return n
+
+def synthetic_names(count: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    stems = ["Make", "Perplexity", "2025-07-01", "Google Sheets", "TUTORIAL P&P", "ChatGPT",
+             "Apps Script", "12345", "Docker", "FastAPI", "_borrador", "Claude"]
+    exts = [".hptx", ".json", ".txt", ".png", ".docx"]
+    return [f"{rnd.choice(stems)}_{rnd.choice(stems)}-{i}{rnd.choice(exts)}" for i in range(count)]
+
+# ---------- Medición ----------
+def measure(fn, args_list, nbytes: int, repeat: int, units: int = None) -> dict:
+    """
+    Ejecuta fn(*args) para cada args de args_list. El tiempo es el mejor de
+    `repeat` vueltas; la memoria pico se mide aparte, en una vuelta con tracemalloc.
+    """
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        t0 = time.perf_counter()
+        for args in args_list:
+            fn(*args)
+        best = min(best, time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    for args in args_list:
+        fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = max(best, 1e-9)
+    res = {"seconds": round(best, 6), "bytes": nbytes, "mb_per_s": round(nbytes / 1024 ** 2 / best, 3),
+           "peak_kb": round(peak / 1024, 1)}
+    if units is not None:
+        res["units"] = units
+        res["units_per_s"] = round(units / best, 1)
+    return res
+
+def text_targets():
+    """(nombre, función sobre el texto, transformación previa del texto)."""
+    return [
+        ("parser.parse_meta", parser_hipertex.parse_meta, None),
+        ("parser.parse_blocks", parser_hipertex.parse_blocks, lambda s: parser_hipertex.parse_meta(s)[1]),
+        ("catalog.parse_meta", build_catalog.parse_meta, None),
+        ("catalog.count_items", build_catalog.count_items, None),
+        ("catalog.count_menu", build_catalog.count_menu, None),
+        ("core.scan", lambda s: hipertex_core.scan(io.StringIO(s, newline=None)), None),
+    ]
+
+def bench_paths(dataset: str, paths: list, repeat: int, results: list, log):
+    nbytes = sum(os.path.getsize(p) for p in paths)
+    texts = [parser_hipertex.read_text(p) for p in paths]
+    for name, fn, prep in text_targets():
+        args = [((prep(t) if prep else t),) for t in texts]
+        r = measure(fn, args, nbytes, repeat)
+        del args  # que la copia preparada no conviva con la del objetivo siguiente
+        results.append({"target": name, "dataset": dataset, **r})
+        log(results[-1])
+    del texts
+    gc.collect()
+    for name, fn in (("parser.parse_file", lambda p: parser_hipertex.parse_file(p, use_cache=False)),
+                     ("catalog.summarize", build_catalog.summarize)):
+        r = measure(fn, [(p,) for p in paths], nbytes, repeat)
+        results.append({"target": name, "dataset": dataset, **r})
+        log(results[-1])
+
+def bench_names(dataset: str, names: list, repeat: int, results: list, log):
+    nbytes = sum(len(n.encode("utf-8")) for n in names)
+    r = measure(lambda ns: [organize_files.detect_theme(n) for n in ns], [(names,)], nbytes, repeat, units=len(names))
+    results.append({"target": "organize.detect_theme", "dataset": dataset, **r})
+    log(results[-1])
+
+# ---------- Comparación ----------
+def compare(results: list, old_path: str):
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = {(r["target"], r["dataset"]): r for r in json.load(f).get("results", [])}
+    print(f"\n=== Comparación con {old_path} (segundos: antes → ahora) ===")
+    for r in results:
+        o = old.get((r["target"], r["dataset"]))
+        if not o:
+            continue
+        delta = (r["seconds"] - o["seconds"]) / o["seconds"] * 100 if o["seconds"] else 0.0
+        print(f"{r['target']:<24} {r['dataset']:<16} {o['seconds']:>10.4f} → {r['seconds']:<10.4f} {delta:+7.1f}%"
+              f"   pico {o['peak_kb']:.0f} → {r['peak_kb']:.0f} KB")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks de parser_hipertex, build_catalog y organize_files.")
+    ap.add_argument("--root", default=HERE, help="Carpeta con el corpus .hptx (por defecto: la del script)")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Tamaños sintéticos (por defecto: {DEFAULT_SIZES})")
+    ap.add_argument("--quick", action="store_true", help=f"Atajo para --sizes {QUICK_SIZES}")
+    ap.add_argument("--large", action="store_true",
+                    help=f"Atajo para --sizes {LARGE_SIZES} (500M necesita varios GB de RAM)")
+    ap.add_argument("--variants", default=",".join(VARIANTS), help="Variantes sintéticas: lf,crlf,bom,dup")
+    ap.add_argument("--dup-run", type=int, default=4, help="Repeticiones de cada itemID en la variante dup")
+    ap.add_argument("--names", type=int, default=100000, help="Nombres sintéticos para detect_theme")
+    ap.add_argument("--repeat", type=int, default=3, help="Vueltas por medición (se toma la mejor)")
+    ap.add_argument("--no-corpus", action="store_true", help="No medir el corpus real")
+    ap.add_argument("--keep", action="store_true", help="Conservar los archivos sintéticos generados")
+    ap.add_argument("--out", default="bench_hipertex.json", help="JSON de resultados")
+    ap.add_argument("--compare", help="JSON de una corrida anterior para comparar")
+    args = ap.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else LARGE_SIZES if args.large else args.sizes
+    sizes = [parse_size(s) for s in sizes.split(",") if s.strip()]
+    variants = [v.strip() for v in args.variants.split(",") if v.strip() in VARIANTS]
+    results = []
+
+    def log(r):
+        extra = f"  {r['units_per_s']:.0f} nombres/s" if "units_per_s" in r else ""
+        print(f"{r['target']:<24} {r['dataset']:<16} {r['seconds']:>10.4f}s {r['mb_per_s']:>10.2f} MB/s "
+              f"pico {r['peak_kb']:>10.0f} KB{extra}")
+
+    if not args.no_corpus:
+        files = hipertex_core.find_hptx(args.root)
+        if files:
+            print(f"=== Corpus real: {len(files)} archivos .hptx en {args.root} ===")
+            bench_paths("corpus", files, args.repeat, results, log)
+            bench_names("corpus-names", [os.path.basename(p) for p in files], args.repeat, results, log)
+
+    print(f"\n=== detect_theme: {args.names} nombres sintéticos ===")
+    bench_names(f"names-{args.names}", synthetic_names(args.names), args.repeat, results, log)
+
+    tmp = tempfile.mkdtemp(prefix="bench_hipertex_")
+    try:
+        for size in sizes:
+            for variant in variants:
+                path = os.path.join(tmp, f"synthetic_{size}_{variant}.hptx")
+                n_items = write_synthetic(path, size, variant, args.dup_run)
+                # Archivos grandes: una sola vuelta para no eternizar la corrida
+                repeat = args.repeat if size <= 16 * 1024 ** 2 else 1
+                dataset = f"{size_label(size)}-{variant}"
+                print(f"\n=== Sintético {dataset}: {n_items} items ===")
+                bench_paths(dataset, [path], repeat, results, log)
+                if not args.keep:
+                    os.remove(path)
+    finally:
+        if not args.keep:
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            print(f"\nArchivos sintéticos en: {tmp}")
+
+    report = {
+        "generated_at": datetime.now(tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n[OK] Resultados guardados en {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
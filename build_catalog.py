@@ -10,10 +10,27 @@ Uso (Windows / PowerShell):
   py build_catalog.py --root "C:\Users\rubenurbano\HIPERTEX"
   py build_catalog.py --root . --recursive
   py build_catalog.py --root . --out my_catalog.json
+  py build_catalog.py --root . --recursive --incremental   # solo re-parsea lo nuevo o modificado
+  py build_catalog.py --root . --recursive --exclude GOOGLE --exclude "*/backup*"
+  py build_catalog.py --root . --recursive --search    # + catalog.search.json (ver hipertex_search.py)
+  py build_catalog.py --root . --recursive --titles    # + catalog.titles.json (títulos con erratas)
+  py build_catalog.py --root . --recursive --dedup     # copias idénticas (GOOGLE/…) en una sola entrada
+  py build_catalog.py --root . --recursive --watch     # sigue activo y actualiza el catálogo al guardar un .hptx
+  py build_catalog.py --root . --recursive --format sqlite   # catalog.sqlite3 con FTS5 (ver hipertex_db.py)
+  py build_catalog.py --root . --recursive --shards    # + catalog.shards/ paginado para visor_hipertex.html?hub=…
+  py build_catalog.py --root . --recursive --shards --compress   # JSON minificado + .gz/.br y static.manifest.json
 
-Requisitos: NO requiere dependencias externas.
+Requisitos: NO requiere dependencias externas (solo hipertex_core.py junto a este script).
+Si hipertex_cache.py está junto a este script, los archivos sin cambios no se
+vuelven a leer (ver HIPERTEX_CACHE en hipertex_cache.py). --watch usa watchdog
+(pip install watchdog) si está instalado; si no, comprueba cambios por sondeo.
 Formato soportado: HIPERTEX v1.0 (.hptx)
 
+Con --incremental se guarda junto al catálogo un manifiesto (<out>.manifest.json)
+con relpath, tamaño, st_mtime_ns y la entrada ya calculada de cada archivo: en la
+siguiente corrida solo se parsean los archivos nuevos o modificados y los
+borrados desaparecen del catálogo.
+
 Salida (catalog.json):
 {
   "hub": {
@@ -35,13 +52,60 @@ Salida (catalog.json):
     }
   ]
 }
+Con --dedup, las entradas de archivos con copias idénticas llevan además
+"paths": ["HPTX/x.hptx", "GOOGLE/HPTX/x.hptx"] (la primera es la que se parsea).
+
+Con --shards se escribe además <out>.shards/ (JSON compacto) para que el visor
+cargue el hub por partes en lugar del catálogo entero:
+  index.json          {"version": 1, "hub": {...}, "count": N, "page_size": 100,
+                       "pages": ["catalog-000.json", ...]}
+  catalog-000.json    {"page": 0, "tutorials": [entrada + "items": "items/<clave>.json", ...]}
+  items/<clave>.json  {"meta": {...}, "items": [{"itemID", "menu_item", "contenido"}, ...]}
+La clave sale del relpath, así que es estable entre corridas; los items de un
+tutorial solo se reescriben si su .hptx cambió. Visor: visor_hipertex.html?hub=catalog.shards/index.json
+
+Con --compress el catálogo y los archivos de --shards se escriben minificados,
+con hermanos .gz/.br, solo cuando su contenido cambia; static.manifest.json
+(junto a <out>) guarda el sha256 de cada uno (ver hipertex_static.py).
 """
 import argparse
+import hashlib
+import io
 import json
 import os
-import re
 import sys
+import threading
+import time
 from datetime import datetime, timezone
+from fnmatch import fnmatch
+
+import hipertex_core  # expresiones y tokenizador compartidos con parser_hipertex.py
+
+try:
+    import hipertex_cache  # caché de parseo compartida (opcional, mismo directorio)
+except ImportError:
+    hipertex_cache = None
+
+try:
+    import hipertex_search  # índice de texto completo para --search (opcional, mismo directorio)
+except ImportError:
+    hipertex_search = None
+
+try:
+    import hipertex_static  # JSON minificado + .gz/.br para --compress (opcional, mismo directorio)
+except ImportError:
+    hipertex_static = None
+
+try:
+    import hipertex_db  # catálogo en SQLite para --format sqlite (opcional, mismo directorio)
+except ImportError:
+    hipertex_db = None
+
+try:
+    from watchdog.events import FileSystemEventHandler  # notificaciones para --watch (opcional)
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
 
 # ---------- Utilidades ----------
 def iso8601(ts: float) -> str:
@@ -50,55 +114,101 @@ def iso8601(ts: float) -> str:
 def utcnow_iso() -> str:
     return datetime.now(tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-def read_text(path: str) -> str:
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        return f.read()
-
-# ---------- Parsers HIPERTEX (ligeros) ----------
-META_RE = re.compile(r"##HIPERTEX-META BEGIN([\s\S]*?)##HIPERTEX-META END", re.M)
-ITEM_RE = re.compile(r"^##itemID:(.+)$", re.M)
-MENU_RE = re.compile(r"##menu-item BEGIN([\s\S]*?)##menu-item END", re.M)
+# ---------- Parsers HIPERTEX (núcleo compartido) ----------
+def read_lines(path: str):
+    return open(path, "r", encoding="utf-8-sig", errors="replace")
 
 def parse_meta(src: str) -> dict:
-    m = META_RE.search(src)
-    if not m:
-        return {}
-    block = m.group(1).strip()
-    meta = {}
-    for line in block.splitlines():
-        # elimina comentarios tipo YAML (# ...) y recorta
-        line = re.sub(r"^\s*#.*$", "", line).strip()
-        if not line or ":" not in line:
-            continue
-        k, v = line.split(":", 1)
-        meta[k.strip()] = v.strip()
-    return meta
+    return hipertex_core.parse_meta(src)[0]
 
 def count_items(src: str) -> int:
-    return len(list(ITEM_RE.finditer(src.replace("\r\n", "\n"))))
+    return hipertex_core.count_items(src)
 
 def count_menu(src: str) -> int:
-    return len(list(MENU_RE.finditer(src)))
+    return hipertex_core.count_menu(src)
+
+def summarize_text(src: str) -> dict:
+    return hipertex_core.scan(io.StringIO(src, newline=None))
 
 # ---------- Catálogo ----------
-def scan_hptx(root: str, recursive: bool) -> list:
-    items = []
-    if recursive:
-        for dirpath, _, filenames in os.walk(root):
-            for name in filenames:
-                if name.lower().endswith(".hptx"):
-                    items.append(os.path.join(dirpath, name))
-    else:
-        for name in os.listdir(root):
-            if name.lower().endswith(".hptx"):
-                items.append(os.path.join(root, name))
-    return sorted(items)
+DEFAULT_EXCLUDES = hipertex_core.SKIP_DIRS
+
+def _matches(rel: str, name: str, patterns) -> bool:
+    return any(fnmatch(name, pat) or fnmatch(rel, pat) for pat in patterns)
+
+def is_excluded(path: str, root: str, patterns) -> bool:
+    """True si path o alguna de sus carpetas (relativas a root) casa con un patrón de exclusión."""
+    parts = os.path.relpath(path, root).replace("\\", "/").split("/")
+    return any(_matches("/".join(parts[:i + 1]), name, patterns) for i, name in enumerate(parts))
+
+def walk_hptx(root: str, recursive: bool, exclude=DEFAULT_EXCLUDES, jobs: int = None) -> list:
+    """
+    Devuelve [(ruta, stat), ...] ordenado por ruta con los .hptx bajo root.
+    Usa os.scandir (el stat de cada entrada se reutiliza luego en build_entry) y
+    reparte los subdirectorios entre hilos, para que en unidades de red las
+    consultas de metadatos no se hagan de una en una.
+    exclude: patrones glob contra el nombre o la ruta relativa ("GOOGLE", "*/backup/*").
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    root = os.path.abspath(root)
+    patterns = list(exclude or ())
+
+    def excluded(path: str, name: str) -> bool:
+        return bool(patterns) and _matches(os.path.relpath(path, root).replace("\\", "/"), name, patterns)
+
+    def scan_dir(path: str):
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    try:
+                        is_dir = e.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # Como os.walk: no se sigue a los enlaces simbólicos a carpetas
+                        if recursive and not e.is_symlink() and not excluded(e.path, e.name):
+                            subdirs.append(e.path)
+                    elif e.name.lower().endswith(".hptx") and not excluded(e.path, e.name):
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            st = None  # build_entry lo reintenta y deja el error en el catálogo
+                        files.append((e.path, st))
+        except OSError:
+            pass  # carpeta ilegible: se ignora, igual que os.walk
+        return files, subdirs
+
+    found = []
+    jobs = jobs or min(32, (os.cpu_count() or 1) * 4)  # trabajo de E/S: más hilos que núcleos
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = {pool.submit(scan_dir, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                files, subdirs = fut.result()
+                found.extend(files)
+                pending.update(pool.submit(scan_dir, d) for d in subdirs)
+    found.sort(key=lambda f: f[0])
+    return found
+
+def scan_hptx(root: str, recursive: bool, exclude=DEFAULT_EXCLUDES) -> list:
+    return [p for p, _ in walk_hptx(root, recursive, exclude)]
 
-def build_entry(path: str, root: str) -> dict:
-    src = read_text(path)
-    meta = parse_meta(src)
+def summarize(path: str) -> dict:
+    """Metadatos, conteos y resumen por item en una sola lectura del archivo."""
+    with read_lines(path) as f:
+        return hipertex_core.scan(f)
+
+def build_entry(path: str, root: str, stat: os.stat_result = None) -> dict:
+    stat = stat or os.stat(path)
+    if hipertex_cache is not None:
+        summary = hipertex_cache.cached(path, "summary", summarize, st=stat)
+    else:
+        summary = summarize(path)
+    meta = summary["meta"]
 
-    stat = os.stat(path)
     relpath = os.path.relpath(path, root).replace("\\", "/")
 
     title = meta.get("title") or os.path.basename(path)
@@ -121,36 +231,304 @@ def build_entry(path: str, root: str) -> dict:
         "title": title,
         "created": created,
         "tags": tags,
-        "items_count": count_items(src),
-        "menu_count": count_menu(src),
+        "items_count": summary["items_count"],
+        "menu_count": summary["menu_count"],
     }
     return entry
 
+def error_entry(path: str, root: str, e: Exception) -> dict:
+    return {
+        "file": os.path.basename(path),
+        "relpath": os.path.relpath(path, root).replace("\\", "/"),
+        "error": str(e)
+    }
+
 def write_catalog(data: dict, out_path: str):
-    with open(out_path, "w", encoding="utf-8") as f:
+    # Escritura atómica: el visor nunca lee un catálogo a medio escribir
+    tmp = out_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, out_path)
 
-def main():
-    ap = argparse.ArgumentParser(description="Genera un catálogo HIPERTEX HUB (catalog.json).")
-    ap.add_argument("--root", default=".", help="Carpeta raíz a escanear (por defecto: .)")
-    ap.add_argument("--recursive", action="store_true", help="Buscar .hptx recursivamente")
-    ap.add_argument("--out", default="catalog.json", help="Ruta del JSON de salida (por defecto: catalog.json)")
-    args = ap.parse_args()
+def sqlite_path(out_path: str) -> str:
+    root, ext = os.path.splitext(out_path)
+    return out_path if ext.lower() in (".sqlite", ".sqlite3", ".db") else root + ".sqlite3"
 
-    root = os.path.abspath(args.root)
-    files = scan_hptx(root, args.recursive)
+# ---------- Duplicados ----------
+def content_digest(path: str, st: os.stat_result = None) -> str:
+    if hipertex_cache is not None:
+        return hipertex_cache.digest(path, st)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def group_duplicates(files: list) -> list:
+    """
+    Agrupa [(ruta, stat), ...] por contenido idéntico. Solo se hashean los archivos
+    cuyo tamaño coincide con el de otro. Devuelve los grupos ordenados por su ruta
+    principal, que es la copia menos anidada (HPTX/x antes que GOOGLE/HPTX/x).
+    """
+    by_size = {}
+    for f in files:
+        by_size.setdefault(f[1].st_size if f[1] else None, []).append(f)
+    groups = []
+    for size, same in by_size.items():
+        if size is None or len(same) == 1:
+            groups.extend([f] for f in same)
+            continue
+        by_digest = {}
+        for f in same:
+            try:
+                key = content_digest(f[0], f[1])
+            except OSError:
+                key = f[0]  # ilegible: queda solo y build_entry dejará el error
+            by_digest.setdefault(key, []).append(f)
+        groups.extend(by_digest.values())
+    for g in groups:
+        g.sort(key=lambda f: (f[0].count(os.sep), f[0]))
+    groups.sort(key=lambda g: g[0][0])
+    return groups
+
+# ---------- Catálogo paginado (--shards) ----------
+SHARDS_VERSION = 1
+
+def shards_dir(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + ".shards"
+
+def shard_key(relpath: str) -> str:
+    return hashlib.sha1(relpath.encode("utf-8")).hexdigest()[:16]
+
+COMPRESSED = (".gz", ".br")  # hermanos que escribe hipertex_static (--compress)
+
+def _drop_compressed(path: str):
+    # Sin --compress, un .gz/.br de una corrida anterior quedaría desfasado
+    for ext in COMPRESSED:
+        if os.path.exists(path + ext):
+            os.remove(path + ext)
+
+def _write_compact(data, path: str, published: dict = None):
+    """
+    JSON compacto en path. Con published (--compress) lo escribe hipertex_static
+    (con .gz/.br, solo si cambió) y anota su entrada para static.manifest.json.
+    """
+    if published is not None:
+        published[path] = hipertex_static.publish(data, path)
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+    _drop_compressed(path)
+
+def write_items_file(src: str, dst: str, st: os.stat_result = None, published: dict = None) -> bool:
+    """
+    Escribe en dst los items completos de src ({"meta", "items"}, como *_parsed.json
+    pero compacto). dst (y sus .gz/.br) quedan con el st_mtime_ns de src: si
+    coincide, no se reescriben. Devuelve True si se escribió.
+    """
+    st = st or os.stat(src)
+    targets = hipertex_static.outputs(dst) if published is not None else [dst]
+    try:
+        if all(os.stat(t).st_mtime_ns == st.st_mtime_ns for t in targets):
+            if published is not None:
+                published[dst] = None  # sin cambios: el manifiesto conserva su entrada
+            else:
+                _drop_compressed(dst)
+            return False
+    except OSError:
+        pass
+    with open(src, "r", encoding="utf-8-sig", errors="replace") as f:
+        data = hipertex_core.scan(f, full=True)
+    _write_compact({"meta": data["meta"], "items": data["items"]}, dst, published)
+    for t in targets:
+        os.utime(t, ns=(st.st_mtime_ns, st.st_mtime_ns))
+    return True
+
+def write_shards(hub: dict, rows: list, out_dir: str, page_size: int = 100, published: dict = None) -> dict:
+    """
+    rows: [(entry, ruta, stat), ...]. Escribe index.json, las páginas catalog-NNN.json
+    y un items/<clave>.json por tutorial; borra páginas e items que ya no se usan.
+    index.json se escribe al final, cuando todo lo que referencia ya existe.
+    published: como en _write_compact (--compress).
+    """
+    items_dir = os.path.join(out_dir, "items")
+    os.makedirs(items_dir, exist_ok=True)
+    stats = {"pages": 0, "written": 0, "unchanged": 0, "removed": 0}
+    keep = set()
+    tutorials = []
+    for entry, path, st in rows:
+        if "error" not in entry:
+            name = shard_key(entry["relpath"]) + ".json"
+            try:
+                if write_items_file(path, os.path.join(items_dir, name), st, published):
+                    stats["written"] += 1
+                else:
+                    stats["unchanged"] += 1
+                keep.add(name)
+                entry = dict(entry, items="items/" + name)
+            except OSError as e:
+                sys.stderr.write(f"[WARN] {entry['relpath']}: {e}\n")
+        tutorials.append(entry)
+
+    page_size = max(1, page_size)
+    pages = []
+    for start in range(0, len(tutorials), page_size):
+        name = f"catalog-{len(pages):03d}.json"
+        _write_compact({"page": len(pages), "tutorials": tutorials[start:start + page_size]},
+                       os.path.join(out_dir, name), published)
+        pages.append(name)
+    stats["pages"] = len(pages)
+    _write_compact({"version": SHARDS_VERSION, "hub": hub, "count": len(tutorials),
+                    "page_size": page_size, "pages": pages}, os.path.join(out_dir, "index.json"), published)
+
+    for name in os.listdir(out_dir):
+        base = _uncompressed(name)
+        if base.startswith("catalog-") and base.endswith(".json") and base not in pages:
+            os.remove(os.path.join(out_dir, name))
+    for name in os.listdir(items_dir):
+        if _uncompressed(name) not in keep:
+            os.remove(os.path.join(items_dir, name))
+            if name.endswith(".json"):
+                stats["removed"] += 1
+    return stats
+
+def _uncompressed(name: str) -> str:
+    for ext in COMPRESSED:
+        if name.endswith(ext):
+            return name[:-len(ext)]
+    return name
+
+# ---------- Índice de texto completo ----------
+def build_search(files: list, tutorials: list, root: str, out_path: str, memo: dict = None) -> str:
+    """
+    Genera <out>.search.json (ver hipertex_search.py) con los pasos de los
+    tutoriales que entraron sin error en el catálogo. Los términos de cada
+    archivo se guardan en hipertex_cache, así que solo se tokeniza lo que cambió.
+    memo ({ruta: ((tamaño, st_mtime_ns), términos)}, --watch) los guarda además en
+    memoria entre lotes: los archivos sin cambios ni siquiera consultan la caché.
+    """
+    ok = {t["relpath"] for t in tutorials if "error" not in t}
+    entries = []
+    seen = set()
+    for p, st in files:
+        rel = os.path.relpath(p, root).replace("\\", "/")
+        if rel not in ok:
+            continue
+        sig = (st.st_size, st.st_mtime_ns) if st else None
+        hit = memo.get(p) if memo is not None and sig else None
+        if hit and hit[0] == sig:
+            seen.add(p)
+            entries.append((rel, hit[1]))
+            continue
+        try:
+            if hipertex_cache is not None:
+                terms = hipertex_cache.cached(p, "terms", hipertex_search.file_terms, st=st)
+            else:
+                terms = hipertex_search.file_terms(p)
+        except OSError as e:
+            sys.stderr.write(f"[WARN] {rel}: {e}\n")
+            continue
+        if memo is not None and sig:
+            memo[p] = (sig, terms)
+            seen.add(p)
+        entries.append((rel, terms))
+    if memo is not None:
+        for p in [p for p in memo if p not in seen]:
+            del memo[p]
+    path = hipertex_search.index_path(out_path)
+    hipertex_search.write_index(hipertex_search.build_index(entries), path)
+    return path
 
+# ---------- Modo incremental ----------
+MANIFEST_VERSION = 1
+
+def manifest_path(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + ".manifest.json"
+
+def load_manifest(path: str, root: str, recursive: bool) -> dict:
+    """{relpath: {"size", "mtime_ns", "entry"}} del manifiesto previo, o {} si no sirve."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if (not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION
+            or data.get("root") != root or data.get("recursive") != recursive):
+        return {}
+    return data.get("files") or {}
+
+def write_manifest(path: str, root: str, recursive: bool, files: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "root": root, "recursive": recursive, "files": files},
+                  f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def build_incremental(files: list, root: str, recursive: bool, manifest_file: str,
+                      changed: set = None, previous: dict = None):
+    """
+    Reutiliza las entradas del manifiesto cuyo tamaño y st_mtime_ns no cambiaron y
+    solo parsea el resto. files: [(ruta, stat), ...] de walk_hptx. Devuelve (tutorials, stats).
+    Con --watch: changed son las rutas del lote (se re-parsean aunque su stat coincida)
+    y previous el manifiesto en memoria, que se usa en vez de leerlo y se actualiza.
+    """
+    old = previous if previous is not None else load_manifest(manifest_file, root, recursive)
+    new = {}
     tutorials = []
-    for p in files:
+    parsed = 0
+    for p, st in files:
+        rel = os.path.relpath(p, root).replace("\\", "/")
         try:
-            tutorials.append(build_entry(p, root))
+            st = st or os.stat(p)
+            prev = old.get(rel)
+            if (prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns
+                    and (changed is None or p not in changed)):
+                entry = prev["entry"]
+            else:
+                entry = build_entry(p, root, st)
+                parsed += 1
+            new[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "entry": entry}
         except Exception as e:
-            # No abortamos el catálogo por un archivo defectuoso
-            tutorials.append({
-                "file": os.path.basename(p),
-                "relpath": os.path.relpath(p, root).replace("\\", "/"),
-                "error": str(e)
-            })
+            # Los archivos con error no se guardan: se reintentan en la próxima corrida
+            entry = error_entry(p, root, e)
+        tutorials.append(entry)
+    write_manifest(manifest_file, root, recursive, new)
+    removed = sum(1 for rel in old if rel not in new)
+    if previous is not None:
+        previous.clear()
+        previous.update(new)
+    return tutorials, {"parsed": parsed, "reused": len(new) - parsed, "removed": removed}
+
+def build(files: list, root: str, args, incremental: bool, changed: set = None, state: dict = None) -> list:
+    """
+    Genera el catálogo (y los índices pedidos) a partir de [(ruta, stat), ...].
+    Devuelve las líneas de resumen para mostrar. changed y state (--watch): rutas
+    del lote y {"manifest", "terms"} que se conservan en memoria entre lotes.
+    """
+    groups = None
+    if args.dedup:
+        groups = group_duplicates(files)
+        files = [g[0] for g in groups]
+
+    stats = None
+    if incremental:
+        tutorials, stats = build_incremental(files, root, args.recursive, args.manifest or manifest_path(args.out),
+                                             changed, state["manifest"] if state else None)
+    else:
+        tutorials = []
+        for p, st in files:
+            try:
+                tutorials.append(build_entry(p, root, st))
+            except Exception as e:
+                # No abortamos el catálogo por un archivo defectuoso
+                tutorials.append(error_entry(p, root, e))
+
+    if groups:
+        for i, g in enumerate(groups):
+            if len(g) > 1:
+                tutorials[i] = dict(tutorials[i], paths=[os.path.relpath(p, root).replace("\\", "/") for p, _ in g])
 
     catalog = {
         "hub": {
@@ -162,8 +540,227 @@ def main():
         "tutorials": tutorials
     }
 
-    write_catalog(catalog, args.out)
-    print(f"[OK] Catálogo generado: {args.out}  (total: {len(tutorials)})")
+    published = {} if args.compress else None
+    if args.compress:
+        _keep_generated_at(catalog, args.out)
+
+    if args.format == "sqlite":
+        db_path = sqlite_path(args.out)
+        db = hipertex_db.write_catalog_db(db_path, catalog["hub"],
+                                          [(t, p, st) for t, (p, st) in zip(tutorials, files)])
+        lines = [f"[OK] Catálogo SQLite: {db_path}  (total: {len(tutorials)}; "
+                 f"{db['written']} escritos, {db['unchanged']} sin cambios, {db['removed']} eliminados)"]
+    elif args.compress:
+        _write_compact(catalog, args.out, published)
+        lines = [f"[OK] Catálogo generado: {args.out}  (total: {len(tutorials)})"]
+    else:
+        write_catalog(catalog, args.out)
+        _drop_compressed(args.out)
+        lines = [f"[OK] Catálogo generado: {args.out}  (total: {len(tutorials)})"]
+    if args.shards:
+        out_dir = shards_dir(args.out)
+        sh = write_shards(catalog["hub"], [(t, p, st) for t, (p, st) in zip(tutorials, files)],
+                          out_dir, args.page_size, published)
+        lines.append(f"[OK] Catálogo paginado: {out_dir}  ({sh['pages']} páginas; items: {sh['written']} escritos, "
+                     f"{sh['unchanged']} sin cambios, {sh['removed']} eliminados)")
+    if published:
+        manifest = hipertex_static.update_manifest(os.path.dirname(os.path.abspath(args.out)), published)
+        n_written = sum(1 for info in published.values() if info and info["written"])
+        lines.append(f"[OK] Manifiesto estático: {manifest}  ({n_written} de {len(published)} JSON reescritos con .gz/.br)")
+    if args.search:
+        memo = state["terms"] if state else None
+        lines.append(f"[OK] Índice de búsqueda: {build_search(files, tutorials, root, args.out, memo)}")
+    if args.titles:
+        titles_out = hipertex_search.titles_path(args.out)
+        hipertex_search.write_index(hipertex_search.build_title_index(tutorials), titles_out)
+        lines.append(f"[OK] Índice de títulos: {titles_out}")
+    if groups:
+        n_dup = sum(len(g) - 1 for g in groups)
+        lines.append(f"     dedup: {n_dup} copias idénticas unificadas en {sum(1 for g in groups if len(g) > 1)} entradas")
+    if stats:
+        lines.append(f"     incremental: {stats['parsed']} parseados, {stats['reused']} sin cambios, {stats['removed']} eliminados")
+    return lines
+
+def _keep_generated_at(catalog: dict, out_path: str):
+    # Con --compress los artefactos solo se reescriben si cambian: si los tutoriales
+    # son los mismos que en el catálogo anterior, se conserva su generated_at
+    try:
+        with open(out_path, "r", encoding="utf-8") as f:
+            prev = json.load(f)
+    except (OSError, ValueError):
+        return
+    if isinstance(prev, dict) and prev.get("tutorials") == catalog["tutorials"]:
+        generated_at = (prev.get("hub") or {}).get("generated_at")
+        if generated_at:
+            catalog["hub"]["generated_at"] = generated_at
+
+# ---------- Modo --watch ----------
+def _start_observer(root: str, recursive: bool, notify):
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.event_type in ("opened", "closed_no_write"):
+                return
+            if event.is_directory and event.event_type == "modified":
+                return  # llega con cada cambio de un archivo de la carpeta
+            notify(event.src_path, event.is_directory)
+            if getattr(event, "dest_path", ""):
+                notify(event.dest_path, event.is_directory)
+
+    observer = Observer()
+    observer.schedule(Handler(), root, recursive=recursive)
+    observer.start()
+    return observer
+
+def apply_events(files: dict, events: set, root: str, recursive: bool, excludes) -> set:
+    """
+    Aplica a files ({ruta: stat}) un lote de eventos (ruta, es_carpeta) sin volver
+    a recorrer el árbol: solo se hace stat de los archivos afectados (o se recorre la
+    carpeta creada/movida). Devuelve las rutas que cambiaron.
+    """
+    changed = set()
+    for path, is_dir in events:
+        path = os.path.abspath(path)
+        if is_dir:
+            prefix = path + os.sep
+            for p in [p for p in files if p.startswith(prefix)]:
+                del files[p]
+                changed.add(p)
+            if recursive and os.path.isdir(path) and not is_excluded(path, root, excludes):
+                for p, st in walk_hptx(path, True, excludes):
+                    if not is_excluded(p, root, excludes):
+                        files[p] = st
+                        changed.add(p)
+            continue
+        if not path.lower().endswith(".hptx") or is_excluded(path, root, excludes):
+            continue
+        if not recursive and os.path.dirname(path) != root:
+            continue
+        try:
+            files[path] = os.stat(path)
+        except FileNotFoundError:
+            files.pop(path, None)
+        changed.add(path)
+    return changed
+
+def _signature(files: dict) -> dict:
+    return {p: (st.st_size, st.st_mtime_ns) if st else None for p, st in files.items()}
+
+def watch(root: str, args, excludes):
+    """
+    Mantiene el catálogo al día: notificaciones del sistema de archivos (watchdog) o,
+    si no está instalado, sondeo cada --interval segundos. Los cambios se agrupan
+    hasta que pasan --debounce segundos sin otros nuevos y cada lote se aplica en modo
+    incremental: solo se parsea lo que cambió, con el manifiesto y los términos del
+    índice de búsqueda en memoria.
+    """
+    state = {"manifest": load_manifest(args.manifest or manifest_path(args.out), root, args.recursive), "terms": {}}
+    files = dict(walk_hptx(root, args.recursive, excludes, args.jobs))
+    for line in build(sorted(files.items()), root, args, incremental=True, state=state):
+        print(line)
+
+    lock = threading.Lock()
+    pending = set()
+    last_event = [0.0]
+
+    def notify(path: str, is_dir: bool):
+        with lock:
+            pending.add((path, is_dir))
+            last_event[0] = time.monotonic()
+
+    observer = _start_observer(root, args.recursive, notify) if Observer is not None else None
+    if observer is None:
+        print(f"[WARN] watchdog no está instalado: se comprueban cambios cada {args.interval:g} s (pip install watchdog)")
+    print(f"👀 Vigilando {root} (Ctrl+C para salir)")
+
+    polled = set()  # sondeo: cambios vistos que aún esperan el --debounce
+    try:
+        while True:
+            if observer is None:
+                time.sleep(args.interval)
+                current = dict(walk_hptx(root, args.recursive, excludes, args.jobs))
+                before, after = _signature(files), _signature(current)
+                new = {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+                files = current
+                if new:
+                    polled |= new
+                    last_event[0] = time.monotonic()
+                if not polled or time.monotonic() - last_event[0] < args.debounce:
+                    continue
+                changed, polled = polled, set()
+            else:
+                time.sleep(0.1)
+                with lock:
+                    if not pending or time.monotonic() - last_event[0] < args.debounce:
+                        continue
+                    batch = set(pending)
+                    pending.clear()
+                changed = apply_events(files, batch, root, args.recursive, excludes)
+            if not changed:
+                continue
+            try:
+                lines = build(sorted(files.items()), root, args, incremental=True, changed=changed, state=state)
+                print(f"🔄 {datetime.now().strftime('%H:%M:%S')}  {len(changed)} cambio(s)")
+                for line in lines:
+                    print(line)
+            except Exception as e:
+                # Un lote fallido no detiene la vigilancia: el siguiente cambio lo reintenta
+                print(f"[WARN] No se pudo actualizar el catálogo: {e}")
+    except KeyboardInterrupt:
+        print("\n[OK] Vigilancia detenida.")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+def main():
+    ap = argparse.ArgumentParser(description="Genera un catálogo HIPERTEX HUB (catalog.json).")
+    ap.add_argument("--root", default=".", help="Carpeta raíz a escanear (por defecto: .)")
+    ap.add_argument("--recursive", action="store_true", help="Buscar .hptx recursivamente")
+    ap.add_argument("--out", default="catalog.json", help="Ruta del JSON de salida (por defecto: catalog.json)")
+    ap.add_argument("--format", choices=("json", "sqlite"), default="json",
+                    help="json (por defecto) o sqlite: <out>.sqlite3 con tags, items y FTS5 (ver hipertex_db.py)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Solo re-parsear archivos nuevos o modificados (usa <out>.manifest.json)")
+    ap.add_argument("--manifest", help="Ruta del manifiesto para --incremental (por defecto: <out>.manifest.json)")
+    ap.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                    help="Carpetas/archivos a omitir (nombre o ruta relativa; repetible). "
+                         f"Siempre se omiten: {', '.join(DEFAULT_EXCLUDES)}")
+    ap.add_argument("--dedup", action="store_true",
+                    help="Unificar archivos idénticos (copias espejo): se parsean una vez y su entrada lista todas las rutas")
+    ap.add_argument("--search", action="store_true",
+                    help="Generar también el índice de texto completo <out>.search.json (ver hipertex_search.py)")
+    ap.add_argument("--titles", action="store_true",
+                    help="Generar también el índice de títulos por trigramas <out>.titles.json (búsqueda con erratas)")
+    ap.add_argument("--shards", action="store_true",
+                    help="Generar también <out>.shards/: índice, páginas del catálogo e items por tutorial (carga bajo demanda en el visor)")
+    ap.add_argument("--page-size", type=int, default=100, help="Tutoriales por página con --shards (por defecto: 100)")
+    ap.add_argument("--compress", action="store_true",
+                    help="JSON minificado + .gz/.br (solo si cambian) y static.manifest.json con sus hashes (ver hipertex_static.py)")
+    ap.add_argument("--jobs", type=int, default=None, help="Hilos para recorrer carpetas (por defecto: 4 × núcleos, máx. 32)")
+    ap.add_argument("--watch", action="store_true",
+                    help="Seguir ejecutándose y actualizar el catálogo (e índices) al cambiar los .hptx; implica --incremental")
+    ap.add_argument("--debounce", type=float, default=0.5, help="Segundos sin cambios antes de procesar un lote (--watch)")
+    ap.add_argument("--interval", type=float, default=1.0, help="Segundos entre comprobaciones si no hay watchdog (--watch)")
+    args = ap.parse_args()
+
+    if (args.search or args.titles) and hipertex_search is None:
+        print("[ERROR] --search/--titles necesitan hipertex_search.py junto a este script.")
+        sys.exit(1)
+    if args.compress and hipertex_static is None:
+        print("[ERROR] --compress necesita hipertex_static.py junto a este script.")
+        sys.exit(1)
+    if args.format == "sqlite" and hipertex_db is None:
+        print("[ERROR] --format sqlite necesita hipertex_db.py junto a este script.")
+        sys.exit(1)
+
+    root = os.path.abspath(args.root)
+    excludes = DEFAULT_EXCLUDES + tuple(args.exclude)
+    if args.watch:
+        watch(root, args, excludes)
+        return
+    files = walk_hptx(root, args.recursive, excludes, args.jobs)
+    for line in build(files, root, args, args.incremental):
+        print(line)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,19 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+VARIOS = Path(__file__).resolve().parent / "PYTHON" / "Varios"
+
+
+@pytest.fixture
+def varios():
+    """Importa un script de PYTHON/Varios desde su carpeta real: varios("verificador_hipertex")."""
+    def load(name):
+        spec = importlib.util.spec_from_file_location(name, VARIOS / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module  # para que los procesos del pool lo encuentren
+        spec.loader.exec_module(module)
+        return module
+    return load
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_bin.py — Contenedor binario compacto para tutoriales HIPERTEX parseados
+------------------------------------------------------------------------------
+Alternativa a *_parsed.json (indent=2) para el resultado de parse_hipertex:
+{"meta": {...}, "items": [{"itemID", "menu_item", "contenido"}, ...]}.
+
+Estructura (.hptxb, enteros little-endian):
+  cabecera   "HPTB" | versión u16 | reservado u16 | n_items u32 | off_meta u64 | off_tabla u64
+  meta       n_pares u32 + (clave, valor) como cadenas
+  tabla      n_items × (off_id u64, off_menu u64, off_contenido u64)   off_menu = NO_MENU si es None
+  cadenas    u32 longitud + bytes UTF-8; primero todos los IDs y menús, después
+             todos los contenidos, para que listar el menú no toque los cuerpos.
+
+Uso:
+  py hipertex_bin.py "tutorial_parsed.json"     # → tutorial_parsed.hptxb
+  py hipertex_bin.py "tutorial_parsed.hptxb"    # → tutorial_parsed.json
+  py hipertex_bin.py "tutorial_parsed.hptxb" --menu
+
+  from hipertex_bin import HptxBinReader
+  with HptxBinReader("tutorial_parsed.hptxb") as r:
+      for item_id, titulo in r.menu_titles(): ...
+      paso = r.get("003")
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"HPTB"
+VERSION = 1
+NO_MENU = 0xFFFFFFFFFFFFFFFF
+_HEADER = struct.Struct("<4sHHIQQ")
+_ROW = struct.Struct("<QQQ")
+_LEN = struct.Struct("<I")
+
+# ------------------------------ Escritura ------------------------------
+def _put(f, text: str) -> int:
+    """Escribe una cadena con prefijo de longitud y devuelve su offset."""
+    off = f.tell()
+    raw = text.encode("utf-8")
+    f.write(_LEN.pack(len(raw)))
+    f.write(raw)
+    return off
+
+def write_bin(data: dict, path: str):
+    """Guarda un resultado de parse_hipertex en formato .hptxb."""
+    if isinstance(data, list):
+        data = {"meta": {}, "items": data}
+    meta = data.get("meta") or {}
+    items = data.get("items")
+    if not isinstance(items, list):
+        raise ValueError("Se esperaba {'meta': {...}, 'items': [...]} (salida de parser_hipertex).")
+
+    with open(path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        meta_off = f.tell()
+        f.write(_LEN.pack(len(meta)))
+        for k, v in meta.items():
+            _put(f, str(k))
+            _put(f, str(v))
+        table_off = f.tell()
+        f.write(b"\0" * (_ROW.size * len(items)))
+
+        heads = []
+        for it in items:
+            menu = it.get("menu_item")
+            heads.append((_put(f, str(it["itemID"])), NO_MENU if menu is None else _put(f, menu)))
+        rows = [(id_off, menu_off, _put(f, it.get("contenido") or ""))
+                for (id_off, menu_off), it in zip(heads, items)]
+
+        f.seek(table_off)
+        f.write(b"".join(_ROW.pack(*r) for r in rows))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(items), meta_off, table_off))
+
+# ------------------------------- Lectura -------------------------------
+class HptxBinReader:
+    """
+    Lector de .hptxb sobre mmap: la cabecera y la tabla dan acceso directo a
+    cada cadena, así que solo se decodifica lo que se pide.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        self._mm = None
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, self.count, self._meta_off, self._table_off = _HEADER.unpack_from(self._mm, 0)
+        except (ValueError, struct.error):
+            # Vacío o con la cabecera cortada: sin cerrar ambos, Windows deja el archivo bloqueado
+            if self._mm is not None:
+                self._mm.close()
+            self._f.close()
+            raise ValueError(f"No es un archivo .hptxb válido: {path}")
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"No es un archivo .hptxb válido (o versión {version} no soportada): {path}")
+        self._ids = None
+
+    def _str(self, off: int) -> str:
+        (n,) = _LEN.unpack_from(self._mm, off)
+        start = off + _LEN.size
+        return self._mm[start:start + n].decode("utf-8")
+
+    def _row(self, i: int):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return _ROW.unpack_from(self._mm, self._table_off + i * _ROW.size)
+
+    @property
+    def meta(self) -> dict:
+        (n,) = _LEN.unpack_from(self._mm, self._meta_off)
+        off = self._meta_off + _LEN.size
+        meta = {}
+        for _ in range(n):
+            k = self._str(off)
+            off += _LEN.size + len(k.encode("utf-8"))
+            v = self._str(off)
+            off += _LEN.size + len(v.encode("utf-8"))
+            meta[k] = v
+        return meta
+
+    def __len__(self):
+        return self.count
+
+    def item_id(self, i: int) -> str:
+        return self._str(self._row(i)[0])
+
+    def menu_titles(self) -> list:
+        """[(itemID, menu_item|None), ...] sin leer ningún contenido."""
+        out = []
+        for i in range(self.count):
+            id_off, menu_off, _ = self._row(i)
+            out.append((self._str(id_off), None if menu_off == NO_MENU else self._str(menu_off)))
+        return out
+
+    def item(self, i: int) -> dict:
+        id_off, menu_off, cont_off = self._row(i)
+        return {
+            "itemID": self._str(id_off),
+            "menu_item": None if menu_off == NO_MENU else self._str(menu_off),
+            "contenido": self._str(cont_off),
+        }
+
+    def get(self, item_id: str):
+        if self._ids is None:
+            self._ids = {self.item_id(i): i for i in range(self.count)}
+        i = self._ids.get(item_id)
+        return None if i is None else self.item(i)
+
+    def items(self):
+        for i in range(self.count):
+            yield self.item(i)
+
+    def to_dict(self) -> dict:
+        return {"meta": self.meta, "items": list(self.items())}
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._f.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_bin(path: str) -> dict:
+    with HptxBinReader(path) as r:
+        return r.to_dict()
+
+# ----------------------------- Conversores -----------------------------
+def json_to_bin(json_path: str, bin_path: str = None) -> str:
+    bin_path = bin_path or os.path.splitext(json_path)[0] + ".hptxb"
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    write_bin(data, bin_path)
+    return bin_path
+
+def bin_to_json(bin_path: str, json_path: str = None) -> str:
+    json_path = json_path or os.path.splitext(bin_path)[0] + ".json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(read_bin(bin_path), f, ensure_ascii=False, indent=2)
+    return json_path
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: py hipertex_bin.py <archivo_parsed.json | archivo.hptxb> [salida] [--menu]")
+        sys.exit(1)
+    args = [a for a in sys.argv[1:] if a != "--menu"]
+    src = args[0]
+    dst = args[1] if len(args) > 1 else None
+    if src.lower().endswith(".hptxb"):
+        if "--menu" in sys.argv:
+            with HptxBinReader(src) as r:
+                for item_id, title in r.menu_titles():
+                    print(f"{item_id}  {title or ''}")
+            return
+        out = bin_to_json(src, dst)
+    else:
+        out = json_to_bin(src, dst)
+    print(f"[OK] Archivo guardado como {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_cache.py — Caché persistente de resultados de parseo HIPERTEX
+---------------------------------------------------------------------
+Guarda en disco (SQLite, sin dependencias externas) el resultado de parsear
+cada archivo, indexado por el hash SHA-256 de su contenido. Lo comparten
+parser_hipertex.py, build_catalog.py y generar_tutorial_hipertex.py.
+
+- Un archivo sin cambios (misma ruta, tamaño y st_mtime_ns) cuesta un stat
+  y una consulta: no se vuelve a leer ni a hashear, y la fecha de uso de su
+  resultado solo se reescribe si tiene más de ATIME_RESOLUTION segundos.
+- Si el archivo cambió de fecha pero no de contenido (copia, checkout), se
+  re-hashea y se reutiliza el resultado ya calculado.
+- Tamaño acotado: al superar el máximo se expulsan las entradas usadas hace
+  más tiempo (LRU).
+- Si el archivo cambia mientras se hashea o se parsea, el resultado se devuelve
+  pero no se guarda (quedaría asociado a un tamaño y fecha que ya no son suyos).
+- Una vez al día se borran las rutas que ya no existen (tabla files).
+- Una conexión por hilo (y por proceso): se puede usar desde hilos de trabajo
+  (asyncio.to_thread, ThreadPoolExecutor).
+
+Configuración por variables de entorno:
+  HIPERTEX_CACHE         ruta del .sqlite3 (por defecto ~/.cache/hipertex/parse_cache.sqlite3)
+                         o "off" para desactivarla.
+  HIPERTEX_CACHE_MAX_MB  tamaño máximo de los resultados guardados (por defecto 256)
+
+  py hipertex_cache.py            # estado
+  py hipertex_cache.py --prune    # olvidar ya las rutas borradas
+  py hipertex_cache.py --clear    # vaciarla
+
+Uso:
+  import hipertex_cache
+  data = hipertex_cache.cached(path, "parse", funcion_que_parsea)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Cambiar al modificar el formato de algún resultado para invalidar lo guardado
+CACHE_VERSION = "1"
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "hipertex", "parse_cache.sqlite3")
+DEFAULT_MAX_MB = 256
+PRUNE_EVERY = 24 * 3600  # segundos entre limpiezas de rutas borradas
+ATIME_RESOLUTION = 3600  # la LRU no necesita más precisión: un acierto no escribe si el atime es más reciente
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    digest TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    data   BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    atime  REAL NOT NULL,
+    PRIMARY KEY (digest, kind)
+);
+CREATE INDEX IF NOT EXISTS results_atime ON results (atime);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_local = threading.local()  # conn, key: sqlite3 no deja usar una conexión desde otro hilo
+
+def cache_path() -> str:
+    return os.environ.get("HIPERTEX_CACHE") or DEFAULT_PATH
+
+def enabled() -> bool:
+    return cache_path().lower() not in ("off", "0", "no", "false")
+
+def max_bytes() -> int:
+    try:
+        return int(float(os.environ.get("HIPERTEX_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+    except ValueError:
+        return DEFAULT_MAX_MB * 1024 * 1024
+
+def _connect():
+    path = cache_path()
+    # Una conexión por hilo y proceso: no reutilizar la heredada tras un fork (--dir --jobs)
+    key = (path, os.getpid())
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.key == key:
+        return conn
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _local.conn, _local.key = conn, key
+    _maybe_prune(conn)
+    return conn
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _evict(conn, limit: int):
+    total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+    if total <= limit:
+        return
+    # Expulsar las entradas menos usadas hasta quedar por debajo del límite
+    freed = 0
+    victims = []
+    for digest, kind, nbytes in conn.execute("SELECT digest, kind, nbytes FROM results ORDER BY atime"):
+        victims.append((digest, kind))
+        freed += nbytes
+        if total - freed <= limit:
+            break
+    conn.executemany("DELETE FROM results WHERE digest = ? AND kind = ?", victims)
+    conn.execute("DELETE FROM files WHERE digest NOT IN (SELECT digest FROM results)")
+
+def _prune(conn) -> int:
+    gone = [(p,) for (p,) in conn.execute("SELECT path FROM files") if not os.path.exists(p)]
+    with conn:
+        conn.executemany("DELETE FROM files WHERE path = ?", gone)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('pruned_at', ?)", (str(time.time()),))
+    return len(gone)
+
+def _maybe_prune(conn):
+    # Sin esto, las filas de archivos borrados solo desaparecían al expulsar resultados
+    row = conn.execute("SELECT value FROM meta WHERE key = 'pruned_at'").fetchone()
+    if row is None or time.time() - float(row[0]) >= PRUNE_EVERY:
+        _prune(conn)
+
+def prune() -> int:
+    """Borra de la caché las rutas que ya no existen. Devuelve cuántas."""
+    return _prune(_connect())
+
+def _same_stat(path: str, st: os.stat_result) -> bool:
+    try:
+        now = os.stat(path)
+    except OSError:
+        return False
+    return now.st_size == st.st_size and now.st_mtime_ns == st.st_mtime_ns
+
+def _digest(conn, path: str, st: os.stat_result) -> str:
+    key = os.path.abspath(path)
+    row = conn.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (key,)).fetchone()
+    if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+        return row[2]
+    digest = file_digest(path)
+    if not _same_stat(path, st):
+        return digest  # se escribió mientras se leía: el hash no corresponde a st
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                     (key, st.st_size, st.st_mtime_ns, digest))
+    return digest
+
+def digest(path: str, st: os.stat_result = None) -> str:
+    """SHA-256 del contenido de path; si no cambió de tamaño ni de fecha, sale de la caché sin leerlo."""
+    if not enabled():
+        return file_digest(path)
+    try:
+        return _digest(_connect(), path, st or os.stat(path))
+    except sqlite3.Error as e:
+        sys.stderr.write(f"[WARN] Caché HIPERTEX no disponible: {e}\n")
+        return file_digest(path)
+
+def cached(path: str, kind: str, compute, st: os.stat_result = None):
+    """
+    Devuelve compute(path) usando la caché. kind distingue resultados distintos
+    sobre el mismo contenido (p. ej. "parse" del parser, "catalog" del catálogo).
+    st permite reutilizar un os.stat() que el llamador ya tenga hecho.
+    El resultado debe ser serializable a JSON. Si la caché falla (disco de solo
+    lectura, base bloqueada...), simplemente se calcula sin ella.
+    """
+    if not enabled():
+        return compute(path)
+    try:
+        conn = _connect()
+        st = st or os.stat(path)
+        kind_v = f"{kind}:{CACHE_VERSION}"
+        digest = _digest(conn, path, st)
+
+        hit = conn.execute("SELECT data, atime FROM results WHERE digest = ? AND kind = ?",
+                           (digest, kind_v)).fetchone()
+        if hit:
+            now = time.time()
+            if now - hit[1] >= ATIME_RESOLUTION:
+                with conn:
+                    conn.execute("UPDATE results SET atime = ? WHERE digest = ? AND kind = ?", (now, digest, kind_v))
+            return json.loads(hit[0])
+    except (sqlite3.Error, OSError) as e:
+        sys.stderr.write(f"[WARN] Caché HIPERTEX no disponible: {e}\n")
+        return compute(path)
+
+    result = compute(path)
+    if not _same_stat(path, st):
+        return result  # cambió mientras se parseaba: no se guarda
+    try:
+        blob = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                         (digest, kind_v, blob, len(blob), time.time()))
+            _evict(conn, max_bytes())
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        sys.stderr.write(f"[WARN] No se pudo guardar en la caché HIPERTEX: {e}\n")
+    return result
+
+def clear():
+    """Vacía la caché (útil tras cambiar de versión del parser)."""
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM results")
+        conn.execute("DELETE FROM files")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--clear":
+        clear()
+        print(f"[OK] Caché vaciada: {cache_path()}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "--prune":
+        print(f"[OK] {prune()} rutas borradas olvidadas: {cache_path()}")
+    else:
+        conn = _connect()
+        n, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+        print(f"Caché: {cache_path()}\n  resultados: {n}  tamaño: {total / (1024 * 1024):.2f} MB / {max_bytes() / (1024 * 1024):.0f} MB")
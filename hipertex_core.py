@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_core.py — Núcleo compartido del formato HIPERTEX
+--------------------------------------------------------
+Expresiones, utilidades y el tokenizador de una sola pasada que usan
+parser_hipertex.py y build_catalog.py. Con scan() se obtienen en una
+lectura los metadatos, el número de ##itemID y de ##menu-item y un resumen
+por item (o los items completos), sin volver a recorrer el texto.
+
+Requisitos: NO requiere dependencias externas.
+"""
+import json
+import os
+import re
+import sys
+
+# ---------------------------- Expresiones ----------------------------
+META_RE = re.compile(r"##HIPERTEX-META BEGIN([\s\S]*?)##HIPERTEX-META END", re.M)
+ITEM_RE = re.compile(r"^##itemID:(.+)$", re.M)
+MENU_RE = re.compile(r"##menu-item BEGIN([\s\S]*?)##menu-item END", re.M)
+CONT_RE = re.compile(r"##Contenido BEGIN([\s\S]*?)##Contenido END", re.M)
+# Igual que ITEM_RE sin el ancla ^ (que impide a re buscar el prefijo literal);
+# _id_lines descarta luego lo que no empieza línea.
+_ID_SCAN_RE = re.compile(r"##itemID:(.+)")
+
+# ---------------------------- Utilidades -----------------------------
+def sanitize_id(raw: str) -> str:
+    # Mantiene dígitos/guiones/underscore; quita espacios y raro
+    return re.sub(r"[^\w\-]", "_", str(raw).strip())
+
+def strip_one_newline(s: str) -> str:
+    # Quita solo UN salto de línea al borde. Equivale a re.sub(r"^\n|\n$", "", s),
+    # que al final puede llevarse hasta dos ("\n$" también casa antes del último \n).
+    start = 1 if s[:1] == "\n" else 0
+    end = len(s)
+    if end > start and s[end - 1] == "\n":
+        end -= 1
+        if end > start and s[end - 1] == "\n":
+            end -= 1
+    return s[start:end]
+
+def _meta_from_block(block: str) -> dict:
+    meta = {}
+    for line in block.strip().splitlines():
+        line = re.sub(r"^\s*#.*$", "", line).strip()
+        if not line:
+            continue
+        if ":" in line:
+            k, v = line.split(":", 1)
+            meta[k.strip()] = v.strip()
+    return meta
+
+def parse_meta(src: str):
+    m = META_RE.search(src)
+    if not m:
+        return {}, src
+    rest = src[:m.start()] + src[m.end():]
+    return _meta_from_block(m.group(1)), rest
+
+# ------------------------- Parsing principal -------------------------
+META_BEGIN, META_END = "##HIPERTEX-META BEGIN", "##HIPERTEX-META END"
+MENU_BEGIN, MENU_END = "##menu-item BEGIN", "##menu-item END"
+CONT_BEGIN, CONT_END = "##Contenido BEGIN", "##Contenido END"
+ITEM_PREFIX = "##itemID:"
+CHUNK_SIZE = 1 << 20  # caracteres por lectura cuando fileobj tiene .read()
+
+def _id_lines(text: str):
+    """Coincidencias de ITEM_RE en text (que empieza en inicio de línea)."""
+    for m in _ID_SCAN_RE.finditer(text):
+        i = m.start()
+        if i == 0 or text[i - 1] == "\n":
+            yield m
+
+def count_items(src: str) -> int:
+    """Nº de líneas ##itemID (lo que cuenta ITEM_RE tras normalizar los saltos)."""
+    if "\r" in src:
+        src = src.replace("\r\n", "\n")
+    return sum(1 for _ in _id_lines(src))
+
+def count_menu(src: str) -> int:
+    """Nº de bloques ##menu-item BEGIN..END (lo que cuenta MENU_RE)."""
+    return len(_captures(src, MENU_BEGIN, MENU_END))
+
+def _byte_at(text: str, loc: tuple, pos: int) -> int:
+    """Offset en bytes (UTF-8) del carácter pos de text; loc = (off, corte, off_tras_corte)."""
+    off, split, off2 = loc
+    if pos < split:
+        return off + len(text[:pos].encode("utf-8"))
+    return off2 + len(text[split:pos].encode("utf-8"))
+
+def _pieces(fileobj, size: int = CHUNK_SIZE):
+    """
+    Trozos de líneas completas con los saltos \r\n / \r ya normalizados a \n.
+    Si fileobj tiene .read() se lee en bloques grandes (el escaneo de marcas se
+    hace con str.find/regex sobre todo el bloque); si no, se toma como
+    iterable de líneas.
+    """
+    read = getattr(fileobj, "read", None)
+    if read is None:
+        for line in fileobj:
+            if "\r" in line:
+                line = line.replace("\r\n", "\n").replace("\r", "\n")
+            yield line
+        return
+    rest = ""
+    while True:
+        chunk = read(size)
+        if not chunk:
+            break
+        buf = rest + chunk
+        if "\r" in buf:
+            # Un \r al final puede ser la mitad de un \r\n: se deja para el siguiente bloque
+            tail = "\r" if buf.endswith("\r") else ""
+            buf = buf[:len(buf) - len(tail)].replace("\r\n", "\n").replace("\r", "\n") + tail
+        k = buf.rfind("\n") + 1
+        if k:
+            yield buf[:k]
+            rest = buf[k:]
+        else:
+            rest = buf
+    if rest:
+        yield rest.replace("\r", "\n")
+
+class _MarkerScanner:
+    """
+    Equivalente incremental de MENU_RE / CONT_RE: recibe el texto por trozos
+    (text[lo:hi], siempre cortado en fin de línea) y guarda lo capturado entre
+    BEGIN y el primer END posterior.
+    Con first_only=True se detiene tras la primera captura (como .search()).
+    Si feed recibe loc, también anota en spans los offsets en bytes de cada captura.
+    Con keep=False solo cuenta las capturas (en n), sin guardar texto.
+    """
+    __slots__ = ("begin", "end", "first_only", "keep", "inside", "done", "buf", "parts", "n", "start", "spans")
+
+    def __init__(self, begin: str, end: str, first_only: bool = False, keep: bool = True):
+        self.begin, self.end, self.first_only, self.keep = begin, end, first_only, keep
+        self.n = 0
+        self.inside = False
+        self.done = False
+        self.buf = []
+        self.parts = []
+        self.start = 0
+        self.spans = []
+
+    def feed(self, text: str, lo: int = 0, hi: int = None, loc: tuple = None):
+        if self.done:
+            return
+        if hi is None:
+            hi = len(text)
+        if text.find("##", lo, hi) < 0:
+            if self.inside and self.keep:
+                self.buf.append(text[lo:hi])
+            return
+        pos = lo
+        while True:
+            if not self.inside:
+                i = text.find(self.begin, pos, hi)
+                if i < 0:
+                    return
+                pos = i + len(self.begin)
+                self.inside = True
+                if loc:
+                    self.start = _byte_at(text, loc, pos)
+            else:
+                j = text.find(self.end, pos, hi)
+                if j < 0:
+                    if self.keep:
+                        self.buf.append(text[pos:hi])
+                    return
+                self.n += 1
+                if self.keep:
+                    self.buf.append(text[pos:j])
+                    self.parts.append("".join(self.buf))
+                    self.buf = []
+                self.inside = False
+                if loc:
+                    self.spans.append((self.start, _byte_at(text, loc, j)))
+                pos = j + len(self.end)
+                if self.first_only:
+                    self.done = True
+                    return
+
+def _block_item(id_text: str, menu: _MarkerScanner, cont: _MarkerScanner) -> dict:
+    menu_item = strip_one_newline(menu.parts[0]) if menu.parts else None
+    contenido = "\n".join(strip_one_newline(c) for c in cont.parts) if cont.parts else ""
+    return {"itemID": sanitize_id(id_text), "menu_item": menu_item, "contenido": contenido}
+
+def _captures(text: str, begin: str, end: str, first_only: bool = False) -> list:
+    """Como findall de MENU_RE/CONT_RE (BEGIN hasta el primer END posterior), pero con str.find."""
+    out = []
+    pos = 0
+    while True:
+        i = text.find(begin, pos)
+        if i < 0:
+            return out
+        i += len(begin)
+        j = text.find(end, i)
+        if j < 0:
+            return out
+        out.append(text[i:j])
+        if first_only:
+            return out
+        pos = j + len(end)
+
+class _BlockBuffer:
+    """
+    Texto de un bloque ##itemID mientras está abierto. Sin offsets que seguir,
+    es más rápido extraer menú y contenidos del bloque completo al cerrarlo
+    que recorrerlo trozo a trozo con _MarkerScanner.
+    """
+    __slots__ = ("parts",)
+
+    def __init__(self):
+        self.parts = []
+
+    def feed(self, text: str, lo: int = 0, hi: int = None, loc: tuple = None):
+        self.parts.append(text[lo:hi])
+
+    def item(self, id_text: str) -> dict:
+        block = "".join(self.parts)
+        menu = _captures(block, MENU_BEGIN, MENU_END, first_only=True)
+        conts = _captures(block, CONT_BEGIN, CONT_END)
+        return {
+            "itemID": sanitize_id(id_text),
+            "menu_item": strip_one_newline(menu[0]) if menu else None,
+            "contenido": "\n".join(strip_one_newline(c) for c in conts),
+        }
+
+def _strip_meta(pieces, meta, track=False, meta_span=None):
+    """
+    Deja pasar los trozos de texto. Si meta es un dict, extrae al vuelo el primer
+    bloque ##HIPERTEX-META (lo rellena en meta) y lo quita del flujo, igual que parse_meta.
+    Con track, pieces da pares (texto, loc) y se devuelven pares igual; si además
+    se pasa meta_span (lista), se le añaden los offsets en bytes del bloque quitado.
+    """
+    if meta is None:
+        yield from pieces
+        return
+    found = False
+    pending = None   # trozos crudos del bloque abierto (por si nunca se cierra)
+    prefix = ""
+    prefix_off = begin_off = 0
+    meta_buf = []
+    for entry in pieces:
+        if found:
+            yield entry
+            continue
+        piece, loc = entry if track else (entry, None)
+        if pending is None:
+            i = piece.find(META_BEGIN)
+            if i < 0:
+                yield entry
+                continue
+            pending = []
+            prefix = piece[:i]
+            if track:
+                prefix_off = loc[0]
+                begin_off = _byte_at(piece, loc, i)
+            shift = i + len(META_BEGIN)
+        else:
+            shift = 0
+        pending.append(entry)
+        j = piece.find(META_END, shift)
+        if j < 0:
+            meta_buf.append(piece[shift:])
+            continue
+        meta_buf.append(piece[shift:j])
+        meta.update(_meta_from_block("".join(meta_buf)))
+        found, pending, meta_buf = True, None, []
+        after = j + len(META_END)
+        rest = prefix + piece[after:]
+        if track:
+            rest_off = _byte_at(piece, loc, after)
+            if meta_span is not None:
+                meta_span.extend((begin_off, rest_off))
+        if not rest:
+            continue
+        if track:
+            yield rest, (prefix_off, len(prefix), rest_off)
+        else:
+            yield rest
+    if pending:
+        # BEGIN sin END: no hay metadatos, el texto se procesa como contenido normal
+        yield from pending
+
+def _iter_items(pieces, meta, track, meta_span=None):
+    seen = set()
+    next_suffix = {}  # base -> primer sufijo aún no probado (evita O(n²) con IDs repetidos)
+
+    def finish(it):
+        # Unicidad de itemID y filtrado (ítems con algo que mostrar)
+        base = k = it["itemID"]
+        if k in seen:
+            n = next_suffix.get(base, 2)
+            k = f"{base}-{n}"
+            while k in seen:
+                n += 1
+                k = f"{base}-{n}"
+            next_suffix[base] = n + 1
+        seen.add(k)
+        it["itemID"] = k
+        if it.get("menu_item") or (it.get("contenido") and it["contenido"].strip()):
+            return it
+        return None
+
+    def spans(menu, cont):
+        return {"menu": menu.spans[0] if menu.spans else None, "contenido": cont.spans}
+
+    def close(id_text, menu, cont):
+        # Con track hay un escáner por marca; sin él, menu es el _BlockBuffer del bloque
+        it = finish(_block_item(id_text, menu, cont) if track else menu.item(id_text))
+        if it and track:
+            return it, spans(menu, cont)
+        return it
+
+    id_text = None
+    loc = None
+    menu = cont = None
+    pre = _MarkerScanner(CONT_BEGIN, CONT_END)  # modo sin IDs
+    for piece in _strip_meta(pieces, meta, track, meta_span):
+        if track:
+            piece, loc = piece
+        pos = 0
+        if ITEM_PREFIX in piece:
+            for m in _id_lines(piece):
+                # Lo anterior a la línea ##itemID pertenece al bloque en curso
+                if id_text is not None:
+                    menu.feed(piece, pos, m.start(), loc)
+                    if track:
+                        cont.feed(piece, pos, m.start(), loc)
+                    it = close(id_text, menu, cont)
+                    if it:
+                        yield it
+                else:
+                    pre = None
+                id_text = m.group(1).strip()
+                if track:
+                    menu = _MarkerScanner(MENU_BEGIN, MENU_END, first_only=True)
+                    cont = _MarkerScanner(CONT_BEGIN, CONT_END)
+                else:
+                    menu = _BlockBuffer()
+                pos = m.start()
+        if id_text is not None:
+            menu.feed(piece, pos, None, loc)
+            if track:
+                cont.feed(piece, pos, None, loc)
+        else:
+            pre.feed(piece, pos, None, loc)
+
+    if id_text is not None:
+        it = close(id_text, menu, cont)
+        if it:
+            yield it
+    else:
+        # No hay IDs: cada Contenido es un item; IDs autogenerados 000...
+        for i, c in enumerate(pre.parts):
+            it = finish({"itemID": f"{i:03}", "menu_item": None, "contenido": strip_one_newline(c)})
+            if it:
+                yield (it, {"menu": None, "contenido": pre.spans[i:i + 1]}) if track else it
+
+def iter_items(fileobj, meta: dict = None):
+    """
+    Tokenizador de una sola pasada: consume fileobj (un archivo/StringIO en modo
+    texto, que se lee por bloques, o cualquier iterable de líneas) y va produciendo
+    los items a medida que se cierran; en memoria solo queda el bloque abierto. Si se pasa meta (dict), se rellena con el bloque ##HIPERTEX-META.
+
+    Mismas reglas que parser_hipertex.parse_blocks. Los Contenido previos al
+    primer ##itemID se retienen solo hasta saber si el archivo tiene IDs.
+    """
+    return _iter_items(_pieces(fileobj), meta, False)
+
+def _byte_lines(fb):
+    """
+    Líneas de un archivo binario UTF-8 como pares (texto, loc), con saltos \r\n / \r
+    ya normalizados a \n y loc apuntando al offset en bytes del inicio de la línea.
+    """
+    off = 0
+    first = True
+    for raw in fb:
+        if first:
+            first = False
+            if raw.startswith(b"\xef\xbb\xbf"):
+                raw = raw[3:]
+                off = 3
+        pieces = [raw]
+        if b"\r" in raw:
+            # \r suelto también es fin de línea (igual que la lectura en modo texto)
+            pieces, start = [], 0
+            i = raw.find(b"\r")
+            while i >= 0:
+                if raw[i + 1:i + 2] != b"\n":
+                    pieces.append(raw[start:i + 1])
+                    start = i + 1
+                i = raw.find(b"\r", i + 1)
+            pieces.append(raw[start:])
+        for piece in pieces:
+            if not piece:
+                continue
+            text = piece.decode("utf-8")
+            if text.endswith("\r\n"):
+                text = text[:-2] + "\n"
+            elif text.endswith("\r"):
+                text = text[:-1] + "\n"
+            yield text, (off, sys.maxsize, 0)
+            off += len(piece)
+
+def iter_item_offsets(fb, meta: dict = None, meta_span: list = None):
+    """
+    Como iter_items, pero sobre un archivo .hptx abierto en binario (UTF-8) y
+    devolviendo pares (item, spans), donde spans = {"menu": (ini, fin) | None,
+    "contenido": [(ini, fin), ...]} son offsets en bytes del texto capturado.
+    meta_span (lista) recibe (ini, fin) del bloque META quitado, si lo hay.
+    """
+    return _iter_items(_byte_lines(fb), meta, True, meta_span)
+
+# ------------------------------ Resumen ------------------------------
+def _counted(pieces, counts: dict):
+    """
+    Deja pasar los trozos contando, sobre el texto completo (META incluido),
+    los ##itemID al inicio de línea y los bloques ##menu-item BEGIN..END.
+    """
+    menus = _MarkerScanner(MENU_BEGIN, MENU_END, keep=False)
+    ids = 0
+    for piece in pieces:
+        if ITEM_PREFIX in piece:
+            ids += count_items(piece)
+        menus.feed(piece)
+        yield piece
+    counts["items_count"] = ids
+    counts["menu_count"] = menus.n
+
+def scan(fileobj, full: bool = False) -> dict:
+    """
+    Una sola pasada sobre fileobj (como en iter_items). Devuelve:
+      meta         metadatos (##HIPERTEX-META)
+      items_count  nº de líneas ##itemID
+      menu_count   nº de bloques ##menu-item
+      items        resumen por item {"itemID", "menu_item", "chars"} o, con
+                   full=True, los items completos (como parse_hipertex)
+    """
+    meta, counts = {}, {}
+    items = []
+    for it in _iter_items(_counted(_pieces(fileobj), counts), meta, False):
+        if not full:
+            it = {"itemID": it["itemID"], "menu_item": it["menu_item"], "chars": len(it["contenido"])}
+        items.append(it)
+    return {"meta": meta, "items_count": counts["items_count"], "menu_count": counts["menu_count"], "items": items}
+
+# --------------------------- JSON HIPERTEX ---------------------------
+_WS = " \t\r\n"
+_NUM_TAIL = "0123456789.eE+-"
+_ITEMS_ERROR = "El JSON debe ser una lista o un objeto con clave 'items' que sea lista."
+
+class _JsonStream:
+    """Búfer de lectura para decodificar un JSON grande valor a valor con raw_decode."""
+
+    def __init__(self, fileobj, size: int = CHUNK_SIZE):
+        self.f, self.size = fileobj, size
+        self.buf, self.pos, self.eof = "", 0, False
+        self.decoder = json.JSONDecoder()
+
+    def _more(self) -> bool:
+        if self.eof:
+            return False
+        # Leer al menos lo que ya hay en el búfer: un valor enorme se completa en O(n)
+        chunk = self.f.read(max(self.size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter no blanco (sin consumirlo); "" al final del archivo."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"JSON inválido: se esperaba uno de {chars!r} y se encontró {c or 'fin de archivo'!r}")
+        self.pos += 1
+        return c
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._more():
+                    continue
+                raise
+            # Un número al borde del búfer puede seguir en la lectura siguiente ("1" de "1.5e3")
+            j = end
+            while j < len(self.buf) and self.buf[j] in _NUM_TAIL:
+                j += 1
+            if j == len(self.buf) and self._more():
+                continue
+            self.pos = end
+            return obj
+
+    def array(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+def iter_json_items(fileobj, meta: dict = None):
+    """
+    Recorre los items de un JSON HIPERTEX (lista, o {"items": [...]} como el de
+    parser_hipertex) de uno en uno, sin cargar el documento entero. Si se pasa
+    meta (dict), se rellena con las demás claves que aparezcan antes de "items".
+    """
+    s = _JsonStream(fileobj)
+    first = s.peek()
+    if first == "[":
+        yield from s.array()
+        return
+    if first != "{":
+        raise ValueError(_ITEMS_ERROR)
+    s.pos += 1
+    if s.peek() == "}":
+        raise ValueError(_ITEMS_ERROR)
+    while True:
+        key = s.value()
+        s.expect(":")
+        if key == "items" and s.peek() == "[":
+            yield from s.array()
+            return
+        val = s.value()
+        if meta is not None:
+            meta[key] = val
+        if s.expect(",}") == "}":
+            raise ValueError(_ITEMS_ERROR)
+
+# ---------- Recorrido de carpetas ----------
+# Carpetas que no se recorren al buscar .hptx (parser --dir, verificador --dir, catálogo, bench)
+SKIP_DIRS = (".git", "venv", ".venv", "__pycache__", "node_modules")
+
+def find_hptx(root: str, skip_dirs=SKIP_DIRS) -> list:
+    """Rutas de todos los .hptx bajo root (recursivo, sin entrar en skip_dirs), ordenadas."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in skip_dirs]
+        found.extend(os.path.join(dirpath, n) for n in filenames if n.lower().endswith(".hptx"))
+    return sorted(found)
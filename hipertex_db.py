@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_db.py — Catálogo HIPERTEX HUB en SQLite (con FTS5)
+----------------------------------------------------------
+Alternativa a catalog.json para hubs grandes: build_catalog.py --format sqlite
+guarda tutoriales, tags e items en una base SQLite, con un índice FTS5 sobre
+los títulos de menú y los contenidos. Las consultas (por tag, por fecha, texto
+completo) usan índices en lugar de cargar el catálogo entero.
+
+En cada ejecución solo se reescriben las filas de los tutoriales nuevos o
+modificados (tamaño o st_mtime_ns distintos) y se borran los que ya no existen.
+
+Tablas:
+  hub(key, value)                               nombre, generated_at, base_path, count
+  tutorials(id, relpath, file, size_bytes, mtime, mtime_ns, title, created,
+            items_count, menu_count, paths, error)
+  tags(tutorial_id, tag)
+  items(id, tutorial_id, pos, item_id, menu_item, contenido)
+  items_fts                                     FTS5 (menu_item, contenido), sin tildes
+
+Uso:
+  py hipertex_db.py catalog.sqlite3 --tag qr               # tutoriales con ese tag, más recientes primero
+  py hipertex_db.py catalog.sqlite3 --search "apps script doPost"
+
+  from hipertex_db import CatalogDB
+  with CatalogDB("catalog.sqlite3") as db:
+      db.by_tag("qr")
+      db.search("apps script doPost", limit=5)
+"""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import hipertex_core
+
+SCHEMA_VERSION = "1"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hub (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS tutorials (
+    id          INTEGER PRIMARY KEY,
+    relpath     TEXT NOT NULL UNIQUE,
+    file        TEXT NOT NULL,
+    size_bytes  INTEGER,
+    mtime       TEXT,
+    mtime_ns    INTEGER,
+    title       TEXT,
+    created     TEXT,
+    items_count INTEGER,
+    menu_count  INTEGER,
+    paths       TEXT,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS tutorials_mtime ON tutorials (mtime);
+CREATE TABLE IF NOT EXISTS tags (
+    tutorial_id INTEGER NOT NULL REFERENCES tutorials (id) ON DELETE CASCADE,
+    tag         TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag, tutorial_id);
+CREATE INDEX IF NOT EXISTS tags_tutorial ON tags (tutorial_id);
+CREATE TABLE IF NOT EXISTS items (
+    id          INTEGER PRIMARY KEY,
+    tutorial_id INTEGER NOT NULL REFERENCES tutorials (id) ON DELETE CASCADE,
+    pos         INTEGER NOT NULL,
+    item_id     TEXT NOT NULL,
+    menu_item   TEXT,
+    contenido   TEXT
+);
+CREATE INDEX IF NOT EXISTS items_tutorial ON items (tutorial_id, pos);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5 (
+    menu_item, contenido,
+    content='items', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, menu_item, contenido) VALUES (new.id, new.menu_item, new.contenido);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, menu_item, contenido) VALUES ('delete', old.id, old.menu_item, old.contenido);
+END;
+"""
+
+def connect(path: str):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        conn.executescript(_SCHEMA)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        raise RuntimeError(f"SQLite sin soporte FTS5 ({e}); usa --format json") from e
+    return conn
+
+def read_items(path: str) -> list:
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        return hipertex_core.scan(f, full=True)["items"]
+
+# ---------- Escritura ----------
+def write_catalog_db(db_path: str, hub: dict, rows: list, load_items=read_items) -> dict:
+    """
+    Sincroniza la base con el catálogo. rows: [(entry, ruta, stat), ...] con entry
+    como las de catalog["tutorials"]. Solo se reescriben los tutoriales cuyo tamaño
+    o st_mtime_ns cambió, o que se guardaron con error; los que ya no están en rows
+    se borran (con sus items y tags).
+    """
+    conn = connect(db_path)
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+    try:
+        with conn:
+            known = {rel: (tid, size, mtime_ns, paths, error)
+                     for tid, rel, size, mtime_ns, paths, error in
+                     conn.execute("SELECT id, relpath, size_bytes, mtime_ns, paths, error FROM tutorials")}
+            seen = set()
+            for entry, path, st in rows:
+                rel = entry["relpath"]
+                seen.add(rel)
+                paths = json.dumps(entry["paths"], ensure_ascii=False) if entry.get("paths") else None
+                prev = known.get(rel)
+                # Una fila guardada con error (p. ej. ilegible en esa pasada) se rehace aunque el stat coincida
+                if (prev and st and "error" not in entry and prev[4] is None
+                        and prev[1] == st.st_size and prev[2] == st.st_mtime_ns and prev[3] == paths):
+                    stats["unchanged"] += 1
+                    continue
+                values = (entry["file"], st.st_size if st else entry.get("size_bytes"), entry.get("mtime"),
+                          st.st_mtime_ns if st else None, entry.get("title"), entry.get("created"),
+                          entry.get("items_count"), entry.get("menu_count"), paths, entry.get("error"))
+                if prev:
+                    # Se actualiza la fila (mismo id) y se rehacen sus tags e items
+                    tid = prev[0]
+                    conn.execute("UPDATE tutorials SET file = ?, size_bytes = ?, mtime = ?, mtime_ns = ?, title = ?,"
+                                 " created = ?, items_count = ?, menu_count = ?, paths = ?, error = ? WHERE id = ?",
+                                 values + (tid,))
+                    conn.execute("DELETE FROM tags WHERE tutorial_id = ?", (tid,))
+                    conn.execute("DELETE FROM items WHERE tutorial_id = ?", (tid,))
+                else:
+                    tid = conn.execute(
+                        "INSERT INTO tutorials (relpath, file, size_bytes, mtime, mtime_ns, title, created,"
+                        " items_count, menu_count, paths, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (rel,) + values).lastrowid
+                conn.executemany("INSERT INTO tags VALUES (?, ?)", [(tid, t) for t in entry.get("tags") or []])
+                if "error" not in entry:
+                    try:
+                        items = load_items(path)
+                    except OSError as e:
+                        sys.stderr.write(f"[WARN] {rel}: {e}\n")
+                        items = []
+                    conn.executemany(
+                        "INSERT INTO items (tutorial_id, pos, item_id, menu_item, contenido) VALUES (?, ?, ?, ?, ?)",
+                        [(tid, i, it["itemID"], it.get("menu_item"), it.get("contenido"))
+                         for i, it in enumerate(items)])
+                stats["written"] += 1
+            gone = [(known[rel][0],) for rel in known if rel not in seen]
+            conn.executemany("DELETE FROM tutorials WHERE id = ?", gone)
+            stats["removed"] = len(gone)
+            conn.executemany("INSERT OR REPLACE INTO hub VALUES (?, ?)",
+                             [(k, str(v)) for k, v in dict(hub, schema_version=SCHEMA_VERSION).items()])
+    finally:
+        conn.close()
+    return stats
+
+# ---------- Consulta ----------
+class CatalogDB:
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def hub(self) -> dict:
+        return dict(self.conn.execute("SELECT key, value FROM hub").fetchall())
+
+    def tutorial(self, relpath: str):
+        row = self.conn.execute("SELECT * FROM tutorials WHERE relpath = ?", (relpath,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["tags"] = [t for (t,) in self.conn.execute("SELECT tag FROM tags WHERE tutorial_id = ?", (row["id"],))]
+        entry["paths"] = json.loads(entry["paths"]) if entry["paths"] else None
+        return entry
+
+    def by_tag(self, tag: str, limit: int = 100) -> list:
+        """Tutoriales con ese tag (sin distinguir mayúsculas), más recientes primero."""
+        return [dict(r) for r in self.conn.execute(
+            "SELECT t.relpath, t.title, t.mtime FROM tags g JOIN tutorials t ON t.id = g.tutorial_id"
+            " WHERE g.tag = ? ORDER BY t.mtime DESC LIMIT ?", (tag, limit))]
+
+    def items(self, relpath: str) -> list:
+        return [dict(r) for r in self.conn.execute(
+            "SELECT i.item_id AS itemID, i.menu_item, i.contenido FROM items i"
+            " JOIN tutorials t ON t.id = i.tutorial_id WHERE t.relpath = ? ORDER BY i.pos", (relpath,))]
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Pasos que contienen todos los términos de query, ordenados por bm25 (FTS5)."""
+        terms = _match_terms(query)
+        if not terms:
+            return []
+        match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        return [dict(r) for r in self.conn.execute(
+            "SELECT t.relpath, i.item_id AS itemID, i.menu_item,"
+            " snippet(items_fts, 1, '[', ']', '…', 12) AS snippet, bm25(items_fts) AS score"
+            " FROM items_fts JOIN items i ON i.id = items_fts.rowid JOIN tutorials t ON t.id = i.tutorial_id"
+            " WHERE items_fts MATCH ? ORDER BY score LIMIT ?", (match, limit))]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _match_terms(query: str) -> list:
+    # Palabras de la consulta; cada una va entre comillas en MATCH para que no se
+    # interpreten operadores de FTS5 (AND, OR, NEAR, *, -)
+    return [w for w in query.replace('"', " ").split() if w.strip()]
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Consulta un catálogo HIPERTEX en SQLite (build_catalog.py --format sqlite).")
+    ap.add_argument("db", help="Base generada por build_catalog.py --format sqlite")
+    ap.add_argument("--tag", help="Tutoriales con este tag, más recientes primero")
+    ap.add_argument("--search", help="Búsqueda de texto completo en menús y contenidos")
+    ap.add_argument("--limit", type=int, default=10, help="Máximo de resultados (por defecto: 10)")
+    args = ap.parse_args()
+
+    with CatalogDB(args.db) as db:
+        if args.tag:
+            rows = db.by_tag(args.tag, args.limit)
+            lines = [f"{r['mtime']}  {r['relpath']}" for r in rows]
+        elif args.search:
+            rows = db.search(args.search, args.limit)
+            lines = [f"{r['relpath']}  [{r['itemID']}]  {r['snippet']}" for r in rows]
+        else:
+            hub = db.hub()
+            print(f"{hub.get('name')}: {hub.get('count')} tutoriales (generado {hub.get('generated_at')})")
+            return
+    if not rows:
+        print("❌ Sin resultados.")
+        sys.exit(1)
+    print("\n".join(lines))
+
+if __name__ == "__main__":
+    main()
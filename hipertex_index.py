@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_index.py — Índice de offsets por itemID para tutoriales .hptx
+--------------------------------------------------------------------
+Genera un sidecar compacto (<nombre>_index.json, junto al .hptx) con, para
+cada itemID, los offsets en bytes de su menú y de sus bloques de contenido
+dentro del archivo original. Con él, HptxIndex abre el .hptx con mmap y
+devuelve un solo paso en O(1), sin parsear el tutorial completo.
+
+Formato del sidecar:
+{
+  "version": 1,
+  "source": "tutorial.hptx",
+  "size": 17393,
+  "mtime_ns": 1730716629000000000,
+  "meta": {"title": "..."},
+  "meta_span": [ini, fin] | null,      # bloque META (se excluye al leer)
+  "items": [["000", [ini, fin] | null, [[ini, fin], ...]], ...]
+}
+
+Uso:
+  py hipertex_index.py tutorial.hptx            # crea/actualiza tutorial_index.json
+  py hipertex_index.py tutorial.hptx 003        # muestra el paso 003
+
+  from hipertex_index import HptxIndex
+  with HptxIndex("tutorial.hptx") as idx:
+      paso = idx.get("003")   # {"itemID", "menu_item", "contenido"} como parser_hipertex
+"""
+import json
+import mmap
+import os
+import sys
+
+from parser_hipertex import iter_item_offsets, strip_one_newline
+
+INDEX_VERSION = 1
+
+def index_path(path: str) -> str:
+    return os.path.splitext(path)[0] + "_index.json"
+
+def build_index(path: str):
+    """
+    Parsea path (UTF-8) en una sola pasada y devuelve (data, index): data es el
+    mismo resultado que parser_hipertex.parse_file y index el contenido del sidecar.
+    """
+    st = os.stat(path)
+    meta, meta_span = {}, []
+    items, rows = [], []
+    with open(path, "rb") as fb:
+        for it, spans in iter_item_offsets(fb, meta, meta_span):
+            items.append(it)
+            menu = list(spans["menu"]) if spans["menu"] else None
+            rows.append([it["itemID"], menu, [list(s) for s in spans["contenido"]]])
+    index = {
+        "version": INDEX_VERSION,
+        "source": os.path.basename(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "meta": meta,
+        "meta_span": meta_span or None,
+        "items": rows,
+    }
+    return {"meta": meta, "items": items}, index
+
+def write_index(path: str, index: dict = None) -> str:
+    if index is None:
+        _, index = build_index(path)
+    out = index_path(path)
+    # Aparte y con os.replace: un corte a mitad no deja un índice truncado. Nombre único:
+    # varios hilos o procesos pueden regenerar a la vez el mismo sidecar
+    tmp = f"{out}.{os.urandom(4).hex()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, out)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return out
+
+def _is_fresh(index: dict, st: os.stat_result) -> bool:
+    return (index.get("version") == INDEX_VERSION
+            and index.get("size") == st.st_size
+            and index.get("mtime_ns") == st.st_mtime_ns)
+
+def _text(raw: bytes) -> str:
+    return strip_one_newline(raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n"))
+
+class HptxIndex:
+    """
+    Acceso aleatorio a los pasos de un .hptx a través de su sidecar. Si el
+    sidecar falta o no corresponde al archivo actual (tamaño/mtime), se regenera.
+    """
+
+    def __init__(self, path: str, rebuild: bool = True):
+        self.path = path
+        st = os.stat(path)
+        index = None
+        try:
+            with open(index_path(path), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if index is None or not _is_fresh(index, st):
+            if not rebuild:
+                raise FileNotFoundError(f"Índice ausente o desactualizado: {index_path(path)}")
+            _, index = build_index(path)
+            try:
+                write_index(path, index)
+            except OSError as e:
+                sys.stderr.write(f"[WARN] No se pudo guardar el índice: {e}\n")
+        self.meta = index["meta"]
+        self._meta_span = index.get("meta_span")
+        self._rows = {row[0]: row for row in index["items"]}
+        self._f = None
+        self._mm = None
+
+    def _map(self):
+        if self._mm is None:
+            self._f = open(self.path, "rb")
+            # mmap no admite archivos vacíos
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(self._f.fileno()).st_size else b""
+        return self._mm
+
+    def _slice(self, start: int, end: int) -> str:
+        mm = self._map()
+        ms = self._meta_span
+        if ms and start < ms[1] and ms[0] < end:
+            # La captura envuelve el bloque META, que el parser quita del texto
+            return _text(mm[start:ms[0]] + mm[ms[1]:end])
+        return _text(mm[start:end])
+
+    def ids(self) -> list:
+        return list(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, item_id):
+        return item_id in self._rows
+
+    def get(self, item_id: str):
+        """Devuelve el item (como en parse_hipertex) o None si no existe."""
+        row = self._rows.get(item_id)
+        if row is None:
+            return None
+        _, menu, conts = row
+        return {
+            "itemID": item_id,
+            "menu_item": self._slice(*menu) if menu else None,
+            "contenido": "\n".join(self._slice(s, e) for s, e in conts),
+        }
+
+    def close(self):
+        if self._mm is not None:
+            if isinstance(self._mm, mmap.mmap):
+                self._mm.close()
+            self._f.close()
+            self._mm = self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_item(path: str, item_id: str):
+    with HptxIndex(path) as idx:
+        return idx.get(item_id)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: py hipertex_index.py <archivo.hptx> [itemID]")
+        sys.exit(1)
+    path = sys.argv[1]
+    if len(sys.argv) > 2:
+        item = read_item(path, sys.argv[2])
+        if item is None:
+            print(f"❌ No existe el itemID {sys.argv[2]} en {path}")
+            sys.exit(1)
+        print(json.dumps(item, ensure_ascii=False, indent=2))
+        return
+    out = write_index(path)
+    print(f"[OK] Índice guardado como {out}")
+
+if __name__ == "__main__":
+    main()
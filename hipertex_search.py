@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_search.py — Índices de búsqueda para el HIPERTEX HUB
+-----------------------------------------------------------
+1) Texto completo: títulos de menú y contenidos de todos los pasos del hub,
+   con postings (tutorial, itemID) y consultas ordenadas por BM25. Lo genera
+   build_catalog.py --search junto al catálogo (<out>.search.json).
+2) Títulos: trigramas (sin tildes) de título, nombre de archivo y tags de cada
+   tutorial, para encontrarlo aunque la consulta tenga erratas o no lleve
+   tildes. Lo genera build_catalog.py --titles (<out>.titles.json).
+
+Formato (JSON compacto):
+{
+  "version": 1,
+  "avgdl": 123.4,
+  "files": ["APPSHEET/HPTX/tutorial.hptx", ...],
+  "docs": [[i_file, "003", "Título del paso" | null, longitud], ...],
+  "postings": {"dopost": [doc, tf, +doc, tf, ...], ...}   # doc en deltas crecientes
+}
+
+Los términos se normalizan a minúsculas y sin tildes ("Configuración" → "configuracion").
+Los títulos de menú cuentan TITLE_WEIGHT veces.
+
+Formato de <out>.titles.json:
+{
+  "version": 1,
+  "docs": [["HPTX/tutorial.hptx", "Título", "titulo tutorial tag1 tag2"], ...],   # última: texto normalizado
+  "grams": {" im": [doc, +doc, ...], "imp": [...], ...}                          # doc en deltas crecientes
+}
+
+Uso:
+  py hipertex_search.py catalog.search.json "apps script doPost"
+  py hipertex_search.py catalog.search.json "webhook make" --limit 5
+  py hipertex_search.py catalog.titles.json "inportar datos sheets"
+
+  from hipertex_search import SearchIndex
+  idx = SearchIndex("catalog.search.json")
+  for hit in idx.search("apps script doPost"):
+      print(hit["relpath"], hit["itemID"], hit["score"])
+
+  from hipertex_search import TitleIndex
+  TitleIndex("catalog.titles.json").lookup("inportar datos sheets")
+"""
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter
+
+import hipertex_core
+
+INDEX_VERSION = 1
+TITLES_VERSION = 1
+TITLE_WEIGHT = 2
+K1, B = 1.2, 0.75
+_TOKEN_RE = re.compile(r"\w\w+")
+_WORD_RE = re.compile(r"[^\W_]+")
+_ACCENTS_RE = re.compile("[\u0300-\u036f]")
+
+# ---------- Texto ----------
+def fold(text: str) -> str:
+    """Minúsculas y sin tildes ("Configuración" → "configuracion")."""
+    return _ACCENTS_RE.sub("", unicodedata.normalize("NFKD", text.lower()))
+
+def tokenize(text: str) -> list:
+    """Términos de text: minúsculas, sin tildes, de 2 o más caracteres."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(fold(text))
+
+def trigrams(key: str) -> set:
+    """Trigramas de cada palabra de key (ya normalizado), con un espacio a cada lado."""
+    grams = set()
+    for w in key.split():
+        w = f" {w} "
+        grams.update(w[i:i + 3] for i in range(len(w) - 2))
+    return grams
+
+def title_key(*texts) -> str:
+    """Texto normalizado de un tutorial para el índice de títulos ("TUTORIAL P&P" → "tutorial p p")."""
+    return " ".join(_WORD_RE.findall(fold(" ".join(t for t in texts if t))))
+
+def index_path(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + ".search.json"
+
+def titles_path(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + ".titles.json"
+
+def file_terms(path: str) -> dict:
+    """
+    Términos de cada paso de un .hptx: {"items": [[itemID, menu_item, longitud, {término: tf}], ...]}.
+    Es el resultado por archivo que build_catalog guarda en hipertex_cache (tipo "terms").
+    """
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        items = hipertex_core.scan(f, full=True)["items"]
+    out = []
+    for it in items:
+        tf = Counter(tokenize(it.get("contenido")))
+        for term in tokenize(it.get("menu_item")):
+            tf[term] += TITLE_WEIGHT
+        out.append([it["itemID"], it.get("menu_item"), sum(tf.values()), dict(tf)])
+    return {"items": out}
+
+# ---------- Construcción ----------
+def build_index(files: list) -> dict:
+    """files: [(relpath, terms), ...] con terms como los devuelve file_terms()."""
+    names, docs = [], []
+    postings = {}
+    last = {}  # término -> último doc añadido (los postings guardan deltas)
+    total = 0
+    for i_file, (relpath, terms) in enumerate(files):
+        names.append(relpath)
+        for item_id, menu, length, tf in terms["items"]:
+            doc = len(docs)
+            docs.append([i_file, item_id, menu, length])
+            total += length
+            for term, n in tf.items():
+                postings.setdefault(term, []).extend((doc - last.get(term, 0), n))
+                last[term] = doc
+    return {
+        "version": INDEX_VERSION,
+        "avgdl": round(total / len(docs), 3) if docs else 0.0,
+        "files": names,
+        "docs": docs,
+        "postings": postings,
+    }
+
+def build_title_index(tutorials: list) -> dict:
+    """tutorials: entradas de catalog["tutorials"] (relpath, file, title, tags)."""
+    docs = []
+    grams = {}
+    last = {}  # trigrama -> último doc añadido (los postings guardan deltas)
+    for doc, t in enumerate(tutorials):
+        name = t.get("file") or os.path.basename(t["relpath"])
+        stem = os.path.splitext(name)[0]
+        title = t.get("title") or name
+        # Sin META title, build_catalog usa el nombre del archivo: no repetirlo en la clave
+        key = title_key(stem, "" if title == name else title, " ".join(t.get("tags") or []))
+        docs.append([t["relpath"], title, key])
+        for g in trigrams(key):
+            grams.setdefault(g, []).append(doc - last.get(g, 0))
+            last[g] = doc
+    return {"version": TITLES_VERSION, "docs": docs, "grams": grams}
+
+def write_index(index: dict, path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+# ---------- Consulta ----------
+class SearchIndex:
+    """Consulta BM25 sobre un índice de build_index (dict) o su archivo .search.json."""
+
+    def __init__(self, index):
+        if isinstance(index, str):
+            with open(index, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Versión de índice no soportada: {index.get('version')}")
+        self.files = index["files"]
+        self.docs = index["docs"]
+        self.avgdl = index["avgdl"] or 1.0
+        self._postings = index["postings"]
+
+    def __len__(self):
+        return len(self.docs)
+
+    def postings(self, term: str):
+        """[(doc, tf), ...] de un término ya normalizado."""
+        flat = self._postings.get(term) or []
+        doc = 0
+        out = []
+        for i in range(0, len(flat), 2):
+            doc += flat[i]
+            out.append((doc, flat[i + 1]))
+        return out
+
+    def search(self, query: str, limit: int = 10) -> list:
+        n_docs = len(self.docs)
+        scores = {}
+        for term in set(tokenize(query)):
+            plist = self.postings(term)
+            if not plist:
+                continue
+            df = len(plist)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc, tf in plist:
+                norm = K1 * (1 - B + B * self.docs[doc][3] / self.avgdl)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        best = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+        hits = []
+        for doc, score in best:
+            i_file, item_id, menu, _ = self.docs[doc]
+            hits.append({"relpath": self.files[i_file], "itemID": item_id, "menu_item": menu,
+                         "score": round(score, 4)})
+        return hits
+
+class TitleIndex:
+    """Búsqueda aproximada de tutoriales por título/archivo/tags sobre un índice de trigramas."""
+
+    MAX_CANDIDATES = 64
+    COMMON_RATIO = 0.25  # trigramas en más de este % de tutoriales no generan candidatos
+
+    def __init__(self, index):
+        if isinstance(index, str):
+            with open(index, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        if index.get("version") != TITLES_VERSION:
+            raise ValueError(f"Versión de índice no soportada: {index.get('version')}")
+        self.docs = index["docs"]
+        self._grams = index["grams"]
+        self._doc_grams = {}
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _postings(self, gram: str):
+        doc = 0
+        for delta in self._grams.get(gram) or ():
+            doc += delta
+            yield doc
+
+    def lookup(self, query: str, limit: int = 10, min_score: float = 0.3) -> list:
+        """
+        [{"relpath", "title", "score"}, ...] ordenado por parecido con query.
+        score combina qué parte de los trigramas de la consulta aparece en el
+        tutorial (pesa más) y el coeficiente de Dice entre ambos conjuntos.
+        """
+        q = trigrams(title_key(query))
+        if not q:
+            return []
+        # Candidatos: solo con los trigramas poco frecuentes (si los hay), de más raro a más común
+        by_df = sorted(q, key=lambda g: len(self._grams.get(g) or ()))
+        limit_df = max(1, int(len(self.docs) * self.COMMON_RATIO))
+        rare = [g for g in by_df if len(self._grams.get(g) or ()) <= limit_df] or by_df
+        shared = {}
+        for g in rare:
+            for doc in self._postings(g):
+                shared[doc] = shared.get(doc, 0) + 1
+        candidates = heapq.nlargest(self.MAX_CANDIDATES, shared, key=shared.get)
+
+        hits = []
+        for doc in candidates:
+            d = self._doc_grams.get(doc)
+            if d is None:
+                d = self._doc_grams[doc] = trigrams(self.docs[doc][2])
+            common = len(q & d)
+            score = 0.75 * common / len(q) + 0.25 * 2 * common / (len(q) + len(d))
+            if score >= min_score:
+                hits.append((score, doc))
+        hits.sort(key=lambda h: (-h[0], h[1]))
+        return [{"relpath": self.docs[doc][0], "title": self.docs[doc][1], "score": round(score, 4)}
+                for score, doc in hits[:limit]]
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Busca en los índices del HIPERTEX HUB (texto completo o títulos).")
+    ap.add_argument("index", help="Índice generado por build_catalog.py --search / --titles (*.search.json | *.titles.json)")
+    ap.add_argument("query", help="Texto a buscar")
+    ap.add_argument("--limit", type=int, default=10, help="Máximo de resultados (por defecto: 10)")
+    args = ap.parse_args()
+
+    with open(args.index, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if "grams" in index:
+        hits = TitleIndex(index).lookup(args.query, args.limit)
+        lines = [f"{h['score']:6.3f}  {h['relpath']}  ({h['title']})" for h in hits]
+    else:
+        hits = SearchIndex(index).search(args.query, args.limit)
+        lines = [f"{h['score']:8.3f}  {h['relpath']}  [{h['itemID']}]  {h['menu_item'] or ''}" for h in hits]
+    if not hits:
+        print(f"❌ Sin resultados para: {args.query}")
+        sys.exit(1)
+    print("\n".join(lines))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_server.py — Servicio HTTP de solo lectura para el HIPERTEX HUB
+---------------------------------------------------------------------
+Sirve el catálogo de build_catalog.py, tutoriales y pasos sueltos, y búsquedas
+sobre el índice de --search, sin tener que publicar archivos estáticos.
+
+  GET /catalog                                  catalog.json tal cual
+  GET /tutorials/{relpath}                      {"meta", "items"} del .hptx (como *_parsed.json)
+  GET /tutorials/{relpath}/items/{itemID}       un solo paso
+  GET /search?q=apps+script&limit=10            BM25 sobre <catalog>.search.json (ver hipertex_search.py)
+
+Los tutoriales parseados se guardan en una LRU en memoria limitada por tamaño
+(HIPERTEX_LRU_MB, por defecto 64 MB de .hptx): con muchos clientes, cada archivo
+se parsea una sola vez. En cada petición se compara tamaño y st_mtime_ns del
+.hptx y, si cambió, se vuelve a parsear. Todas las respuestas llevan un ETag
+(sha256 del contenido) y las peticiones con If-None-Match reciben 304.
+Solo se sirven archivos que figuran en el catálogo.
+
+Uso (Windows / PowerShell):
+  py -m pip install fastapi uvicorn
+  py build_catalog.py --root . --recursive --search
+  py hipertex_server.py --root . --catalog catalog.json --port 8000
+  uvicorn hipertex_server:app        # configuración por HIPERTEX_ROOT, HIPERTEX_CATALOG, HIPERTEX_LRU_MB
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import hipertex_core
+
+try:
+    import hipertex_search  # /search (opcional, mismo directorio)
+except ImportError:
+    hipertex_search = None
+
+try:
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import Response
+except ImportError:
+    FastAPI = None
+
+DEFAULT_LRU_MB = 64
+
+# ---------- Caché de tutoriales ----------
+class TutorialCache:
+    """
+    LRU de tutoriales parseados: {ruta: (tamaño, st_mtime_ns, etag, datos)}.
+    max_bytes limita la suma de los tamaños de los .hptx en memoria (el último
+    que entra se conserva aunque él solo lo supere).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_LRU_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}  # ruta -> Lock: dos clientes a la vez no parsean el mismo archivo dos veces
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _fresh(self, path: str, st: os.stat_result):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+        return None
+
+    def get(self, path: str):
+        """(etag, {"meta", "items"}) del .hptx en path; lo parsea si no está o cambió."""
+        st = os.stat(path)
+        entry = self._fresh(path, st)
+        if entry:
+            return entry[2], entry[3]
+        with self._lock:
+            loading = self._loading.setdefault(path, threading.Lock())
+        with loading:
+            try:
+                st = os.stat(path)
+                entry = self._fresh(path, st)  # otro hilo pudo parsearlo mientras esperábamos
+                if entry:
+                    return entry[2], entry[3]
+                entry = (st.st_size, st.st_mtime_ns) + parse_tutorial(path)
+                with self._lock:
+                    self.misses += 1
+                    old = self._entries.pop(path, None)
+                    if old:
+                        self.bytes -= old[0]
+                    self._entries[path] = entry
+                    self.bytes += entry[0]
+                    while self.bytes > self.max_bytes and len(self._entries) > 1:
+                        _, evicted = self._entries.popitem(last=False)
+                        self.bytes -= evicted[0]
+            finally:
+                # También si el archivo desapareció o no se pudo parsear
+                with self._lock:
+                    self._loading.pop(path, None)
+        return entry[2], entry[3]
+
+def parse_tutorial(path: str):
+    """(etag, {"meta", "items"}) de un .hptx: el etag es el sha256 de sus bytes."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    text = raw.decode("utf-8-sig", errors="replace")
+    data = hipertex_core.scan(io.StringIO(text, newline=None), full=True)
+    return hashlib.sha256(raw).hexdigest(), {"meta": data["meta"], "items": data["items"]}
+
+class _Watched:
+    """Archivo JSON que se vuelve a leer solo cuando cambian su tamaño o st_mtime_ns."""
+
+    def __init__(self, path: str, load):
+        self.path, self.load = path, load
+        self._key = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """(etag, bytes, valor) o None si el archivo no existe."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        with self._lock:
+            if self._key != (st.st_size, st.st_mtime_ns):
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                self._value = (hashlib.sha256(raw).hexdigest(), raw, self.load(raw))
+                self._key = (st.st_size, st.st_mtime_ns)
+            return self._value
+
+# ---------- Hub ----------
+class Hub:
+    def __init__(self, root: str, catalog: str, lru_bytes: int = DEFAULT_LRU_MB * 1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.catalog = _Watched(catalog, self._load_catalog)
+        index = hipertex_search.index_path(catalog) if hipertex_search is not None else None
+        self.search_index = _Watched(index, lambda raw: hipertex_search.SearchIndex(json.loads(raw))) if index else None
+        self.cache = TutorialCache(lru_bytes)
+
+    @classmethod
+    def from_env(cls):
+        try:
+            mb = float(os.environ.get("HIPERTEX_LRU_MB", DEFAULT_LRU_MB))
+        except ValueError:
+            mb = DEFAULT_LRU_MB
+        return cls(os.environ.get("HIPERTEX_ROOT", "."), os.environ.get("HIPERTEX_CATALOG", "catalog.json"),
+                   int(mb * 1024 * 1024))
+
+    @staticmethod
+    def _load_catalog(raw: bytes) -> set:
+        # Del catálogo solo hace falta saber qué relpaths se pueden servir
+        data = json.loads(raw)
+        return {t["relpath"] for t in data.get("tutorials", []) if "error" not in t}
+
+    def tutorial(self, relpath: str):
+        """(etag, datos) del tutorial, o None si no está en el catálogo."""
+        catalog = self.catalog.get()
+        if catalog is None or relpath not in catalog[2]:
+            return None
+        path = os.path.normpath(os.path.join(self.root, *relpath.split("/")))
+        if not path.startswith(os.path.join(self.root, "")):
+            return None  # ".." o ruta absoluta: nunca fuera de root, aunque lo diga el catálogo
+        try:
+            return self.cache.get(path)
+        except OSError:
+            return None
+
+# ---------- API ----------
+def _etag_response(request, etag: str, body) -> "Response":
+    etag = f'"{etag}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def create_app(hub: Hub):
+    app = FastAPI(title="HIPERTEX HUB")
+
+    @app.get("/catalog")
+    def get_catalog(request: Request):
+        catalog = hub.catalog.get()
+        if catalog is None:
+            raise HTTPException(404, f"No existe el catálogo {hub.catalog.path}")
+        return _etag_response(request, catalog[0], catalog[1])
+
+    # Va antes que /tutorials/{relpath}: esa ruta también aceptaría ".../items/003"
+    @app.get("/tutorials/{relpath:path}/items/{item_id}")
+    def get_item(relpath: str, item_id: str, request: Request):
+        found = hub.tutorial(relpath)
+        if found is None:
+            raise HTTPException(404, f"Tutorial no encontrado: {relpath}")
+        etag, data = found
+        for it in data["items"]:
+            if it["itemID"] == item_id:
+                return _etag_response(request, f"{etag}-{item_id}", it)
+        raise HTTPException(404, f"itemID no encontrado: {item_id}")
+
+    @app.get("/tutorials/{relpath:path}")
+    def get_tutorial(relpath: str, request: Request):
+        found = hub.tutorial(relpath)
+        if found is None:
+            raise HTTPException(404, f"Tutorial no encontrado: {relpath}")
+        return _etag_response(request, *found)
+
+    @app.get("/search")
+    def search(q: str, request: Request, limit: int = 10):
+        index = hub.search_index.get() if hub.search_index else None
+        if index is None:
+            raise HTTPException(404, "Sin índice de búsqueda: genera el catálogo con build_catalog.py --search")
+        limit = max(1, min(limit, 100))
+        etag = hashlib.sha256(f"{index[0]}\n{q}\n{limit}".encode("utf-8")).hexdigest()
+        return _etag_response(request, etag, {"query": q, "hits": index[2].search(q, limit)})
+
+    @app.get("/stats")
+    def stats():
+        c = hub.cache
+        return {"tutorials": len(c), "bytes": c.bytes, "max_bytes": c.max_bytes, "hits": c.hits, "misses": c.misses}
+
+    return app
+
+def __getattr__(name: str):
+    # `uvicorn hipertex_server:app`: la app (y su Hub) se crean al pedirla, no al importar el módulo
+    if name == "app":
+        app = create_app(Hub.from_env()) if FastAPI is not None else None
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Servicio HTTP de solo lectura para el HIPERTEX HUB (FastAPI).")
+    ap.add_argument("--root", default=".", help="Carpeta raíz del catálogo (la --root de build_catalog.py)")
+    ap.add_argument("--catalog", default="catalog.json", help="Catálogo JSON de build_catalog.py (por defecto: catalog.json)")
+    ap.add_argument("--lru-mb", type=float, default=DEFAULT_LRU_MB,
+                    help=f"MB de .hptx parseados en memoria (por defecto: {DEFAULT_LRU_MB})")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    args = ap.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+    if FastAPI is None or uvicorn is None:
+        print("[ERROR] Faltan dependencias: py -m pip install fastapi uvicorn")
+        sys.exit(1)
+    if not os.path.exists(args.catalog):
+        print(f"[WARN] No existe {args.catalog} todavía: genera el catálogo con build_catalog.py")
+    hub = Hub(args.root, args.catalog, int(args.lru_mb * 1024 * 1024))
+    uvicorn.run(create_app(hub), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
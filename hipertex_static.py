@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+r"""
+hipertex_static.py — Artefactos estáticos precomprimidos para el HIPERTEX HUB
+---------------------------------------------------------------------------
+El catálogo, sus páginas (--shards) y los *_parsed.json se sirven como archivos
+estáticos junto a visor_hipertex.html. Con build_catalog.py --compress y
+parser_hipertex.py --compress se escriben:
+  x.json      JSON minificado (sin sangría ni espacios)
+  x.json.gz   gzip nivel 9, reproducible (sin fecha en la cabecera)
+  x.json.br   brotli calidad 11 (solo si está instalado: pip install brotli)
+Un archivo solo se reescribe (con sus comprimidos) si su contenido cambió, así
+que su fecha y su ETag en el servidor tampoco cambian.
+
+El manifiesto static.manifest.json (en la carpeta de los artefactos) guarda el
+hash de cada uno para invalidar cachés (p. ej. catalog.json?v=<sha256[:12]>):
+{
+  "version": 1,
+  "files": {
+    "catalog.json": {"sha256": "…", "bytes": 98304, "gz": 14512, "br": 11876},
+    "catalog.shards/items/0f3a….json": {...}
+  }
+}
+Un servidor puede entregar x.json.br / x.json.gz según Accept-Encoding
+(p. ej. nginx gzip_static / brotli_static) sin comprimir al vuelo.
+
+Uso:
+  py hipertex_static.py catalog.json HPTX/tutorial_parsed.json   # minifica, comprime y actualiza el manifiesto
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli  # .br (opcional)
+except ImportError:
+    brotli = None
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "static.manifest.json"
+SUFFIXES = (".gz", ".br")
+
+def dumps(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _compressors() -> dict:
+    out = {".gz": lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        out[".br"] = lambda raw: brotli.compress(raw, quality=11)
+    return out
+
+def outputs(path: str) -> list:
+    """path y los comprimidos que publish() escribe para él con los módulos instalados."""
+    return [path] + [path + ext for ext in _compressors()]
+
+def _same(path: str, raw: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(raw):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == raw
+    except OSError:
+        return False
+
+def _write_bytes(path: str, raw: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, path)
+
+def publish(data, path: str) -> dict:
+    """
+    Escribe data como JSON minificado en path y sus hermanos .gz/.br, solo si el
+    contenido cambió (o falta algún comprimido). Devuelve la entrada del manifiesto
+    más "written": True si se escribió algo.
+    """
+    raw = dumps(data)
+    changed = not _same(path, raw)
+    if changed:
+        _write_bytes(path, raw)
+    info = {"sha256": hashlib.sha256(raw).hexdigest(), "bytes": len(raw)}
+    written = changed
+    compressors = _compressors()
+    for ext in SUFFIXES:
+        sibling = path + ext
+        if ext not in compressors:
+            # Sin el compresor, un .br anterior quedaría desfasado: se borra
+            if changed and os.path.exists(sibling):
+                os.remove(sibling)
+            continue
+        if changed or not os.path.exists(sibling):
+            _write_bytes(sibling, compressors[ext](raw))
+            written = True
+        info[ext[1:]] = os.path.getsize(sibling)
+    info["written"] = written
+    return info
+
+def describe(path: str) -> dict:
+    """Entrada del manifiesto de un artefacto ya escrito."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    info = {"sha256": h.hexdigest(), "bytes": os.path.getsize(path)}
+    for ext in SUFFIXES:
+        if os.path.exists(path + ext):
+            info[ext[1:]] = os.path.getsize(path + ext)
+    return info
+
+# ---------- Manifiesto ----------
+def manifest_path(base_dir: str) -> str:
+    return os.path.join(base_dir, MANIFEST_NAME)
+
+def load_manifest(base_dir: str) -> dict:
+    try:
+        with open(manifest_path(base_dir), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("files") or {}
+
+def update_manifest(base_dir: str, published: dict) -> str:
+    """
+    Actualiza base_dir/static.manifest.json con published: {ruta: info de publish()}
+    o {ruta: None} para artefactos sin cambios (se conserva su entrada o se calcula
+    del disco). Se mantienen las entradas de otros archivos que sigan existiendo
+    (el manifiesto lo comparten build_catalog y parser_hipertex).
+    """
+    old = load_manifest(base_dir)
+    files = {rel: info for rel, info in old.items() if os.path.exists(os.path.join(base_dir, rel))}
+    for p, info in published.items():
+        rel = os.path.relpath(p, base_dir).replace("\\", "/")
+        if info is not None:
+            files[rel] = {k: v for k, v in info.items() if k != "written"}
+        elif rel not in files:
+            files[rel] = describe(p)
+    out = manifest_path(base_dir)
+    data = {"version": MANIFEST_VERSION, "files": dict(sorted(files.items()))}
+    if files != old or not os.path.exists(out):
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        _write_bytes(out, raw)
+    return out
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Minifica y precomprime (.gz/.br) JSON del HIPERTEX HUB.")
+    ap.add_argument("files", nargs="+", help="Archivos JSON a publicar (catalog.json, *_parsed.json, …)")
+    args = ap.parse_args()
+
+    by_dir = {}
+    for path in args.files:
+        try:
+            with open(path, "r", encoding="utf-8-sig") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] {path}: {e}")
+            sys.exit(1)
+        info = publish(data, path)
+        by_dir.setdefault(os.path.dirname(os.path.abspath(path)), {})[path] = info
+        br = f", br {info['br']}" if "br" in info else ""
+        state = "escrito" if info["written"] else "sin cambios"
+        print(f"[OK] {path}: {info['bytes']} bytes (gz {info['gz']}{br}) — {state}")
+    for base_dir, published in by_dir.items():
+        print(f"[OK] Manifiesto: {update_manifest(base_dir, published)}")
+    if brotli is None:
+        print("[WARN] brotli no está instalado: solo se generan .gz (pip install brotli)")
+
+if __name__ == "__main__":
+    main()
@@ -12,16 +12,47 @@
 # - Mueve los ficheros respetando la estructura: ROOT/TEMA/TIPO/archivo
 # - Evita sobrescribir: si existe el fichero destino, añade sufijo _1, _2, ...
 # - Funciona en Windows (usa rutas absolutas); se puede adaptar a otro root pasando --root.
+# - Dos fases: primero se planifica (cada carpeta destino se lista una sola vez y las
+#   colisiones se resuelven en memoria) y después se ejecuta: os.rename dentro del mismo
+#   disco y copias en paralelo (--jobs) cuando el destino está en otra unidad.
+# - Duplicados: si en la carpeta destino (o en lo ya planificado) hay un archivo idéntico
+#   byte a byte (mismo tamaño -> mismo hash del primer bloque -> mismo hash completo),
+#   con --dedup no se crea otra copia _1: se deja el archivo donde está (--dedup skip) o
+#   se coloca como enlace duro al existente (--dedup link). Por defecto (off) no se compara
+#   el contenido y el archivo se renombra con _1, _2, ... como siempre.
+# - Cada ejecución queda en un diario (ROOT/.organize_journal.jsonl, una línea JSON por
+#   paso) que permite reanudar una ejecución interrumpida (--resume) o deshacerla (--undo).
+# - --recursive: también los archivos de las subcarpetas. El árbol se recorre con
+#   os.scandir en un hilo aparte que alimenta una cola acotada; se planifica y se mueve
+#   por lotes (--batch), sin listar antes el árbol entero. No se entra en .git, venv,
+#   __pycache__, node_modules (IGNORE_DIRS) ni en las carpetas TEMA/TIPO ya creadas:
+#   lo que ya está en alguna TEMA/TIPO no se toca.
 # - Uso: python organize_files.py
 #   Opciones:
 #     --root "C:\ruta\a\carpeta"   : cambiar carpeta raíz (por defecto la solicitada)
 #     --dry-run                     : listar cambios sin mover
 #     --verbose                     : salida detallada
+#     --dedup skip|link|off         : qué hacer con archivos idénticos a uno ya organizado (por defecto off)
+#     --jobs N                      : hilos para copias entre unidades (por defecto 4)
+#     --recursive                   : incluir subcarpetas (en streaming)
+#     --batch N                     : archivos por lote (por defecto 1000)
+#     --journal RUTA                : diario (por defecto ROOT/.organize_journal.jsonl)
+#     --resume                      : completar la última ejecución interrumpida
+#     --undo                        : devolver los archivos de la última ejecución a su sitio
 
 import os
+import errno
+import json
 import shutil
 import argparse
 import re
+import time
+import queue
+import hashlib
+import threading
+from itertools import islice
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 DEFAULT_ROOT = r"C:\Users\rubenurbano\HIPERTEX"
@@ -32,7 +63,17 @@ EXT_MAP = {
     ".json": "JSON"
 }
 DEFAULT_TYPE = "VARIOS"
+TYPE_FOLDERS = {*EXT_MAP.values(), DEFAULT_TYPE}
 FALLBACK_THEME = "OTROS"
+JOURNAL_NAME = ".organize_journal.jsonl"
+DEFAULT_JOBS = 4
+DEFAULT_BATCH = 1000
+IGNORE_DIRS = {".git", "venv", ".venv", "__pycache__", "node_modules"}
+DEDUP_MODES = ("skip", "link", "off")
+PARTIAL_BYTES = 64 * 1024
+
+# dst=None: duplicado que se deja en su sitio; same: archivo idéntico ya organizado (o planificado)
+Move = namedtuple("Move", "src dst same", defaults=(None,))
 
 TOKEN_SPLIT_RE = re.compile(r"[ _\-\.\[\]\(\)]+")  # separadores comunes
 HAS_LETTER_RE = re.compile(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñ]")  # para detectar token con letras
@@ -90,47 +131,483 @@ def safe_move(src_path: Path, dest_dir: Path, dry_run=False) -> Path:
             return candidate
         counter += 1
 
-def organize_folder(root: Path, dry_run=False, verbose=False):
+# ---------- Recorrido ----------
+def iter_files(root: Path, recursive=False, skip=(), ignore=IGNORE_DIRS):
+    """
+    Genera los archivos de root con os.scandir, sin listar antes el árbol entero.
+    Con recursive entra en subcarpetas (salvo las de `ignore` y las TEMA/TIPO ya
+    creadas bajo root, que ni se recorren: lo que contienen ya está organizado).
+    Cada carpeta también se lee en streaming: sus archivos se pueden mover mientras
+    sigue abierta, porque van a una TEMA/TIPO que no se recorre (la carpeta abierta
+    solo pierde archivos; a lo sumo root gana carpetas TEMA sin nada que recorrer).
+    """
+    skip = {os.path.normcase(str(p)) for p in skip}
+    pending = [root]
+    while pending:
+        folder = pending.pop()
+        try:
+            it = os.scandir(folder)
+        except OSError as e:
+            print(f"AVISO: no se puede leer {folder}: {e}")
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if recursive and e.name not in ignore and not _is_type_dir(root, folder, e.name):
+                        pending.append(Path(e.path))
+                elif e.is_file() and os.path.normcase(e.path) not in skip:
+                    yield Path(e.path)
+
+def _is_type_dir(root: Path, folder: Path, name: str) -> bool:
+    """True si folder/name es root/TEMA/(HPTX|JSON|VARIOS), de cualquier tema."""
+    return name.upper() in TYPE_FOLDERS and folder != root and folder.parent == root
+
+def list_files(root: Path, skip=()) -> list:
+    """Archivos de primer nivel de root (sin subcarpetas), ordenados por nombre."""
+    return sorted(iter_files(root, skip=skip))
+
+def walk_queued(root: Path, skip=(), ignore=IGNORE_DIRS, maxsize: int = DEFAULT_BATCH):
+    """
+    iter_files recursivo en un hilo aparte, con una cola acotada de maxsize rutas:
+    el recorrido avanza mientras se mueven los lotes anteriores, pero nunca se
+    adelanta más de maxsize archivos.
+    """
+    q = queue.Queue(maxsize=max(1, maxsize))
+    done = object()
+    failure = []
+
+    def produce():
+        try:
+            for path in iter_files(root, True, skip, ignore):
+                q.put(path)
+        except Exception as e:  # se relanza en el hilo principal
+            failure.append(e)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        path = q.get()
+        if path is done:
+            break
+        yield path
+    if failure:
+        raise failure[0]
+
+# ---------- Fase 1: plan ----------
+def _list_dest(dest_dir: Path, sizes: bool):
+    """(nombres ocupados en normcase, {tamaño: [rutas]} o None) de una carpeta destino."""
+    names, by_size = set(), ({} if sizes else None)
+    try:
+        with os.scandir(dest_dir) as it:
+            for e in it:
+                names.add(os.path.normcase(e.name))
+                if sizes and e.is_file():
+                    by_size.setdefault(e.stat().st_size, []).append((Path(e.path), Path(e.path)))
+    except FileNotFoundError:
+        pass
+    return names, by_size
+
+class _Hashes:
+    """Hash del primer bloque y hash completo, calculados una sola vez por archivo."""
+
+    def __init__(self):
+        self.partial, self.full = {}, {}
+
+    def _sha(self, path: Path, limit: int = None) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            if limit is not None:
+                h.update(f.read(limit))
+            else:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+        return h.hexdigest()
+
+    def same(self, a: Path, b: Path) -> bool:
+        for cache, limit in ((self.partial, PARTIAL_BYTES), (self.full, None)):
+            for p in (a, b):
+                if p not in cache:
+                    cache[p] = self._sha(p, limit)
+            if cache[a] != cache[b]:
+                return False
+        return True
+
+class Planner:
     """
-    Recorre únicamente los archivos (no entra en subcarpetas) en la carpeta `root`
-    y los organiza según las reglas.
+    Calcula Move(origen, destino, igual) sin mover nada: cada carpeta destino se
+    lista una sola vez (aunque el plan se haga por lotes) y las colisiones (con lo
+    que ya hay y con lo ya planificado) se resuelven en memoria con el mismo sufijo
+    _1, _2, ... que safe_move. Con dedup="skip" | "link", un archivo idéntico a otro
+    del destino lleva en `same` la ruta (final) de ese otro; con "skip" su destino
+    es None (no se mueve). Los archivos que ya están en su carpeta destino se omiten.
+    """
+
+    def __init__(self, root: Path, dedup: str = "off"):
+        self.root = root
+        self.dedup = dedup
+        self.taken = {}     # carpeta destino -> nombres ocupados (normcase: Windows no distingue mayúsculas)
+        self.sizes = {}     # carpeta destino -> {tamaño: [(ruta para leer, ruta final)]} (solo con dedup)
+        self.counters = {}  # (carpeta, nombre) -> siguiente sufijo a probar
+        self.hashes = _Hashes()
+
+    def _identical(self, src: Path, candidates: list):
+        for read_path, final_path in candidates:
+            for p in (read_path, final_path):  # un archivo planificado puede haberse movido ya
+                try:
+                    if self.hashes.same(src, p):
+                        return final_path
+                    break
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    break  # ilegible: no cuenta como duplicado
+        return None
+
+    def plan(self, files) -> list:
+        moves = []
+        for src in files:
+            dest_dir = self.root / detect_theme(src.name) / map_extension_to_type(src.suffix)
+            if src.parent == dest_dir:
+                continue  # ya organizado (modo recursivo)
+            names = self.taken.get(dest_dir)
+            if names is None:
+                names, self.sizes[dest_dir] = _list_dest(dest_dir, self.dedup != "off")
+                self.taken[dest_dir] = names
+            same = None
+            if self.dedup != "off":
+                candidates = self.sizes[dest_dir].setdefault(src.stat().st_size, [])
+                same = self._identical(src, candidates)
+                if same is not None and self.dedup == "skip":
+                    moves.append(Move(src, None, same))
+                    continue
+            name = src.name
+            key = os.path.normcase(name)
+            if key in names:
+                n = self.counters.get((dest_dir, key), 1)
+                while os.path.normcase(f"{src.stem}_{n}{src.suffix}") in names:
+                    n += 1
+                self.counters[(dest_dir, key)] = n + 1
+                name = f"{src.stem}_{n}{src.suffix}"
+            names.add(os.path.normcase(name))
+            if self.dedup != "off" and same is None:
+                candidates.append((src, dest_dir / name))
+            moves.append(Move(src, dest_dir / name, same))
+        return moves
+
+def plan_moves(root: Path, files, dedup: str = "off") -> list:
+    """[Move(origen, destino, igual), ...] para files (ver Planner)."""
+    return Planner(root, dedup).plan(files)
+
+# ---------- Diario ----------
+# Una línea JSON por paso, siempre añadiendo al final:
+#   {"run": id, "op": "begin", "root": ...}
+#   {"run": id, "op": "plan" | "move" | "undo", "src": relativa, "dst": relativa}
+#   {"run": id, "op": "plan", ..., "same": relativa}     (--dedup link: enlace duro a "same")
+#   {"run": id, "op": "dup", "src": relativa, "same": relativa}   (--dedup skip: no se mueve)
+#   {"run": id, "op": "end"}
+def journal_path(root: Path) -> Path:
+    return root / JOURNAL_NAME
+
+class Journal:
+    FLUSH_EVERY = 256
+
+    def __init__(self, path: Path, run: str):
+        self.run = run
+        self.f = open(path, "a", encoding="utf-8")
+        self.pending = 0
+
+    def write(self, op: str, **fields):
+        self.f.write(json.dumps({"run": self.run, "op": op, **fields}, ensure_ascii=False) + "\n")
+        self.pending += 1
+        # Se vuelca por lotes. Los "plan" se vuelcan antes de mover nada: los "move" que
+        # no llegaron al disco tras un corte se deducen de ellos (ver _done_moves)
+        if self.pending >= self.FLUSH_EVERY:
+            self.f.flush()
+            self.pending = 0
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_journal(path: Path) -> dict:
+    """{run: {"root", "plan": [(src, dst, same)], "moved": [(src, dst)], "undone": set, "ended": bool}} en orden."""
+    runs = {}
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return runs
+    with f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # última línea a medias tras un corte
+            run = runs.setdefault(rec["run"], {"root": None, "plan": [], "moved": [], "undone": set(), "ended": False})
+            op = rec["op"]
+            if op == "begin":
+                run["root"] = rec["root"]
+            elif op == "plan":
+                run["plan"].append((rec["src"], rec["dst"], rec.get("same")))
+            elif op == "move":
+                run["moved"].append((rec["src"], rec["dst"]))
+            elif op == "undo":
+                run["undone"].add((rec["src"], rec["dst"]))
+            elif op == "end":
+                run["ended"] = True
+    return runs
+
+def _rel(root: Path, p: Path) -> str:
+    return os.path.relpath(p, root).replace("\\", "/")
+
+# ---------- Fase 2: ejecución ----------
+def execute_moves(root: Path, moves: list, journal: Journal, jobs: int = DEFAULT_JOBS, verbose=False) -> dict:
+    """
+    Ejecuta el plan: os.rename si origen y destino están en el mismo disco y, si no
+    (EXDEV), copia en un pool de hilos. Los duplicados con `same` se colocan como
+    enlace duro a ese archivo (si el sistema de archivos no lo permite, se mueven).
+    Cada movimiento hecho se anota en el diario.
+    """
+    stats = {"renamed": 0, "copied": 0, "linked": 0, "errors": 0}
+    made = set()
+    cross = []
+    for src, dst, same in moves:
+        if dst.parent not in made:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            made.add(dst.parent)
+        if same is not None:
+            try:
+                os.link(same, dst)
+                os.remove(src)
+            except OSError:
+                if dst.exists() and src.exists():
+                    dst.unlink()  # enlace hecho pero sin poder borrar el original: se mueve sin más
+            else:
+                journal.write("move", src=_rel(root, src), dst=_rel(root, dst))
+                stats["linked"] += 1
+                if verbose:
+                    print(f"  Enlazado -> {dst} (= {same})")
+                continue
+        try:
+            os.rename(src, dst)
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                cross.append((src, dst))
+            else:
+                stats["errors"] += 1
+                print(f"ERROR: {src} -> {dst}: {e}")
+            continue
+        journal.write("move", src=_rel(root, src), dst=_rel(root, dst))
+        stats["renamed"] += 1
+        if verbose:
+            print(f"  Movido -> {dst}")
+
+    if cross:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            futures = [(src, dst, pool.submit(shutil.move, str(src), str(dst))) for src, dst in cross]
+            for src, dst, fut in futures:
+                try:
+                    fut.result()
+                except OSError as e:
+                    stats["errors"] += 1
+                    print(f"ERROR: {src} -> {dst}: {e}")
+                    continue
+                journal.write("move", src=_rel(root, src), dst=_rel(root, dst))
+                stats["copied"] += 1
+                if verbose:
+                    print(f"  Copiado -> {dst}")
+    return stats
+
+def _print_plan(planned: list):
+    for src, dst, same in planned:
+        if dst is None:
+            print(f"{src.name} -> duplicado de {same}; se deja en su sitio")
+        else:
+            extra = f"  (enlace a {same.name})" if same else ""
+            print(f"{src.name} -> Tema: {dst.parent.parent.name} / Tipo: {dst.parent.name}  -> Dest: {dst}{extra}")
+
+def organize_folder(root: Path, dry_run=False, verbose=False, jobs: int = DEFAULT_JOBS, journal: Path = None,
+                    dedup: str = "off", recursive=False, batch: int = DEFAULT_BATCH) -> dict:
+    """
+    Organiza los archivos de la carpeta `root` según las reglas: planifica los
+    movimientos y luego los ejecuta, por lotes de `batch` archivos.
+    Sin recursive solo se miran los archivos de primer nivel (no entra en subcarpetas).
+    Con recursive se recorre el árbol en streaming (IGNORE_DIRS no se recorren, los
+    archivos que ya están en su TEMA/TIPO se dejan): nunca hay en memoria más de
+    un lote más la cola del recorrido.
+    dedup: "skip" | "link" | "off" para archivos idénticos a uno ya organizado.
     """
     if not root.exists():
         raise FileNotFoundError(f"El directorio raíz no existe: {root}")
+    journal = journal or journal_path(root)
+    batch = max(1, batch)
 
-    # Recorremos sólo items de primer nivel (archivos). No tocamos subdirectorios.
-    entries = list(root.iterdir())
-    files = [p for p in entries if p.is_file()]
-    if verbose:
-        print(f"Encontrados {len(files)} archivos en {root}")
-
-    moved_count = 0
-    for f in files:
-        theme = detect_theme(f.name)
-        type_folder = map_extension_to_type(f.suffix)
-        dest_dir = root / theme.upper() / type_folder  # normalizar tema a MAYÚSCULAS (ya lo es) y tipo también
-        if verbose:
-            print(f"{f.name} -> Tema: {theme.upper()} / Tipo: {type_folder}  -> Dest: {dest_dir}")
+    if recursive:
+        files = walk_queued(root, skip=[journal], maxsize=batch)
+    else:
+        # Sólo items de primer nivel (archivos). No tocamos subdirectorios.
+        files = iter(list_files(root, skip=[journal]))
+    planner = Planner(root, dedup)
+    stats = {"planned": 0, "renamed": 0, "copied": 0, "linked": 0, "skipped": 0, "errors": 0}
+    seen = 0
+
+    j = None
+    if not dry_run:
+        run = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.urandom(3).hex()}"
+        j = Journal(journal, run)
+        j.write("begin", root=str(root))
+    try:
+        while True:
+            chunk = list(islice(files, batch))
+            if not chunk:
+                break
+            seen += len(chunk)
+            planned = planner.plan(chunk)
+            moves = [m for m in planned if m.dst is not None]
+            dups = [m for m in planned if m.dst is None]
+            stats["planned"] += len(moves)
+            stats["skipped"] += len(dups)
+            if verbose or dry_run:
+                _print_plan(planned)
+            if dry_run:
+                continue
+            # El plan del lote va al diario antes de mover nada: es lo que usan --resume y --undo
+            for src, dst, same in moves:
+                if same is None:
+                    j.write("plan", src=_rel(root, src), dst=_rel(root, dst))
+                else:
+                    j.write("plan", src=_rel(root, src), dst=_rel(root, dst), same=_rel(root, same))
+            for src, _, same in dups:
+                j.write("dup", src=_rel(root, src), same=_rel(root, same))
+            j.f.flush()
+            for k, v in execute_moves(root, moves, j, jobs, verbose).items():
+                stats[k] += v
+        if j is not None:
+            j.write("end")
+    finally:
+        if j is not None:
+            j.close()
 
-        final_path = safe_move(f, dest_dir, dry_run=dry_run)
-        moved_count += 1
+    if dry_run:
+        print(f"(dry) {stats['planned']} archivos se moverían; {stats['skipped']} duplicados se omitirían.")
+    elif verbose or stats["skipped"]:
+        print(f"Procesados: {seen} archivos. Movidos: {stats['renamed'] + stats['copied']}"
+              f" (copiados entre unidades: {stats['copied']}, enlazados: {stats['linked']},"
+              f" duplicados omitidos: {stats['skipped']}, errores: {stats['errors']})")
+    return stats
 
-        if verbose:
-            print(f"  {'(dry)' if dry_run else 'Movido'} -> {final_path}")
+def _last_run(journal: Path, want):
+    runs = read_journal(journal)
+    for run_id in reversed(list(runs)):
+        if want(runs[run_id]):
+            return run_id, runs[run_id]
+    return None, None
+
+def resume(root: Path, journal: Path = None, jobs: int = DEFAULT_JOBS, verbose=False) -> dict:
+    """Completa la última ejecución sin "end": mueve lo que quedó pendiente de su plan."""
+    journal = journal or journal_path(root)
+    run_id, run = _last_run(journal, lambda r: not r["ended"])
+    if run is None:
+        print("No hay ninguna ejecución interrumpida en el diario.")
+        return {"planned": 0, "renamed": 0, "copied": 0, "linked": 0, "errors": 0}
+    moved = set(run["moved"])
+    pending = []
+    with Journal(journal, run_id) as j:
+        for src, dst, same in run["plan"]:
+            if (src, dst) in moved:
+                continue
+            s, d = root / src, root / dst
+            if s.exists():
+                pending.append(Move(s, d, root / same if same else None))
+            elif d.exists():
+                j.write("move", src=src, dst=dst)  # se movió pero el diario no llegó a guardarlo
+            else:
+                print(f"AVISO: {src} ya no existe; se omite.")
+        stats = execute_moves(root, pending, j, jobs, verbose)
+        j.write("end")
+    stats["planned"] = len(pending)
+    return stats
+
+def _done_moves(root: Path, run: dict) -> list:
+    """
+    Movimientos hechos de una ejecución: los "move" del diario y, si se cortó (sin
+    "end"), también los de su plan cuyo origen ya no está y cuyo destino sí: pudieron
+    hacerse sin que su "move" llegara a volcarse al diario.
+    """
+    moved = list(run["moved"])
+    if not run["ended"]:
+        known = set(moved)
+        for src, dst, _ in run["plan"]:
+            if (src, dst) not in known and not (root / src).exists() and (root / dst).exists():
+                moved.append((src, dst))
+    return moved
 
-    if verbose:
-        print(f"Procesados: {len(files)} archivos. Movidos (o listados en dry-run): {moved_count}")
+def undo(root: Path, journal: Path = None, verbose=False) -> int:
+    """Devuelve a su sitio los archivos de la última ejecución (en orden inverso). Devuelve cuántos."""
+    journal = journal or journal_path(root)
+    run_id, run = _last_run(journal, lambda r: any(m not in r["undone"] for m in _done_moves(root, r)))
+    if run is None:
+        print("No hay nada que deshacer en el diario.")
+        return 0
+    n = 0
+    dirs = set()
+    with Journal(journal, run_id) as j:
+        for src, dst in reversed(_done_moves(root, run)):
+            if (src, dst) in run["undone"]:
+                continue
+            s, d = root / src, root / dst
+            if s.exists() or not d.exists():
+                print(f"AVISO: no se puede devolver {dst} a {src}; se omite.")
+                continue
+            s.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(d), str(s))
+            j.write("undo", src=src, dst=dst)
+            dirs.add(d.parent)
+            n += 1
+            if verbose:
+                print(f"  Devuelto -> {s}")
+    # Carpetas TEMA/TIPO que quedaron vacías
+    for d in sorted(dirs, key=lambda p: len(p.parts), reverse=True):
+        for folder in (d, d.parent):
+            try:
+                folder.rmdir()
+            except OSError:
+                pass
+    return n
 
 def main():
     parser = argparse.ArgumentParser(description="Organiza archivos en carpetas por TEMA > TIPO (HPTX/JSON/VARIOS).")
     parser.add_argument("--root", type=str, default=DEFAULT_ROOT, help="Carpeta raíz a organizar.")
     parser.add_argument("--dry-run", action="store_true", help="Simular acciones sin mover archivos.")
     parser.add_argument("--verbose", action="store_true", help="Mostrar salida detallada.")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="off",
+                        help="Archivos idénticos a uno ya organizado: skip (no moverlos), link (enlace duro) u off (copia _1, por defecto).")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Hilos para copias entre unidades distintas.")
+    parser.add_argument("--recursive", action="store_true",
+                        help="Organizar también los archivos de las subcarpetas (en streaming, sin listar antes el árbol).")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH,
+                        help=f"Archivos por lote de plan + ejecución (por defecto {DEFAULT_BATCH}).")
+    parser.add_argument("--journal", type=str, default=None, help=f"Diario de movimientos (por defecto ROOT/{JOURNAL_NAME}).")
+    parser.add_argument("--resume", action="store_true", help="Completar la última ejecución interrumpida.")
+    parser.add_argument("--undo", action="store_true", help="Deshacer la última ejecución.")
     args = parser.parse_args()
 
     root = Path(args.root).resolve()
+    journal = Path(args.journal).resolve() if args.journal else None
     try:
-        organize_folder(root, dry_run=args.dry_run, verbose=args.verbose)
+        if args.undo:
+            print(f"Devueltos {undo(root, journal, verbose=args.verbose)} archivos a su ubicación original.")
+        elif args.resume:
+            stats = resume(root, journal, jobs=args.jobs, verbose=args.verbose)
+            print(f"Reanudado: {stats['renamed'] + stats['copied']} de {stats['planned']} pendientes movidos.")
+        else:
+            organize_folder(root, dry_run=args.dry_run, verbose=args.verbose, jobs=args.jobs, journal=journal,
+                            dedup=args.dedup, recursive=args.recursive, batch=args.batch)
     except Exception as e:
         print(f"ERROR: {e}")
 
@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 r"""
-Parser HIPERTEX v3.1 — IDs limpios (000...), sin itemID_raw, y soporte sin menú
+Parser HIPERTEX v3.2 — IDs limpios (000...), sin itemID_raw, y soporte sin menú
 -------------------------------------------------------------------------------
+Lectura en streaming: los .hptx/.txt se tokenizan línea a línea (iter_items),
+así que archivos enormes se procesan con memoria constante y una sola pasada.
+
 Uso (Windows / PowerShell):
-  py -m pip install python-docx charset-normalizer
+  py -m pip install charset-normalizer
   py parser_hipertex.py input.hptx
   py parser_hipertex.py input.txt
   py parser_hipertex.py input.docx
+  py parser_hipertex.py --dir HPTX --jobs 8     # todos los .hptx (recursivo) en paralelo
+  py parser_hipertex.py input.hptx --index      # + input_index.json para leer pasos sueltos
+  py parser_hipertex.py input.hptx --format bin # input_parsed.hptxb (binario, ver hipertex_bin.py)
+  py parser_hipertex.py --dir HPTX --compress   # *_parsed.json minificado + .gz/.br (ver hipertex_static.py)
 """
-import sys, os, json, re
+import sys, os, io, json, re
 from charset_normalizer import from_path
 
+try:
+    import hipertex_cache  # caché de parseo compartida (mismo directorio)
+except ImportError:
+    hipertex_cache = None
+
 # ------------------------- Lectura universal -------------------------
 def read_text(path: str) -> str:
     ext = os.path.splitext(path)[1].lower()
@@ -37,49 +49,73 @@ def read_text(path: str) -> str:
                 with open(path, 'r', encoding='utf-8', errors='replace') as f:
                     return f.read()
     elif ext == '.docx':
-        try:
-            from docx import Document
-        except ImportError:
-            sys.stderr.write("Falta dependencia: python-docx (instala con: py -m pip install python-docx)\n")
-            sys.exit(2)
-        doc = Document(path)
-        return "\n".join(p.text for p in doc.paragraphs)
+        return "\n".join(iter_docx_paragraphs(path))
     else:
         sys.stderr.write(f"Extensión no soportada: {ext}\n")
         sys.exit(2)
 
-# ---------------------------- Expresiones ----------------------------
-META_RE = re.compile(r"##HIPERTEX-META BEGIN([\s\S]*?)##HIPERTEX-META END", re.M)
-ITEM_RE = re.compile(r"^##itemID:(.+)$", re.M)
-MENU_RE = re.compile(r"##menu-item BEGIN([\s\S]*?)##menu-item END", re.M)
-CONT_RE = re.compile(r"##Contenido BEGIN([\s\S]*?)##Contenido END", re.M)
-
-# ---------------------------- Utilidades -----------------------------
-def sanitize_id(raw: str) -> str:
-    # Mantiene dígitos/guiones/underscore; quita espacios y raro
-    return re.sub(r"[^\w\-]", "_", str(raw).strip())
-
-def strip_one_newline(s: str) -> str:
-    # Quita solo UN salto de línea al borde
-    return re.sub(r"^\n|\n$", "", s)
-
-def parse_meta(src: str):
-    m = META_RE.search(src)
-    if not m:
-        return {}, src
-    block = m.group(1).strip()
-    meta = {}
-    for line in block.splitlines():
-        line = re.sub(r"^\s*#.*$", "", line).strip()
-        if not line:
-            continue
-        if ":" in line:
-            k, v = line.split(":", 1)
-            meta[k.strip()] = v.strip()
-    rest = src[:m.start()] + src[m.end():]
-    return meta, rest
-
-# ------------------------- Parsing principal -------------------------
+# ------------------------- Lectura de .docx --------------------------
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY, W_P, W_R, W_HYPERLINK = W_NS + "body", W_NS + "p", W_NS + "r", W_NS + "hyperlink"
+# Contenido de un run y su equivalente en texto (igual que python-docx)
+W_RUN_TEXT = {W_NS + "tab": "\t", W_NS + "ptab": "\t", W_NS + "cr": "\n", W_NS + "noBreakHyphen": "-"}
+
+def iter_docx_paragraphs(path: str):
+    """
+    Lee word/document.xml directamente del zip con un parser XML incremental y
+    va devolviendo el texto de cada párrafo del cuerpo (los mismos que
+    python-docx en Document.paragraphs), sin construir el árbol completo.
+    """
+    import zipfile
+    from xml.etree.ElementTree import iterparse
+
+    with zipfile.ZipFile(path) as zf, zf.open("word/document.xml") as xml:
+        stack = []   # tags abiertos: [document, body, p, (hyperlink,) r, t]
+        parts = []
+        body = None
+        for event, el in iterparse(xml, events=("start", "end")):
+            if event == "start":
+                stack.append(el.tag)
+                if el.tag == W_BODY:
+                    body = el
+                continue
+            tag = stack.pop()
+            depth = len(stack)
+            if depth >= 3 and stack[-1] == W_R and stack[2] == W_P and stack[1] == W_BODY \
+                    and (depth == 4 or (depth == 5 and stack[3] == W_HYPERLINK)):
+                if tag == W_NS + "t":
+                    parts.append(el.text or "")
+                elif tag == W_NS + "br":
+                    # Saltos de página/columna no aportan texto
+                    if el.get(W_NS + "type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                elif tag in W_RUN_TEXT:
+                    parts.append(W_RUN_TEXT[tag])
+            elif depth == 2 and body is not None:
+                # Fin de un bloque del cuerpo (párrafo, tabla...): liberar memoria
+                if tag == W_P:
+                    yield "".join(parts)
+                parts = []
+                body.clear()
+
+def _docx_lines(path: str):
+    """Líneas del texto del .docx (equivale a io.StringIO(read_text(path)))."""
+    prev = None
+    for para in iter_docx_paragraphs(path):
+        if prev is not None:
+            yield from io.StringIO(prev + "\n", newline=None)
+        prev = para
+    if prev:
+        yield from io.StringIO(prev, newline=None)
+
+# ------------------ Expresiones y tokenizador (núcleo) ------------------
+# Compartidos con build_catalog.py: ver hipertex_core.py
+from hipertex_core import (
+    META_RE, ITEM_RE, MENU_RE, CONT_RE,
+    sanitize_id, strip_one_newline, parse_meta, iter_items, iter_item_offsets,
+    SKIP_DIRS, find_hptx,
+)
+
 def parse_blocks(src: str):
     """
     Reglas:
@@ -89,77 +125,178 @@ def parse_blocks(src: str):
       • itemID se respeta tal cual (sanitizado). No se inventa título.
     - Si NO hay ##itemID en absoluto:
       • se crean items a partir de cada ##Contenido, numerando itemID como 000, 001, ...
+    - Los itemID duplicados reciben sufijo -2, -3, ... y se descartan los ítems
+      sin título ni contenido.
     """
-    src = src.replace("\r\n", "\n").replace("\r", "\n")
-    items = []
-    matches = list(ITEM_RE.finditer(src))
-
-    if matches:
-        for i, m in enumerate(matches):
-            start = m.start()
-            end = matches[i + 1].start() if i + 1 < len(matches) else len(src)
-            id_text = m.group(1).strip()
-            block = src[start:end]
-
-            # Título del menú (opcional)
-            menu_m = MENU_RE.search(block)
-            menu_item = strip_one_newline(menu_m.group(1)) if menu_m else None
-
-            # Contenido (0..n) — concatenado con salto
-            cont_ms = list(CONT_RE.finditer(block))
-            contenido = "\n".join(strip_one_newline(cm.group(1)) for cm in cont_ms) if cont_ms else ""
-
-            items.append({
-                "itemID": sanitize_id(id_text),
-                "menu_item": menu_item,
-                "contenido": contenido
-            })
-    else:
-        # No hay IDs: cada Contenido es un item; IDs autogenerados 000...
-        cont_ms = list(CONT_RE.finditer(src))
-        for i, cm in enumerate(cont_ms):
-            contenido = strip_one_newline(cm.group(1))
-            items.append({
-                "itemID": f"{i:03}",
-                "menu_item": None,
-                "contenido": contenido
-            })
-
-    # Garantizar unicidad de itemID en caso de duplicados accidentales
-    seen = {}
-    for it in items:
-        base = it["itemID"]
-        k = base
-        n = 2
-        while k in seen:
-            k = f"{base}-{n}"
-            n += 1
-        seen[k] = True
-        it["itemID"] = k
-
-    # Filtrado opcional: mantener ítems con algo que mostrar (contenido o título)
-    # (Si prefieres conservar absolutamente todos, comenta el return siguiente y descomenta el de abajo)
-    filtered = [it for it in items if (it.get("menu_item") or (it.get("contenido") and it["contenido"].strip()))]
-    return filtered
-    # return items
+    return list(iter_items(io.StringIO(src, newline=None)))
 
 def parse_hipertex(src: str):
-    meta, rest = parse_meta(src)
-    return {"meta": meta, "items": parse_blocks(rest)}
+    meta = {}
+    items = list(iter_items(io.StringIO(src, newline=None), meta))
+    return {"meta": meta, "items": items}
+
+def parse_file(path: str, use_cache: bool = True):
+    """
+    Parsea un archivo en streaming (.hptx/.txt/.docx) sin cargarlo entero en memoria.
+    Si falla la decodificación recurre a read_text + parse_hipertex.
+    Con use_cache, un archivo ya parseado y sin cambios sale de hipertex_cache.
+    """
+    if use_cache and hipertex_cache is not None:
+        return hipertex_cache.cached(path, "parse", _parse_file)
+    return _parse_file(path)
+
+def _parse_file(path: str):
+    ext = os.path.splitext(path)[1].lower()
+    meta = {}
+    if ext == '.docx':
+        items = list(iter_items(_docx_lines(path), meta))
+        return {"meta": meta, "items": items}
+    if ext not in ('.hptx', '.txt'):
+        return parse_hipertex(read_text(path))
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            items = list(iter_items(f, meta))
+    except (UnicodeDecodeError, TypeError) as e:
+        sys.stderr.write(f"[WARN] Lectura como UTF-8 (con/sin BOM) falló: {e}\n")
+        return parse_hipertex(read_text(path))
+    return {"meta": meta, "items": items}
+
+# ---------------------------- Modo carpeta ----------------------------
+OUT_EXT = {"json": ".json", "bin": ".hptxb"}
+
+def write_parsed(data: dict, out_file: str, fmt: str = "json", compress: bool = False):
+    """
+    Escribe el resultado del parseo. Con compress (solo json) lo escribe hipertex_static:
+    minificado, con .gz/.br y solo si cambió; devuelve su entrada para static.manifest.json.
+    """
+    if fmt == "bin":
+        import hipertex_bin  # contenedor binario (ver hipertex_bin.py)
+        hipertex_bin.write_bin(data, out_file)
+        return None
+    if compress:
+        import hipertex_static
+        return hipertex_static.publish(data, out_file)
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    for ext in (".gz", ".br"):  # de una corrida anterior con --compress: quedarían desfasados
+        if os.path.exists(out_file + ext):
+            os.remove(out_file + ext)
+    return None
+
+def parse_with_index(path: str):
+    """
+    Parsea path y, en la misma pasada, escribe el sidecar <nombre>_index.json
+    (ver hipertex_index.py). Si el archivo no es UTF-8 válido, parsea sin índice.
+    """
+    import hipertex_index
+    try:
+        data, index = hipertex_index.build_index(path)
+    except UnicodeDecodeError as e:
+        sys.stderr.write(f"[WARN] Sin índice para {path} (no es UTF-8): {e}\n")
+        return parse_file(path)
+    hipertex_index.write_index(path, index)
+    return data
+
+def parse_to_json(path: str, index: bool = False, fmt: str = "json", compress: bool = False):
+    """
+    Trabajo de un proceso del pool: parsea path y escribe <nombre>_parsed.json
+    (o .hptxb con fmt="bin") junto al original (y el índice de offsets si index=True).
+    Devuelve (path, bytes_leídos, error|None, entrada del manifiesto|None).
+    """
+    try:
+        size = os.path.getsize(path)
+        data = parse_with_index(path) if index else parse_file(path)
+        out_file = os.path.splitext(path)[0] + "_parsed" + OUT_EXT[fmt]
+        info = write_parsed(data, out_file, fmt, compress)
+        return path, size, None, ({out_file: info} if info else None)
+    except Exception as e:
+        return path, 0, str(e), None
+
+def parse_dir(root: str, jobs: int = None, index: bool = False, fmt: str = "json", compress: bool = False) -> dict:
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    import time
+
+    files = find_hptx(root)
+    t0 = time.perf_counter()
+    total_bytes, errors = 0, []
+    published = {}  # carpeta -> {salida: entrada} para static.manifest.json (--compress)
+    if files:
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(files)))
+        # chunksize > 1 reduce el ida y vuelta entre procesos con cientos de archivos pequeños
+        chunk = max(1, len(files) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            work = partial(parse_to_json, index=index, fmt=fmt, compress=compress)
+            for path, size, err, info in pool.map(work, files, chunksize=chunk):
+                total_bytes += size
+                if err:
+                    errors.append((path, err))
+                    sys.stderr.write(f"[ERROR] {path}: {err}\n")
+                elif info:
+                    published.setdefault(os.path.dirname(os.path.abspath(path)), {}).update(info)
+    if published:
+        # Un solo proceso escribe los manifiestos (los workers solo devuelven sus entradas)
+        import hipertex_static
+        for folder, entries in published.items():
+            hipertex_static.update_manifest(folder, entries)
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    return {
+        "files": len(files),
+        "errors": errors,
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "files_per_s": len(files) / elapsed,
+        "mb_per_s": total_bytes / (1024 * 1024) / elapsed,
+        "written": sum(1 for entries in published.values() for i in entries.values() if i["written"]),
+    }
 
 # ------------------------------- Main --------------------------------
 def main():
-    if len(sys.argv) < 2:
+    import argparse
+    ap = argparse.ArgumentParser(description="Parser HIPERTEX: .hptx/.txt/.docx → *_parsed.json")
+    ap.add_argument("path", nargs="?", help="Archivo a convertir (.hptx | .txt | .docx)")
+    ap.add_argument("--dir", help="Convierte todos los .hptx de esta carpeta (recursivo) en paralelo")
+    ap.add_argument("--jobs", type=int, default=None, help="Procesos para --dir (por defecto: núcleos de la CPU)")
+    ap.add_argument("--format", choices=sorted(OUT_EXT), default="json",
+                    help="Salida: json (por defecto) o bin (.hptxb, ver hipertex_bin.py)")
+    ap.add_argument("--index", action="store_true", help="Escribir también <nombre>_index.json junto al original")
+    ap.add_argument("--compress", action="store_true",
+                    help="JSON minificado + .gz/.br (solo si cambian) y static.manifest.json (ver hipertex_static.py)")
+    ap.add_argument("--no-cache", action="store_true", help="No usar la caché de parseo (hipertex_cache)")
+    args = ap.parse_args()
+    if args.no_cache:
+        os.environ["HIPERTEX_CACHE"] = "off"  # también lo heredan los procesos de --dir
+
+    if args.compress and args.format != "json":
+        print("[ERROR] --compress solo se aplica a --format json.")
+        sys.exit(1)
+
+    if args.dir:
+        stats = parse_dir(args.dir, args.jobs, args.index, args.format, args.compress)
+        ok = stats["files"] - len(stats["errors"])
+        print(f"[OK] {ok}/{stats['files']} archivos → *_parsed{OUT_EXT[args.format]} en {stats['seconds']:.2f}s "
+              f"({stats['files_per_s']:.1f} archivos/s, {stats['mb_per_s']:.2f} MB/s)")
+        if args.compress:
+            print(f"     compress: {stats['written']} reescritos con .gz/.br, {ok - stats['written']} sin cambios")
+        sys.exit(1 if stats["errors"] else 0)
+
+    if not args.path:
         print("Uso: py parser_hipertex.py <archivo.hptx|.txt|.docx>")
+        print("     py parser_hipertex.py --dir <carpeta> [--jobs N]")
         sys.exit(1)
 
-    path = sys.argv[1]
-    src = read_text(path)
-    data = parse_hipertex(src)
+    path = args.path
+    ext = os.path.splitext(path)[1].lower()
+    data = parse_with_index(path) if args.index and ext in ('.hptx', '.txt') else parse_file(path)
 
-    out_file = os.path.splitext(os.path.basename(path))[0] + "_parsed.json"
-    with open(out_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    out_file = os.path.splitext(os.path.basename(path))[0] + "_parsed" + OUT_EXT[args.format]
+    info = write_parsed(data, out_file, args.format, args.compress)
+    if info:
+        import hipertex_static
+        hipertex_static.update_manifest(".", {out_file: info})
+        if not info["written"]:
+            print(f"[OK] {out_file} sin cambios (UTF-8 ✅)")
+            return
 
     print(f"[OK] Archivo guardado como {out_file} (UTF-8 ✅)")
 
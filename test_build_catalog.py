@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import time
+
+import pytest
+
+import build_catalog
+
+
+def tutorial(title: str, steps: int = 1) -> str:
+    head = f"##HIPERTEX-META BEGIN\ntitle: {title}\n##HIPERTEX-META END\n"
+    return head + "".join(f"##itemID:{i:03d}\n##menu-item BEGIN\nPaso {i}\n##menu-item END\n"
+                          f"##Contenido BEGIN\nTexto {i}\n##Contenido END\n" for i in range(steps))
+
+
+@pytest.fixture(autouse=True)
+def no_parse_cache(monkeypatch):
+    monkeypatch.setenv("HIPERTEX_CACHE", "off")
+
+
+def test_incremental_reparses_only_changed_files(tmp_path):
+    root = tmp_path / "hub"
+    root.mkdir()
+    for name in ("a", "b", "c"):
+        (root / f"{name}.hptx").write_text(tutorial(name.upper()), encoding="utf-8")
+    manifest = str(tmp_path / "catalog.manifest.json")
+
+    def run():
+        files = build_catalog.walk_hptx(str(root), False)
+        return build_catalog.build_incremental(files, str(root), False, manifest)
+
+    tutorials, stats = run()
+    assert stats == {"parsed": 3, "reused": 0, "removed": 0}
+    assert [t["title"] for t in tutorials] == ["A", "B", "C"]
+
+    (root / "b.hptx").write_text(tutorial("B2", steps=2), encoding="utf-8")
+    (root / "c.hptx").unlink()
+    tutorials, stats = run()
+    assert stats == {"parsed": 1, "reused": 1, "removed": 1}
+    assert [(t["title"], t["items_count"]) for t in tutorials] == [("A", 1), ("B2", 2)]
+
+    # Un manifiesto de otra raíz (o de otro modo recursivo) no se reutiliza
+    other = build_catalog.walk_hptx(str(root), True)
+    assert build_catalog.build_incremental(other, str(root), True, manifest)[1]["parsed"] == 2
+
+
+def test_walker_skips_default_and_user_excludes(tmp_path):
+    for rel in ("HPTX/a.hptx", "GOOGLE/HPTX/a.hptx", ".git/x.hptx", "MAKE/backup/old.hptx",
+                "MAKE/HPTX/b.hptx", "MAKE/HPTX/notas.txt", "top.hptx"):
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(tutorial(rel), encoding="utf-8")
+
+    excludes = build_catalog.DEFAULT_EXCLUDES + ("GOOGLE", "*/backup")
+    found = build_catalog.walk_hptx(str(tmp_path), True, excludes, jobs=4)
+    rels = [os.path.relpath(p, tmp_path).replace("\\", "/") for p, _ in found]
+    assert rels == ["HPTX/a.hptx", "MAKE/HPTX/b.hptx", "top.hptx"]
+    assert all(st.st_size == os.path.getsize(p) for p, st in found)  # el stat de scandir se reutiliza
+
+    assert [os.path.basename(p) for p, _ in build_catalog.walk_hptx(str(tmp_path), False, excludes)] == ["top.hptx"]
+    assert build_catalog.is_excluded(str(tmp_path / "MAKE" / "backup" / "old.hptx"), str(tmp_path), excludes)
+
+
+def test_dedup_groups_identical_files_and_hashes_only_size_collisions(tmp_path, monkeypatch):
+    same = tutorial("Igual")
+    files = {"HPTX/x.hptx": same, "GOOGLE/HPTX/x.hptx": same, "OTROS/y.hptx": same,
+             "HPTX/z.hptx": same.replace("Igual", "Otra"),  # mismo tamaño, otro contenido
+             "HPTX/solo.hptx": tutorial("Única", steps=3)}
+    for rel, text in files.items():
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text, encoding="utf-8")
+
+    hashed = []
+    real = build_catalog.content_digest
+    monkeypatch.setattr(build_catalog, "content_digest", lambda p, st=None: hashed.append(p) or real(p, st))
+
+    groups = build_catalog.group_duplicates(build_catalog.walk_hptx(str(tmp_path), True))
+    rels = [[os.path.relpath(p, tmp_path).replace("\\", "/") for p, _ in g] for g in groups]
+    # Ordenados por ruta principal, que es la copia menos anidada
+    assert rels == [["HPTX/solo.hptx"], ["HPTX/x.hptx", "OTROS/y.hptx", "GOOGLE/HPTX/x.hptx"], ["HPTX/z.hptx"]]
+    assert not any(p.endswith("solo.hptx") for p in hashed)
+
+
+def test_watch_polling_debounces_batches_and_survives_errors(tmp_path, monkeypatch, capsys):
+    root = tmp_path / "hub"
+    root.mkdir()
+    (root / "a.hptx").write_text(tutorial("A"), encoding="utf-8")
+    args = argparse.Namespace(out=str(tmp_path / "catalog.json"), manifest=None, recursive=False, jobs=2,
+                              interval=0.01, debounce=0.15, dedup=False, compress=False, format="json",
+                              shards=False, search=False, titles=False, page_size=100)
+
+    builds = []
+    real_build = build_catalog.build
+
+    def recording_build(files, root_, args_, incremental, changed=None, state=None):
+        builds.append(None if changed is None else sorted(os.path.basename(p) for p in changed))
+        if changed and any(p.endswith("roto.hptx") for p in changed):
+            raise ValueError("archivo defectuoso")
+        return real_build(files, root_, args_, incremental, changed, state)
+
+    real_sleep = time.sleep
+    script = {2: lambda: (root / "b.hptx").write_text(tutorial("B"), encoding="utf-8"),
+              4: lambda: (root / "b.hptx").write_text(tutorial("B2", 2), encoding="utf-8"),  # dentro del debounce
+              40: lambda: (root / "roto.hptx").write_text("x", encoding="utf-8"),
+              80: lambda: (root / "c.hptx").write_text(tutorial("C"), encoding="utf-8")}
+    calls = [0]
+
+    def fake_sleep(seconds):
+        real_sleep(0.01)
+        calls[0] += 1
+        if calls[0] in script:
+            script[calls[0]]()
+        if calls[0] >= 120:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(build_catalog, "Observer", None)
+    monkeypatch.setattr(build_catalog, "build", recording_build)
+    monkeypatch.setattr(build_catalog.time, "sleep", fake_sleep)
+    build_catalog.watch(str(root), args, build_catalog.DEFAULT_EXCLUDES)
+
+    assert builds == [None, ["b.hptx"], ["roto.hptx"], ["c.hptx"]]
+    assert "[WARN] No se pudo actualizar el catálogo: archivo defectuoso" in capsys.readouterr().out
+    catalog = json.loads((tmp_path / "catalog.json").read_text(encoding="utf-8"))
+    assert [t["title"] for t in catalog["tutorials"]] == ["A", "B2", "C", "roto.hptx"]
+
+
+def test_shards_page_catalog_and_items(tmp_path):
+    src = tmp_path / "demo.hptx"
+    src.write_text(tutorial("Demo", steps=2), encoding="utf-8")
+    rows = [({"relpath": "demo.hptx", "title": "Demo"}, str(src), os.stat(src)),
+            ({"relpath": "roto.hptx", "error": "ilegible"}, str(tmp_path / "roto.hptx"), None)]
+    out = tmp_path / "catalog.shards"
+
+    assert build_catalog.write_shards({"count": 2}, rows, str(out), page_size=1)["written"] == 1
+    index = json.loads((out / "index.json").read_text(encoding="utf-8"))
+    assert index["count"] == 2 and index["pages"] == ["catalog-000.json", "catalog-001.json"]
+    first = json.loads((out / "catalog-000.json").read_text(encoding="utf-8"))["tutorials"][0]
+    items = json.loads((out / first["items"]).read_text(encoding="utf-8"))["items"]
+    assert [it["itemID"] for it in items] == ["000", "001"]
+
+    stats = build_catalog.write_shards({"count": 1}, rows[:1], str(out), page_size=10)
+    assert stats["unchanged"] == 1 and not (out / "catalog-001.json").exists()
+
+
+def test_unchanged_items_file_drops_stale_compressed_copies(tmp_path):
+    src = tmp_path / "demo.hptx"
+    src.write_text(tutorial("Demo"), encoding="utf-8")
+    dst = str(tmp_path / "items.json")
+    assert build_catalog.write_items_file(str(src), dst, published={})  # con --compress: .gz/.br
+    assert os.path.exists(dst + ".gz")
+
+    # Sin --compress y sin cambios no se reescribe, pero los .gz/.br ya no se mantendrían
+    assert not build_catalog.write_items_file(str(src), dst)
+    assert os.path.exists(dst) and not any(os.path.exists(dst + ext) for ext in build_catalog.COMPRESSED)
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+
+from conftest import VARIOS
+
+TUTORIAL = (
+    "##itemID:000\n"
+    "##menu-item BEGIN\nInstalar\n##menu-item END\n"
+    "##Contenido BEGIN\npip install google-genai\n##Contenido END\n"
+)
+
+
+def test_converts_with_root_parser_when_run_from_its_folder(tmp_path):
+    # Como al lanzar el script desde PYTHON/Varios: su carpeta va primero en sys.path,
+    # junto a la copia antigua de parser_hipertex.py
+    hptx = tmp_path / "instalar.hptx"
+    hptx.write_text(TUTORIAL, encoding="utf-8")
+    code = ("import sys, pathlib, generar_tutorial_hipertex as g;"
+            "print(g.convertir_hptx_a_json(pathlib.Path(sys.argv[1])))")
+    run = subprocess.run([sys.executable, "-c", code, str(hptx)], cwd=VARIOS, capture_output=True,
+                         text=True, encoding="utf-8", env=dict(os.environ, HIPERTEX_CACHE="off"))
+    assert run.returncode == 0, run.stderr
+    data = json.loads((tmp_path / "instalar.json").read_text(encoding="utf-8"))
+    assert data["items"] == [{"itemID": "000", "menu_item": "Instalar", "contenido": "pip install google-genai"}]
+
+
+def test_batch_generates_pending_and_gives_up_on_repeated_failures(varios, tmp_path, monkeypatch, capsys):
+    # Con caché real: la conversión va por hilos de asyncio.to_thread, como en --batch
+    monkeypatch.setenv("HIPERTEX_CACHE", str(tmp_path / "cache.sqlite3"))
+    g = varios("generar_tutorial_hipertex")
+    prompts = []
+
+    async def generate_content(model, contents):
+        prompts.append(contents)
+        if "roto" in contents:
+            raise RuntimeError("respuesta vacía")
+        return SimpleNamespace(text=TUTORIAL)
+
+    g._client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    threads = []
+    convertir = g.convertir_hptx_a_json
+    monkeypatch.setattr(g, "convertir_hptx_a_json", lambda ruta: threads.append(threading.current_thread()) or convertir(ruta))
+    for name in ("Vídeo uno.txt", "dos.txt", "roto.txt"):
+        (tmp_path / name).write_text(f"transcripción {name}", encoding="utf-8")
+    (tmp_path / "ya.txt").write_text("hecho", encoding="utf-8")
+    (tmp_path / "ya.hptx").write_text(TUTORIAL, encoding="utf-8")
+
+    convertir(tmp_path / "ya.hptx")  # la caché ya se usó desde el hilo principal
+
+    def lote(**kw):
+        prompts.clear()
+        return asyncio.run(g.generar_lote(tmp_path, concurrency=2, rpm=0, **kw))
+
+    assert lote() == {"pending": 3, "done": 2, "errors": 1, "skipped": 0}
+    assert json.loads((tmp_path / "video-uno.json").read_text(encoding="utf-8"))["items"][0]["itemID"] == "000"
+    assert (tmp_path / "dos.hptx").exists() and not (tmp_path / "roto.hptx").exists()
+    assert threads and threading.main_thread() not in threads  # la conversión no bloquea el bucle
+    captured = capsys.readouterr()
+    assert "[WARN] Caché" not in captured.out + captured.err
+
+    state = json.loads((tmp_path / g.STATE_NAME).read_text(encoding="utf-8"))["files"]
+    assert state["dos.txt"]["status"] == "done" and state["roto.txt"]["error"] == "respuesta vacía"
+
+    # Al relanzar solo se reintenta la que falló, hasta MAX_FAILED_ATTEMPTS veces
+    for _ in range(g.MAX_FAILED_ATTEMPTS - 1):
+        assert lote()["errors"] == 1 and len(prompts) == 1
+    assert lote() == {"pending": 0, "done": 0, "errors": 0, "skipped": 1} and prompts == []
+    assert lote(reintentar_fallidos=True)["errors"] == 1 and len(prompts) == 1
@@ -0,0 +1,42 @@
+import json
+import mmap
+
+import pytest
+
+from hipertex_bin import HptxBinReader, bin_to_json, read_bin, write_bin
+
+DATA = {
+    "meta": {"title": "Binario", "tags": "[a, b]"},
+    "items": [
+        {"itemID": "000", "menu_item": "Intro", "contenido": "Hola ñandú"},
+        {"itemID": "000-2", "menu_item": None, "contenido": "Uno\nDos"},
+        {"itemID": "001", "menu_item": "Vacío", "contenido": ""},
+    ],
+}
+
+
+def test_binary_container_roundtrip(tmp_path):
+    path = tmp_path / "demo_parsed.hptxb"
+    write_bin(DATA, str(path))
+    assert read_bin(str(path)) == DATA
+
+    with HptxBinReader(str(path)) as r:
+        assert len(r) == 3
+        assert r.menu_titles() == [("000", "Intro"), ("000-2", None), ("001", "Vacío")]
+        assert r.get("000-2")["contenido"] == "Uno\nDos"
+
+    out = bin_to_json(str(path))
+    assert json.loads(open(out, encoding="utf-8").read()) == DATA
+
+
+def test_truncated_header_is_rejected_and_closed(tmp_path, monkeypatch):
+    path = tmp_path / "roto.hptxb"
+    write_bin(DATA, str(path))
+    path.write_bytes(path.read_bytes()[:5])  # cabecera cortada
+    opened = []
+    real_mmap = mmap.mmap
+    monkeypatch.setattr(mmap, "mmap", lambda *a, **kw: opened.append(real_mmap(*a, **kw)) or opened[-1])
+
+    with pytest.raises(ValueError, match="válido"):
+        HptxBinReader(str(path))
+    assert opened and all(m.closed for m in opened)
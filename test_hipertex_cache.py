@@ -0,0 +1,87 @@
+import threading
+
+import hipertex_cache
+
+
+def test_hash_of_a_file_written_while_hashing_is_not_kept(tmp_path, monkeypatch):
+    monkeypatch.setenv("HIPERTEX_CACHE", str(tmp_path / "cache.sqlite3"))
+    src = tmp_path / "a.hptx"
+    src.write_text("uno", encoding="utf-8")
+    st = src.stat()
+    real = hipertex_cache.file_digest
+
+    def digest_then_write(path):
+        d = real(path)
+        src.write_text("dos, más largo", encoding="utf-8")  # otro proceso escribe entretanto
+        return d
+
+    monkeypatch.setattr(hipertex_cache, "file_digest", digest_then_write)
+    hipertex_cache.digest(str(src), st)
+    assert hipertex_cache._connect().execute("SELECT COUNT(*) FROM files").fetchone() == (0,)
+
+
+def test_result_of_a_file_changed_while_parsing_is_not_stored(tmp_path, monkeypatch):
+    monkeypatch.setenv("HIPERTEX_CACHE", str(tmp_path / "cache.sqlite3"))
+    src, copy = tmp_path / "a.hptx", tmp_path / "copia.hptx"
+    src.write_text("uno", encoding="utf-8")
+    copy.write_text("uno", encoding="utf-8")
+
+    def read(path):
+        return {"text": open(path, encoding="utf-8").read()}
+
+    def write_then_read(path):
+        src.write_text("dos, más largo", encoding="utf-8")  # el parseo ya ve el contenido nuevo
+        return read(path)
+
+    hipertex_cache.cached(str(src), "test", write_then_read)
+    # El resultado de "dos" no puede quedar guardado bajo el hash de "uno"
+    assert hipertex_cache.cached(str(copy), "test", read) == {"text": "uno"}
+
+
+def test_prune_forgets_deleted_paths(tmp_path, monkeypatch):
+    monkeypatch.setenv("HIPERTEX_CACHE", str(tmp_path / "cache.sqlite3"))
+    kept, gone = tmp_path / "kept.hptx", tmp_path / "gone.hptx"
+    for p in (kept, gone):
+        p.write_text(p.name, encoding="utf-8")
+        hipertex_cache.digest(str(p))
+    gone.unlink()
+
+    assert hipertex_cache.prune() == 1
+    rows = hipertex_cache._connect().execute("SELECT path FROM files").fetchall()
+    assert rows == [(str(kept),)]
+
+
+def test_cache_hit_from_another_thread(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("HIPERTEX_CACHE", str(tmp_path / "cache.sqlite3"))
+    src = tmp_path / "a.hptx"
+    src.write_text("uno", encoding="utf-8")
+    calls = []
+
+    def parse(path):
+        calls.append(threading.current_thread())
+        return {"text": open(path, encoding="utf-8").read()}
+
+    assert hipertex_cache.cached(str(src), "test", parse) == {"text": "uno"}
+    results = []
+    worker = threading.Thread(target=lambda: results.append(hipertex_cache.cached(str(src), "test", parse)))
+    worker.start()
+    worker.join()
+    assert results == [{"text": "uno"}] and calls == [threading.main_thread()]
+    assert "[WARN]" not in capsys.readouterr().err
+
+
+def test_cache_hit_does_not_write(tmp_path, monkeypatch):
+    monkeypatch.setenv("HIPERTEX_CACHE", str(tmp_path / "cache.sqlite3"))
+    src = tmp_path / "a.hptx"
+    src.write_text("uno", encoding="utf-8")
+    hipertex_cache.cached(str(src), "test", lambda p: 1)
+    conn = hipertex_cache._connect()
+    before = conn.total_changes
+    assert hipertex_cache.cached(str(src), "test", lambda p: 2) == 1
+    assert conn.total_changes == before
+
+    # Con un atime antiguo sí se actualiza (la LRU sigue viendo el uso)
+    with conn:
+        conn.execute("UPDATE results SET atime = 0")
+    hipertex_cache.cached(str(src), "test", lambda p: 2)
+    assert conn.execute("SELECT atime FROM results").fetchone()[0] > 0
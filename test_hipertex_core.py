@@ -0,0 +1,29 @@
+import io
+import json
+
+import pytest
+
+from hipertex_core import _JsonStream, iter_json_items
+
+DOC = {
+    "meta": {"title": "JSON", "tags": "[a]"},
+    "items": [
+        {"itemID": "000", "menu_item": "Intro", "contenido": "Hola \"ñandú\"\n\\n"},
+        {"itemID": "001", "menu_item": None, "contenido": "Uno", "extra": [1, 2.5, True, None]},
+    ],
+}
+
+
+def test_json_items_are_streamed():
+    meta = {}
+    doc = json.dumps(DOC, ensure_ascii=False, indent=2)
+    assert list(iter_json_items(io.StringIO(doc), meta)) == DOC["items"]
+    assert meta == {"meta": DOC["meta"]}
+    assert list(iter_json_items(io.StringIO(json.dumps(DOC["items"])))) == DOC["items"]  # lista suelta
+
+    # Lecturas de pocos caracteres: valores y números cortados entre bloques
+    s = _JsonStream(io.StringIO("[1.5e3, {\"a\": \"ñ\"}, -20]"), size=2)
+    assert list(s.array()) == [1500.0, {"a": "ñ"}, -20]
+
+    with pytest.raises(ValueError):
+        list(iter_json_items(io.StringIO('{"meta": {}}')))
@@ -0,0 +1,47 @@
+import os
+
+from hipertex_db import CatalogDB, write_catalog_db
+
+TUTORIAL = (
+    "##itemID:000\n"
+    "##menu-item BEGIN\nIntro\n##menu-item END\n"
+    "##Contenido BEGIN\nHola doPost\n##Contenido END\n"
+    "##itemID:000\n"
+    "##Contenido BEGIN\nUno\n##Contenido END\n"
+)
+
+
+def test_sqlite_catalog_updates_in_place(tmp_path):
+    src = tmp_path / "demo.hptx"
+    src.write_text(TUTORIAL, encoding="utf-8")
+    entry = {"file": "demo.hptx", "relpath": "demo.hptx", "title": "Demo", "tags": ["qr"]}
+    db = str(tmp_path / "catalog.sqlite3")
+
+    assert write_catalog_db(db, {"count": 1}, [(entry, str(src), os.stat(src))])["written"] == 1
+    assert write_catalog_db(db, {"count": 1}, [(entry, str(src), os.stat(src))])["unchanged"] == 1
+    with CatalogDB(db) as cat:
+        assert [r["relpath"] for r in cat.by_tag("QR")] == ["demo.hptx"]
+        assert [h["itemID"] for h in cat.search("dopost")] == ["000"]
+        assert [it["itemID"] for it in cat.items("demo.hptx")] == ["000", "000-2"]
+
+    assert write_catalog_db(db, {"count": 0}, [])["removed"] == 1
+    with CatalogDB(db) as cat:
+        assert cat.search("dopost") == [] and cat.tutorial("demo.hptx") is None
+
+
+def test_sqlite_catalog_rewrites_rows_stored_with_error(tmp_path):
+    src = tmp_path / "demo.hptx"
+    src.write_text(TUTORIAL, encoding="utf-8")
+    st = os.stat(src)
+    db = str(tmp_path / "catalog.sqlite3")
+    broken = {"file": "demo.hptx", "relpath": "demo.hptx", "error": "ilegible"}
+    assert write_catalog_db(db, {"count": 1}, [(broken, str(src), st)])["written"] == 1
+
+    # Misma fecha y tamaño, pero ahora se parsea bien: no puede quedarse con el error
+    entry = {"file": "demo.hptx", "relpath": "demo.hptx", "title": "Demo", "tags": ["qr"]}
+    assert write_catalog_db(db, {"count": 1}, [(entry, str(src), st)])["written"] == 1
+    with CatalogDB(db) as cat:
+        assert cat.tutorial("demo.hptx")["error"] is None
+        assert [r["relpath"] for r in cat.by_tag("qr")] == ["demo.hptx"]
+        assert [h["itemID"] for h in cat.search("dopost")] == ["000"]
+    assert write_catalog_db(db, {"count": 1}, [(entry, str(src), st)])["unchanged"] == 1
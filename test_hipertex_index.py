@@ -0,0 +1,46 @@
+import pytest
+
+import hipertex_index
+import parser_hipertex
+
+# BOM, CRLF, ñ (varios bytes por carácter) e itemID repetido: los offsets son en bytes
+TUTORIAL = (
+    "\ufeff##HIPERTEX-META BEGIN\r\ntitle: Índice\r\n##HIPERTEX-META END\r\n"
+    "##itemID:000\r\n##menu-item BEGIN\r\nIntro\r\n##menu-item END\r\n"
+    "##Contenido BEGIN\r\nHola ñandú\r\n##Contenido END\r\n"
+    "##itemID:000\n##Contenido BEGIN\nUno\n##Contenido END\n"
+    "##itemID:001\n##menu-item BEGIN\nFin\n##menu-item END\n##Contenido BEGIN\nDos\n##Contenido END\n"
+)
+
+
+def test_index_sidecar_serves_single_items(tmp_path):
+    src = tmp_path / "demo.hptx"
+    src.write_bytes(TUTORIAL.encode("utf-8"))
+    data = parser_hipertex.parse_with_index(str(src))
+    assert data == parser_hipertex.parse_file(str(src), use_cache=False)
+    path = hipertex_index.index_path(str(src))
+    assert path.endswith("demo_index.json") and (tmp_path / "demo_index.json").exists()
+
+    with hipertex_index.HptxIndex(str(src), rebuild=False) as idx:
+        assert idx.ids() == ["000", "000-2", "001"]
+        assert idx.meta["title"] == "Índice"
+        for it in data["items"]:
+            assert idx.get(it["itemID"]) == it
+        assert idx.get("999") is None
+
+
+def test_interrupted_index_write_keeps_previous_sidecar(tmp_path, monkeypatch):
+    src = tmp_path / "demo.hptx"
+    src.write_bytes(TUTORIAL.encode("utf-8"))
+    path = hipertex_index.write_index(str(src))
+    before = open(path, "rb").read()
+
+    def cut(obj, f, **kw):
+        f.write('{"version":')  # corte a mitad de la escritura
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(hipertex_index.json, "dump", cut)
+    with pytest.raises(KeyboardInterrupt):
+        hipertex_index.write_index(str(src))
+    assert open(path, "rb").read() == before
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["demo.hptx", "demo_index.json"]
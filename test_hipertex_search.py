@@ -0,0 +1,34 @@
+import hipertex_search
+
+
+def test_search_index_bm25(tmp_path):
+    a = tmp_path / "a.hptx"
+    a.write_text("##itemID:000\n##menu-item BEGIN\nDespliegue\n##menu-item END\n"
+                 "##Contenido BEGIN\nPublica la función doPost de Apps Script.\n##Contenido END\n"
+                 "##itemID:001\n##Contenido BEGIN\nConfiguración de la hoja.\n##Contenido END\n", encoding="utf-8")
+    b = tmp_path / "b.hptx"
+    b.write_text("##itemID:000\n##Contenido BEGIN\nUn script de Python.\n##Contenido END\n", encoding="utf-8")
+
+    index = hipertex_search.build_index([(p.name, hipertex_search.file_terms(str(p))) for p in (a, b)])
+    path = tmp_path / "catalog.search.json"
+    hipertex_search.write_index(index, str(path))
+    idx = hipertex_search.SearchIndex(str(path))
+
+    hits = idx.search("apps script doPost")
+    assert [(h["relpath"], h["itemID"]) for h in hits] == [("a.hptx", "000"), ("b.hptx", "000")]
+    assert hits[0]["menu_item"] == "Despliegue"
+    assert idx.search("configuracion")[0]["itemID"] == "001"  # sin tildes
+    assert idx.search("inexistente") == []
+
+
+def test_title_index_tolerates_typos():
+    tutorials = [
+        {"file": "TUTORIALIMPORTAR DATOSGoogleSheetsCSVXMLFEEDCASOSPRÁCTICO.hptx",
+         "relpath": "HPTX/TUTORIALIMPORTAR DATOSGoogleSheetsCSVXMLFEEDCASOSPRÁCTICO.hptx",
+         "title": "TUTORIALIMPORTAR DATOSGoogleSheetsCSVXMLFEEDCASOSPRÁCTICO.hptx", "tags": []},
+        {"file": "qr.hptx", "relpath": "APPSHEET/qr.hptx", "title": "AppSheet - Generar QR", "tags": ["códigos"]},
+    ]
+    idx = hipertex_search.TitleIndex(hipertex_search.build_title_index(tutorials))
+    assert idx.lookup("inportar datos practico")[0]["relpath"].startswith("HPTX/")
+    assert idx.lookup("apsheet codigos qr")[0]["relpath"] == "APPSHEET/qr.hptx"
+    assert idx.lookup("zzzz") == []
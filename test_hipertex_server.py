@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+import hipertex_server
+
+TUTORIAL = (
+    "##itemID:000\n"
+    "##menu-item BEGIN\nIntro\n##menu-item END\n"
+    "##Contenido BEGIN\nHola\n##Contenido END\n"
+)
+
+
+def test_tutorial_cache_reparses_on_change_and_evicts(tmp_path):
+    a, b = tmp_path / "a.hptx", tmp_path / "b.hptx"
+    a.write_text(TUTORIAL, encoding="utf-8")
+    b.write_text(TUTORIAL, encoding="utf-8")
+    cache = hipertex_server.TutorialCache(max_bytes=os.path.getsize(a) + 1)
+
+    etag, data = cache.get(str(a))
+    assert cache.get(str(a)) == (etag, data) and (cache.hits, cache.misses) == (1, 1)
+
+    a.write_text(TUTORIAL.replace("Hola", "Adiós"), encoding="utf-8")
+    os.utime(a, ns=(1, 1))
+    assert cache.get(str(a))[0] != etag and cache.misses == 2
+
+    cache.get(str(b))
+    assert len(cache) == 1  # a salió de la LRU al superar el límite
+
+
+def test_tutorial_cache_forgets_loading_lock_when_parse_fails(tmp_path, monkeypatch):
+    a = tmp_path / "a.hptx"
+    a.write_text(TUTORIAL, encoding="utf-8")
+    cache = hipertex_server.TutorialCache()
+
+    def broken(path):
+        raise UnicodeError("ilegible")
+
+    monkeypatch.setattr(hipertex_server, "parse_tutorial", broken)
+    with pytest.raises(UnicodeError):
+        cache.get(str(a))
+    with pytest.raises(FileNotFoundError):
+        cache.get(str(tmp_path / "no-existe.hptx"))
+    assert cache._loading == {} and len(cache) == 0
+
+
+def test_app_is_built_on_first_access(monkeypatch):
+    calls = []
+    monkeypatch.delitem(vars(hipertex_server), "app", raising=False)
+    monkeypatch.setattr(hipertex_server.Hub, "from_env", classmethod(lambda cls: calls.append(1) or "hub"))
+    monkeypatch.setattr(hipertex_server, "create_app", lambda hub: ("app", hub))
+
+    assert calls == []  # importar el módulo no crea el Hub
+    assert hipertex_server.app == ("app", "hub") and hipertex_server.app == ("app", "hub")
+    assert calls == [1]
+
+
+@pytest.fixture
+def client(tmp_path):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    root = tmp_path / "hub"
+    (root / "APPSHEET").mkdir(parents=True)
+    (root / "APPSHEET" / "qr.hptx").write_text(TUTORIAL, encoding="utf-8")
+    (root / "fuera.hptx").write_text(TUTORIAL, encoding="utf-8")  # existe, pero no está en el catálogo
+    (tmp_path / "secreto.hptx").write_text(TUTORIAL, encoding="utf-8")
+    catalog = root / "catalog.json"
+    catalog.write_text(json.dumps({"tutorials": [{"relpath": "APPSHEET/qr.hptx"}, {"relpath": "../secreto.hptx"}]}), encoding="utf-8")
+    client = TestClient(hipertex_server.create_app(hipertex_server.Hub(str(root), str(catalog))))
+    client.root = root
+    return client
+
+
+def test_http_etag_and_not_modified(client):
+    for url in ("/catalog", "/tutorials/APPSHEET/qr.hptx", "/tutorials/APPSHEET/qr.hptx/items/000"):
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers["etag"]
+        again = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["etag"] == first.headers["etag"]
+    assert client.get("/tutorials/APPSHEET/qr.hptx").json()["items"][0]["menu_item"] == "Intro"
+
+
+def test_http_items_and_unknown_paths(client):
+    assert client.get("/tutorials/APPSHEET/qr.hptx/items/000").json()["contenido"] == "Hola"
+    assert client.get("/tutorials/APPSHEET/qr.hptx/items/999").status_code == 404
+    assert client.get("/tutorials/fuera.hptx").status_code == 404
+    assert client.get("/tutorials/APPSHEET/%2E%2E/%2E%2E/secreto.hptx").status_code == 404
+    assert client.get("/tutorials/..%2F..%2Fsecreto.hptx").status_code == 404
+    assert client.get("/tutorials/..%2Fsecreto.hptx").status_code == 404  # ni aunque figure en el catálogo
+
+
+def test_http_new_etag_after_edit(client):
+    path = client.root / "APPSHEET" / "qr.hptx"
+    etag = client.get("/tutorials/APPSHEET/qr.hptx").headers["etag"]
+    path.write_text(TUTORIAL.replace("Hola", "Adiós"), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    changed = client.get("/tutorials/APPSHEET/qr.hptx", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["items"][0]["contenido"] == "Adiós"
@@ -0,0 +1,16 @@
+import gzip
+import json
+
+from hipertex_static import publish, update_manifest
+
+
+def test_static_artifacts_written_only_on_change(tmp_path):
+    out = tmp_path / "catalog.json"
+    first = publish({"tutorials": ["á"]}, str(out))
+    assert first["written"] and out.read_bytes() == '{"tutorials":["á"]}'.encode("utf-8")
+    assert gzip.decompress((tmp_path / "catalog.json.gz").read_bytes()) == out.read_bytes()
+    assert not publish({"tutorials": ["á"]}, str(out))["written"]
+
+    update_manifest(str(tmp_path), {str(out): first})
+    manifest = json.loads((tmp_path / "static.manifest.json").read_text(encoding="utf-8"))
+    assert manifest["files"]["catalog.json"]["sha256"] == first["sha256"]
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+ITEMS = [{"itemID": "000", "menu_item": "Intro", "contenido": "Hola"},
+         {"itemID": "001", "menu_item": None, "contenido": "Adiós"}]
+
+
+def test_streams_with_the_root_core_and_rewrites_in_place(tmp_path, varios):
+    normalizar = varios("normalizar_hipertex")
+    assert normalizar.hipertex_core is not None  # camino en streaming, no el de cargar todo
+
+    src = tmp_path / "t.json"
+    src.write_text(json.dumps({"meta": {}, "items": ITEMS}), encoding="utf-8")
+    assert normalizar.normalize(src, src) == 2
+    assert src.read_text(encoding="utf-8") == json.dumps(ITEMS, ensure_ascii=False, indent=2)
+
+
+@pytest.mark.parametrize("name, content, error", [
+    ("malo.json", b'{"meta": {}}', ValueError),
+    ("latin1.json", '[{"contenido": "adiós"}]'.encode("latin-1"), UnicodeDecodeError),
+    ("no_existe.json", None, FileNotFoundError),
+])
+def test_failures_leave_dst_untouched(tmp_path, varios, name, content, error):
+    normalizar = varios("normalizar_hipertex")
+    src, dst = tmp_path / name, tmp_path / "salida.json"
+    if content is not None:
+        src.write_bytes(content)
+    dst.write_text("anterior", encoding="utf-8")
+    with pytest.raises(error):
+        normalizar.normalize(src, dst)
+    assert dst.read_text(encoding="utf-8") == "anterior"
+    assert not (tmp_path / "salida.json.tmp").exists()
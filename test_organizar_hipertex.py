@@ -0,0 +1,117 @@
+import json
+import random
+
+import pytest
+
+
+@pytest.fixture
+def org(varios):
+    return varios("organizar_hipertex")
+
+
+def random_names(categories, n=3000, seed=7):
+    # Fragmentos de palabras clave (completas, cortadas y pegadas) para forzar solapes como GIT/GITHUB
+    rnd = random.Random(seed)
+    words = [kw for kws in categories.values() for kw in kws] + ["notas", "2025-07-01", "Receta", "_", " ", "."]
+    names = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rnd.randint(1, 4)):
+            w = rnd.choice(words)
+            if rnd.random() < 0.3:
+                w = w[rnd.randrange(len(w)):]
+            parts.append(w.lower() if rnd.random() < 0.5 else w)
+        names.append("".join(parts) + rnd.choice([".hptx", ".json", ".txt"]))
+    return names
+
+
+def test_matcher_equals_keyword_loop(org):
+    names = random_names(org.CATEGORIES) + ["GITHUB-actions.txt", "ApiGit.hptx", "piano.json", "sin categoria.txt", ""]
+    expected = [org._get_category_loop(n) for n in names]
+    # Con la taxonomía por defecto se usa el bucle; la regex (loop_below=0) debe dar lo mismo
+    assert org.CategoryMatcher(org.CATEGORIES).loop is not None
+    for matcher in (org.CategoryMatcher(org.CATEGORIES), org.CategoryMatcher(org.CATEGORIES, loop_below=0)):
+        assert [matcher(n) for n in names] == expected
+
+
+def test_matcher_equals_keyword_loop_with_extra_categories(org):
+    rnd = random.Random(3)
+    grown = dict(org.CATEGORIES)
+    for i in range(30):
+        grown[f"EXTRA{i:02d}"] = ["".join(rnd.choice("ABCGHIPT") for _ in range(rnd.randint(2, 6))) for _ in range(10)]
+    grown["VACIA"] = []
+    matcher = org.CategoryMatcher(grown)
+    assert matcher.loop is None  # más de LOOP_BELOW palabras: regex
+    names = random_names(grown, seed=11)
+    assert [matcher(n) for n in names] == [org._get_category_loop(n, grown) for n in names]
+    assert org.CategoryMatcher({})("make.hptx") == "OTROS"
+    assert org.CategoryMatcher({}, loop_below=0)("make.hptx") == "OTROS"
+
+
+def test_keyword_files_extend_categories(org, tmp_path):
+    txt = tmp_path / "categorias_hipertex.txt"
+    txt.write_text("# comentario\nmake: escenario, \nRECETAS: receta, cocina\n", encoding="utf-8")
+    extra = tmp_path / "extra.json"
+    extra.write_text(json.dumps({"recetas": ["horno"], "PIANO": ["partitura"]}), encoding="utf-8")
+
+    merged = org.load_keywords(str(extra), org.load_keywords(str(txt), org.CATEGORIES))
+    assert merged["MAKE"][-1] == "ESCENARIO" and merged["RECETAS"] == ["RECETA", "COCINA", "HORNO"]
+    assert list(merged)[-1] == "RECETAS" and "RECETAS" not in org.CATEGORIES
+
+    org.use_keyword_files([str(txt), str(extra)])
+    names = ["Escenario nuevo.hptx", "receta al horno.hptx", "Partitura.txt", "Make receta.hptx", "otra cosa.txt"]
+    assert [org.get_category(n) for n in names] == ["MAKE", "RECETAS", "PIANO", "MAKE", "OTROS"]
+    assert [org.get_category(n) for n in names] == [org._get_category_loop(n, merged) for n in names]
+
+    bad = tmp_path / "mal.txt"
+    bad.write_text("sin dos puntos\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="mal.txt:1"):
+        org.load_keywords(str(bad), org.CATEGORIES)
+
+
+def test_organize_moves_while_walking_and_leaves_category_folders(org, tmp_path, monkeypatch):
+    monkeypatch.setattr(org, "ROOT_DIR", str(tmp_path))
+    (tmp_path / "inbox").mkdir()
+    (tmp_path / "MAKE" / "HPTX").mkdir(parents=True)
+    (tmp_path / "MAKE" / "HPTX" / "Claude notas.hptx").write_text("ya")  # en otra CATEGORIA/TIPO: se queda
+    names = [f"Make escenario {i}.hptx" for i in range(300)] + ["Claude chat.txt", "Receta.txt"]
+    for name in names:
+        (tmp_path / name).write_text(name)
+    (tmp_path / "inbox" / "Piano acordes.hptx").write_text("p")
+
+    org.organize(recursive=True)
+    assert not [p for p in tmp_path.iterdir() if p.is_file()]
+    assert len(list((tmp_path / "MAKE" / "HPTX").iterdir())) == 301
+    assert (tmp_path / "MAKE" / "HPTX" / "Claude notas.hptx").exists()
+    assert (tmp_path / "CLAUDE" / "Varios" / "Claude chat.txt").exists()
+    assert (tmp_path / "OTROS" / "Varios" / "Receta.txt").exists()
+    assert (tmp_path / "PIANO" / "HPTX" / "Piano acordes.hptx").exists()
+    assert (tmp_path / "CLAUDE" / "HPTX").is_dir()  # enforce_subfolders
+
+
+def test_iter_files_streams_each_folder(org, tmp_path, monkeypatch):
+    for i in range(50):
+        (tmp_path / f"Make {i}.hptx").write_text("x")
+    read = []
+    real_scandir = org.os.scandir
+
+    class Counting:
+        def __init__(self, path):
+            self.it = real_scandir(path)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.it.close()
+
+        def __iter__(self):
+            for entry in self.it:
+                read.append(entry.name)
+                yield entry
+
+    monkeypatch.setattr(org.os, "scandir", Counting)
+    files = org.iter_files(str(tmp_path))
+    next(files)
+    assert len(read) == 1  # la carpeta no se lee entera antes de devolver el primero
+    assert len(list(files)) == 49
@@ -0,0 +1,97 @@
+import os
+
+from organize_files import Journal, journal_path, organize_folder, plan_moves, resume, undo
+
+
+def test_organize_plan_resume_and_undo(tmp_path):
+    (tmp_path / "MAKE" / "VARIOS").mkdir(parents=True)
+    (tmp_path / "MAKE" / "VARIOS" / "Make_a.txt").write_text("viejo")
+    for name in ("Make_a.txt", "Make_b.txt", "Perplexity-x.json"):
+        (tmp_path / name).write_text(name)
+
+    moves = plan_moves(tmp_path, sorted(tmp_path.glob("*.*")))
+    assert [m.dst.relative_to(tmp_path).as_posix() for m in moves] == [
+        "MAKE/VARIOS/Make_a_1.txt", "MAKE/VARIOS/Make_b.txt", "PERPLEXITY/JSON/Perplexity-x.json"]
+
+    # Ejecución cortada tras planificar: --resume mueve lo pendiente
+    with Journal(journal_path(tmp_path), "r1") as j:
+        j.write("begin", root=str(tmp_path))
+        for src, dst, _ in moves:
+            j.write("plan", src=src.name, dst=dst.relative_to(tmp_path).as_posix())
+    assert resume(tmp_path)["renamed"] == 3
+    assert (tmp_path / "MAKE" / "VARIOS" / "Make_a_1.txt").read_text() == "Make_a.txt"
+
+    assert undo(tmp_path) == 3 and (tmp_path / "Make_b.txt").exists()
+    assert organize_folder(tmp_path)["renamed"] == 3
+
+
+def test_organize_skips_or_links_identical_files(tmp_path):
+    dest = tmp_path / "MAKE" / "VARIOS"
+    dest.mkdir(parents=True)
+    (dest / "Make_a.txt").write_text("igual")
+    (tmp_path / "Make_a.txt").write_text("igual")        # mismo nombre y contenido
+    (tmp_path / "Make_copia.txt").write_text("igual")    # otro nombre, mismo contenido
+    (tmp_path / "Make_b.txt").write_text("distinto")
+
+    files = sorted(tmp_path.glob("*.txt"))
+    skipped = {m.src.name for m in plan_moves(tmp_path, files, "skip") if m.dst is None}
+    assert skipped == {"Make_a.txt", "Make_copia.txt"}
+
+    stats = organize_folder(tmp_path, dedup="link")
+    assert (stats["linked"], stats["renamed"]) == (2, 1)
+    assert os.path.samefile(dest / "Make_a.txt", dest / "Make_a_1.txt")
+    assert not (tmp_path / "Make_copia.txt").exists()
+
+
+def test_organize_keeps_identical_files_by_default(tmp_path):
+    dest = tmp_path / "MAKE" / "VARIOS"
+    dest.mkdir(parents=True)
+    (dest / "Make_a.txt").write_text("igual")
+    (tmp_path / "Make_a.txt").write_text("igual")
+
+    # Sin --dedup, como antes: no se compara el contenido y se renombra con _1
+    assert organize_folder(tmp_path)["renamed"] == 1
+    assert (dest / "Make_a_1.txt").read_text() == "igual" and not os.path.samefile(dest / "Make_a.txt", dest / "Make_a_1.txt")
+
+
+def test_organize_recursive_streams_in_batches(tmp_path):
+    (tmp_path / "inbox" / "sub").mkdir(parents=True)
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "MAKE" / "HPTX").mkdir(parents=True)
+    (tmp_path / "MAKE" / "HPTX" / "Make_ya.hptx").write_text("ya")    # ya organizado
+    (tmp_path / ".git" / "Make_git.hptx").write_text("git")           # carpeta ignorada
+    (tmp_path / "CLAUDE" / "VARIOS").mkdir(parents=True)
+    (tmp_path / "CLAUDE" / "VARIOS" / "Make_otro.txt").write_text("o")  # en otra TEMA/TIPO: no se vuelve a mover
+    (tmp_path / "Make_a.hptx").write_text("a")
+    (tmp_path / "inbox" / "Make_b.hptx").write_text("b")
+    (tmp_path / "inbox" / "sub" / "Perplexity_c.json").write_text("c")
+
+    stats = organize_folder(tmp_path, recursive=True, batch=1)
+    assert (stats["planned"], stats["renamed"]) == (3, 3)
+    assert sorted(p.name for p in (tmp_path / "MAKE" / "HPTX").iterdir()) == ["Make_a.hptx", "Make_b.hptx", "Make_ya.hptx"]
+    assert (tmp_path / "PERPLEXITY" / "JSON" / "Perplexity_c.json").exists()
+    assert (tmp_path / ".git" / "Make_git.hptx").exists()
+    assert (tmp_path / "CLAUDE" / "VARIOS" / "Make_otro.txt").exists()
+
+    # Todos los lotes son una sola ejecución en el diario
+    assert undo(tmp_path) == 3 and (tmp_path / "inbox" / "sub" / "Perplexity_c.json").exists()
+
+
+def test_undo_restores_moves_lost_from_the_journal(tmp_path, monkeypatch):
+    for name in ("Make_a.txt", "Make_b.hptx", "Perplexity-x.json"):
+        (tmp_path / name).write_text(name)
+    write = Journal.write
+
+    def killed(self, op, **fields):
+        # Corte brusco: los "plan" se volcaron, pero los "move" y el "end" seguían en el búfer
+        if op not in ("move", "end"):
+            write(self, op, **fields)
+
+    monkeypatch.setattr(Journal, "write", killed)
+    assert organize_folder(tmp_path)["renamed"] == 3
+    monkeypatch.setattr(Journal, "write", write)
+
+    assert undo(tmp_path) == 3
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_file() and p.suffix != ".jsonl") == [
+        "Make_a.txt", "Make_b.hptx", "Perplexity-x.json"]
+    assert not (tmp_path / "MAKE").exists() and undo(tmp_path) == 0
@@ -0,0 +1,76 @@
+import io
+
+from parser_hipertex import iter_items, parse_hipertex
+
+SAMPLE = (
+    "##HIPERTEX-META BEGIN\r\n"
+    "title: Demo\r\n"
+    "tags: [a, b]\r\n"
+    "##HIPERTEX-META END\r\n"
+    "##itemID:000\r\n"
+    "##menu-item BEGIN\r\nIntro\r\n##menu-item END\r\n"
+    "##Contenido BEGIN\r\nHola\r\n##Contenido END\r\n"
+    "##itemID:000\n"
+    "##Contenido BEGIN\nUno\n##Contenido END\n"
+    "##Contenido BEGIN\nDos\n##Contenido END\n"
+    "##itemID:002\n"
+    "##menu-item BEGIN\n##menu-item END\n"
+)
+
+
+def test_parse_hipertex_ids_meta_and_duplicates():
+    data = parse_hipertex(SAMPLE)
+    assert data["meta"] == {"title": "Demo", "tags": "[a, b]"}
+    assert data["items"] == [
+        {"itemID": "000", "menu_item": "Intro", "contenido": "Hola"},
+        {"itemID": "000-2", "menu_item": None, "contenido": "Uno\nDos"},
+    ]
+
+
+def test_iter_items_is_lazy():
+    lines = (line for line in io.StringIO(SAMPLE, newline=None))
+    gen = iter_items(lines)
+    first = next(gen)
+    assert first["itemID"] == "000"
+    # El primer item se emite en cuanto empieza el siguiente bloque
+    assert next(lines).startswith("##Contenido BEGIN")
+
+
+def test_without_ids_each_contenido_is_an_item():
+    src = "intro\n##Contenido BEGIN\nA\n##Contenido END\n##Contenido BEGIN\n  \n##Contenido END\n##Contenido BEGIN\nC\n##Contenido END"
+    items = parse_hipertex(src)["items"]
+    assert [(it["itemID"], it["contenido"]) for it in items] == [("000", "A"), ("002", "C")]
+
+
+def test_parse_file_reuses_cache(tmp_path, monkeypatch):
+    import parser_hipertex
+
+    monkeypatch.setenv("HIPERTEX_CACHE", str(tmp_path / "cache.sqlite3"))
+    src = tmp_path / "demo.hptx"
+    src.write_text(SAMPLE, encoding="utf-8")
+    first = parser_hipertex.parse_file(str(src))
+
+    calls = []
+    monkeypatch.setattr(parser_hipertex, "_parse_file", lambda p: calls.append(p))
+    assert parser_hipertex.parse_file(str(src)) == first
+    assert calls == []
+
+
+def test_docx_paragraphs_without_python_docx(tmp_path):
+    import zipfile
+
+    from parser_hipertex import iter_docx_paragraphs
+
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    xml = (
+        f'<w:document {w}><w:body>'
+        '<w:p><w:r><w:t>##itemID:000</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t></w:r></w:p>'
+        '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>celda</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+        '<w:p><w:hyperlink><w:r><w:t>link</w:t></w:r></w:hyperlink></w:p>'
+        '</w:body></w:document>'
+    )
+    path = tmp_path / "demo.docx"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", xml)
+    assert list(iter_docx_paragraphs(str(path))) == ["##itemID:000", "a\tb\nc", "link"]
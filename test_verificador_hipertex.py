@@ -0,0 +1,41 @@
+import io
+import json
+import subprocess
+import sys
+
+from conftest import VARIOS
+
+GOOD = (
+    "##itemID:001\n"
+    "##menu-item BEGIN\nPaso uno\n##menu-item END\n"
+    "##Contenido BEGIN\nHacer algo\n##Contenido END\n"
+)
+EMPTY_CONTENT = "##itemID:001\n##menu-item BEGIN\nPaso uno\n##menu-item END\n##Contenido BEGIN\n\n##Contenido END\n"
+
+
+def make_tree(root):
+    (root / "sub").mkdir()
+    (root / ".git").mkdir()
+    (root / "ok.hptx").write_text(GOOD, encoding="utf-8")
+    (root / "sub" / "vacio.hptx").write_text(EMPTY_CONTENT, encoding="utf-8")
+    (root / ".git" / "ignorado.hptx").write_text(EMPTY_CONTENT, encoding="utf-8")
+
+
+def test_validate_tree_reports_one_line_per_file(tmp_path, varios):
+    verificador = varios("verificador_hipertex")
+    make_tree(tmp_path)
+    out = io.StringIO()
+    stats = verificador.validate_tree(str(tmp_path), out, jobs=2)
+    assert stats == {"files": 2, "invalid": 1, "issues": 1}
+    reports = {r["file"].replace("\\", "/").rsplit("/", 1)[-1]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert reports["ok.hptx"]["ok"] and reports["ok.hptx"]["items"] == 1
+    assert [i["check"] for i in reports["vacio.hptx"]["issues"]] == ["contenido"]
+
+
+def test_dir_mode_runs_from_its_own_folder(tmp_path):
+    make_tree(tmp_path)
+    run = subprocess.run([sys.executable, "verificador_hipertex.py", "--dir", str(tmp_path)], cwd=VARIOS,
+                         capture_output=True, text=True, encoding="utf-8")
+    assert "No se encontró hipertex_core.py" not in run.stdout
+    assert run.returncode == 1 and len(run.stdout.splitlines()) == 2
+    assert "1 de 2 archivos con avisos" in run.stderr